@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 import logging
 
 # Configure logging
@@ -52,6 +53,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'scheduler.metrics.MetricsMiddleware',  # first, so it times the whole stack
+    'scheduler.responses.CompressionMiddleware',  # before anything that reads the body
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,7 +145,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Add REST_FRAMEWORK configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'scheduler.token_auth.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -153,4 +156,53 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cache (LRU-culled local memory per process; use Redis/Memcached when running several workers
+# so that token invalidation on logout reaches every process)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Memoised generator results keyed by problem hash (LRU, see scheduler/solution_cache.py)
+    'solutions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'timetable-solutions',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 256,
+        },
+    },
+}
+
+# Token -> user lookups cached by scheduler.token_auth.CachedTokenAuthentication
+AUTH_TOKEN_CACHE = 'default'
+AUTH_TOKEN_CACHE_TIMEOUT = 300  # seconds
+
+# Generator results memoised by scheduler.solution_cache
+TIMETABLE_SOLUTION_CACHE = 'solutions'
+
+# Replaced timetable versions are deleted this long after the swap, by a
+# background thread started after each generation (scheduler.versions)
+TIMETABLE_VERSION_RETENTION = 60  # seconds
+TIMETABLE_VERSION_GC_IN_BACKGROUND = True
+
+# Utilisation analytics, cached per timetable version (scheduler.analytics)
+TIMETABLE_ANALYTICS_CACHE = 'default'
+TIMETABLE_ANALYTICS_CACHE_TIMEOUT = 3600  # seconds
+
+# Idempotency-Key handling of the setup and generation POSTs (scheduler.idempotency).
+# Use a cache shared by every worker process in multi-process deployments
+IDEMPOTENCY_CACHE = 'default'
+IDEMPOTENCY_KEY_TTL = 24 * 3600  # seconds a finished request's response is replayed for
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT = 900  # seconds before the marker of a lost request expires
+IDEMPOTENCY_WAIT_TIMEOUT = 600  # seconds a duplicate waits for the in-progress request
+
+# Responses at least this large are brotli/gzip compressed (scheduler.responses)
+RESPONSE_COMPRESSION_MIN_BYTES = 1024
+RESPONSE_BROTLI_QUALITY = 4
+RESPONSE_GZIP_LEVEL = 6
+
 CORS_ALLOW_ALL_ORIGINS = True  # For development only!
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
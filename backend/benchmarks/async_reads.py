@@ -0,0 +1,60 @@
+"""Compare the sync DRF read endpoints with their async twins under concurrent load.
+
+Start the backend under ASGI, then point this script at it:
+
+    uvicorn backend.asgi:application --port 8001 --workers 1
+    python benchmarks/async_reads.py --base-url http://127.0.0.1:8001 \
+        --token <api token> --section 1 --concurrency 1,16,64 --requests 2000
+
+Under ASGI Django runs sync views one at a time on a single thread per
+worker, while the async views run on the event loop, so the gap widens as
+concurrency grows. Both sets of endpoints return identical payloads.
+"""
+import argparse
+import asyncio
+from httpbench import print_table, run_load
+
+ENDPOINTS = [
+    # (label, sync path, async path)
+    ('view', '/timetable/view/{section}/', '/timetable/async/view/{section}/'),
+    ('list', '/timetable/list/', '/timetable/async/list/'),
+    ('navigation', '/timetable/navigation/{section}/', '/timetable/async/navigation/{section}/'),
+    ('setup status', '/timetable/setup/status/', '/timetable/async/setup/status/'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--token', required=True, help="API token of an existing user")
+    parser.add_argument('--section', type=int, default=1, help="Section id with a generated timetable")
+    parser.add_argument('--concurrency', default='1,16,64', help="Comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint and level")
+    args = parser.parse_args()
+
+    headers = {'Authorization': f'Token {args.token}'}
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    for level in levels:
+        rows = []
+        for label, sync_path, async_path in ENDPOINTS:
+            for mode, path in (('sync', sync_path), ('async', async_path)):
+                path = path.format(section=args.section)
+                results, elapsed = asyncio.run(run_load(
+                    args.base_url,
+                    lambda worker, n, path=path, mode=mode: (f"{label} [{mode}]", 'GET', path, headers, None),
+                    concurrency=level, total_requests=args.requests,
+                ))
+                rows.extend(results.summary(elapsed))
+        print_table(rows, title=f"Concurrency {level}")
+
+        by_label = {row['endpoint']: row['rps'] for row in rows}
+        for label, _, _ in ENDPOINTS:
+            sync_rps = by_label.get(f"{label} [sync]", 0)
+            async_rps = by_label.get(f"{label} [async]", 0)
+            if sync_rps:
+                print(f"  {label}: async/sync throughput x{async_rps / sync_rps:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Minimal asyncio HTTP/1.1 load generator shared by the benchmark scripts.
+
+Only the standard library is used so the benchmarks run anywhere the
+backend does. Each worker keeps one keep-alive connection open and issues
+requests back to back; latencies are collected per label.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection (reconnects after the server closes it)"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=None):
+        """Send one request and return (status, headers dict, body bytes)"""
+        payload = b''
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive",
+                 f"Content-Length: {len(payload)}"]
+        if body is not None and not isinstance(body, bytes):
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+        for attempt in (1, 2):
+            if self.writer is None:
+                await self._connect()
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _read_response(self):
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode('latin-1').split("\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).strip().split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304):
+            body = b''
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Results:
+    """Latencies (seconds), status counts and byte totals grouped by label"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.bytes = {}
+
+    def record(self, label, seconds, status, size):
+        self.latencies.setdefault(label, []).append(seconds)
+        self.bytes[label] = self.bytes.get(label, 0) + size
+        if status >= 400:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, elapsed):
+        rows = []
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            rows.append({
+                'endpoint': label,
+                'requests': len(values),
+                'errors': self.errors.get(label, 0),
+                'rps': len(values) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(values, 0.50) * 1000,
+                'p95_ms': percentile(values, 0.95) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+                'avg_bytes': self.bytes[label] / len(values),
+            })
+        return rows
+
+
+async def run_load(base_url, next_request, concurrency, total_requests=None, duration=None, on_response=None):
+    """Drive ``concurrency`` workers until ``total_requests`` are sent or ``duration`` seconds pass.
+
+    ``next_request(worker, n)`` returns (label, method, path, headers, body),
+    or None to stop that worker. ``on_response(worker, label, status, body)``,
+    if given, sees every response. Returns (Results, elapsed seconds).
+    """
+    results = Results()
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(worker_id):
+        nonlocal issued
+        connection = HttpConnection(base_url)
+        n = 0
+        try:
+            while True:
+                if total_requests is not None and issued >= total_requests:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                spec = next_request(worker_id, n)
+                if spec is None:
+                    return
+                issued += 1
+                n += 1
+                label, method, path, headers, body = spec
+                started = time.perf_counter()
+                try:
+                    status, _, payload = await connection.request(method, path, headers, body)
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    status, payload = 599, b''
+                results.record(label, time.perf_counter() - started, status, len(payload))
+                if on_response is not None:
+                    on_response(worker_id, label, status, payload)
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def print_table(rows, title=None):
+    if title:
+        print(f"\n{title}")
+    print(f"{'endpoint':<34}{'reqs':>7}{'errs':>6}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['endpoint']:<34}{row['requests']:>7}{row['errors']:>6}{row['rps']:>10.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
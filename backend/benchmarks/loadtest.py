@@ -0,0 +1,284 @@
+"""Mixed-traffic load test: how many concurrent users before reads and generation degrade.
+
+Run the backend against a scratch database, then point this script at it:
+
+    python manage.py migrate
+    export PROMETHEUS_MULTIPROC_DIR=$(mktemp -d)   # lets /metrics merge the workers' samples
+    uvicorn backend.asgi:application --port 8001 --workers 4
+    python benchmarks/loadtest.py --base-url http://127.0.0.1:8001 --users 10,50,100 --duration 30
+
+It first builds a synthetic institution through the public API (an owner
+account, institute setup with rooms and faculty, and an academic setup of
+--semesters x --sections sections with --subjects subjects each, which also
+generates the first timetable) and registers one account per virtual user.
+Each virtual user then loops over a weighted mix of login, setup status,
+list, navigation and per-section views; the owner's account occasionally
+resubmits the academic setup, which regenerates the timetable (at most one
+generation in flight). For every concurrency level it prints throughput and
+p50/p95/p99 latency per endpoint, and the database queries each endpoint ran,
+read from the server's /metrics before and after the level. Query counts are
+left out (with a warning) when /metrics saw fewer requests than were sent,
+which is what a multi-worker server without PROMETHEUS_MULTIPROC_DIR reports.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from httpbench import HttpConnection, print_table, run_load
+
+PASSWORD = 'load-test-password'
+
+# (label, weight) of the read mix; generations are drawn separately
+TRAFFIC_MIX = [
+    ('login', 5),
+    ('setup status', 10),
+    ('list', 15),
+    ('navigation', 15),
+    ('view', 55),
+]
+
+METRIC_LINE = re.compile(r'^timetable_http_request_db_queries_(sum|count)\{endpoint="([^"]*)"\} ([0-9.e+]+)$')
+
+
+def synthetic_setup(semesters, sections, subjects, prefix):
+    """Institute and academic payloads sized so every session fits (one faculty member per subject)"""
+    section_names = [chr(ord('A') + i) for i in range(sections)]
+    total_sessions = semesters * sections * subjects * 3
+    classrooms = max(2, -(-total_sessions // 30) + 2)
+    institute = {
+        "institute": {"name": f"{prefix} College", "course": f"{prefix.upper()}-MCA", "academicYear": "2025",
+                      "workingDays": 5, "periodsPerDay": 6, "periodDuration": 60},
+        "rooms": [{"name": f"Room {i + 1}", "isLab": False} for i in range(classrooms)]
+        + [{"name": f"Lab {i + 1}", "isLab": True} for i in range(2)],
+        "faculties": [{"name": f"Faculty {s}-{j}", "empId": f"{prefix}-E{s}-{j}", "maxHours": 18}
+                      for s in range(1, semesters + 1) for j in range(subjects)],
+    }
+    academic = {"academics": [{
+        "semester": s,
+        "sections": section_names,
+        # Subject codes come from the first 10 characters of the name, so keep those unique
+        "subjects": [{"name": f"S{s}-{j} Subject", "faculty": f"Faculty {s}-{j}", "weeklyHours": 3,
+                      "isLab": False, "labHours": 0} for j in range(subjects)],
+    } for s in range(1, semesters + 1)]}
+    return institute, academic
+
+
+async def _call(connection, method, path, body=None, token=None):
+    headers = {'Authorization': f'Token {token}'} if token else {}
+    status, _, payload = await connection.request(method, path, headers, body)
+    try:
+        return status, json.loads(payload or b'null')
+    except ValueError:
+        return status, payload
+
+
+async def account(connection, username):
+    """Register ``username`` (or log in if it exists) and return its token"""
+    status, data = await _call(connection, 'POST', '/timetable/auth/register/', {
+        "username": username, "password": PASSWORD, "fullName": f"Load {username}",
+        "email": f"{username}@loadtest.invalid",
+    })
+    if status != 201:
+        status, data = await _call(connection, 'POST', '/timetable/auth/login/',
+                                   {"username": username, "password": PASSWORD})
+    if status != 200 and status != 201:
+        raise SystemExit(f"Could not sign in {username}: {status} {data}")
+    return data['token']
+
+
+async def prepare(base_url, args):
+    """Build the synthetic institution and the virtual users; returns the shared state"""
+    connection = HttpConnection(base_url)
+    try:
+        owner = await account(connection, f"{args.prefix}-owner")
+        institute, academic = synthetic_setup(args.semesters, args.sections, args.subjects, args.prefix)
+        status, data = await _call(connection, 'POST', '/timetable/setup/institute/', institute, owner)
+        if status != 200:
+            raise SystemExit(f"Institute setup failed: {status} {data}")
+        status, data = await _call(connection, 'POST', '/timetable/setup/academic/', academic, owner)
+        if status != 200:
+            raise SystemExit(f"Academic setup failed: {status} {data}")
+        print(f"Synthetic setup: {args.semesters * args.sections} sections, "
+              f"{data['stats']['scheduled']} sessions")
+
+        tokens = [await account(connection, f"{args.prefix}-user-{i}") for i in range(max(args.levels))]
+        state = {"owner": owner, "tokens": tokens, "academic": academic, "generating": False, "generations": 0}
+        await refresh_sections(connection, state)
+        return state
+    finally:
+        await connection.close()
+
+
+async def refresh_sections(connection, state):
+    # Section ids change every time the academic setup is resubmitted
+    status, data = await _call(connection, 'GET', '/timetable/list/', token=state["owner"])
+    state["sections"] = [row['id'] for row in data['timetables']] if status == 200 else []
+
+
+async def query_totals(base_url):
+    """{route: (queries, requests)} from the server's /metrics"""
+    connection = HttpConnection(base_url)
+    try:
+        status, _, payload = await connection.request('GET', '/metrics')
+    finally:
+        await connection.close()
+    totals = {}
+    if status != 200:
+        return totals
+    for line in payload.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            kind, route, value = match.groups()
+            queries, requests = totals.get(route, (0.0, 0.0))
+            totals[route] = (queries + float(value), requests) if kind == 'sum' else (queries, requests + float(value))
+    return totals
+
+
+def traffic(state, args):
+    """next_request/on_response pair for run_load implementing the virtual users, plus settle()"""
+    labels = [label for label, _ in TRAFFIC_MIX]
+    weights = [weight for _, weight in TRAFFIC_MIX]
+    rngs = {}
+    refreshes = set()
+
+    async def reload_sections():
+        connection = HttpConnection(args.base_url)
+        try:
+            await refresh_sections(connection, state)
+        finally:
+            await connection.close()
+            # The next generation may start once the readers have the new ids
+            state["generating"] = False
+
+    def next_request(worker, n):
+        rng = rngs.setdefault(worker, random.Random(args.seed * 1000 + worker))
+        token = state["tokens"][worker % len(state["tokens"])]
+        headers = {'Authorization': f'Token {token}'}
+        if not state["generating"] and rng.random() < args.generation_rate:
+            state["generating"] = True
+            state["generations"] += 1
+            academic = json.loads(json.dumps(state["academic"]))
+            if not args.cached_generations:
+                # A new subject name changes the problem hash, so the solver really runs
+                academic["academics"][0]["subjects"][0]["name"] += f" v{state['generations']}"
+            return ('generation', 'POST', '/timetable/setup/academic/',
+                    {'Authorization': f'Token {state["owner"]}'}, academic)
+
+        label = rng.choices(labels, weights)[0]
+        if not state["sections"] and label in ('navigation', 'view'):
+            label = 'list'  # the section ids are being re-read after a generation
+        section = rng.choice(state["sections"]) if state["sections"] else None
+        if label == 'login':
+            username = f"{args.prefix}-user-{worker % len(state['tokens'])}"
+            return label, 'POST', '/timetable/auth/login/', {}, {"username": username, "password": PASSWORD}
+        path = {
+            'setup status': '/timetable/setup/status/',
+            'list': '/timetable/list/',
+            'navigation': f'/timetable/navigation/{section}/',
+            'view': f'/timetable/view/{section}/',
+        }[label]
+        return label, 'GET', path, headers, None
+
+    def on_response(worker, label, status, body):
+        if label != 'generation':
+            return
+        if status != 200:
+            state["generating"] = False
+            return
+        # Sections are recreated on every resubmission: re-read their ids from the list endpoint
+        state["sections"] = []
+        task = asyncio.get_running_loop().create_task(reload_sections())
+        refreshes.add(task)
+        task.add_done_callback(refreshes.discard)
+
+    async def settle():
+        """Wait for section refreshes still in flight when the level ends"""
+        await asyncio.gather(*refreshes)
+
+    return next_request, on_response, settle
+
+
+async def run_level(base_url, state, args, users):
+    before = await query_totals(base_url)
+    next_request, on_response, settle = traffic(state, args)
+    results, elapsed = await run_load(base_url, next_request, concurrency=users,
+                                      duration=args.duration, on_response=on_response)
+    await settle()
+    after = await query_totals(base_url)
+    rows = results.summary(elapsed)
+    queries = {}
+    for route, (total, requests) in after.items():
+        old_total, old_requests = before.get(route, (0.0, 0.0))
+        if requests > old_requests:
+            queries[route] = {"requests": int(requests - old_requests), "queries": int(total - old_total),
+                              "per_request": (total - old_total) / (requests - old_requests)}
+    # Each worker counts only its own requests unless the server merges them,
+    # in which case the two snapshots may even come from different workers
+    sent = sum(row['requests'] for row in rows)
+    counted = sum(totals["requests"] for totals in queries.values())
+    if counted < sent:
+        return rows, None, elapsed, (sent, counted)
+    return rows, queries, elapsed, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--users', default='10,50,100', help="Comma-separated concurrent user counts")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds per level")
+    parser.add_argument('--semesters', type=int, default=4)
+    parser.add_argument('--sections', type=int, default=4, help="Sections per semester (at most 6)")
+    parser.add_argument('--subjects', type=int, default=6, help="Subjects per semester")
+    parser.add_argument('--generation-rate', type=float, default=0.002,
+                        help="Chance that a request is a generation (one in flight at a time)")
+    parser.add_argument('--cached-generations', action='store_true',
+                        help="Resubmit the identical setup, so generations are served from the solution cache")
+    parser.add_argument('--p95-budget-ms', type=float, default=250,
+                        help="p95 above which a read endpoint counts as degraded")
+    parser.add_argument('--generation-p95-budget-ms', type=float, default=10000,
+                        help="p95 above which generation counts as degraded")
+    parser.add_argument('--prefix', default='loadtest', help="Username/course prefix of the synthetic data")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write every level's report as JSON to this file")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.users.split(',')]
+    if not 1 <= args.sections <= 6:
+        parser.error("--sections must be between 1 and 6 (each faculty member teaches 3 hours per section)")
+    if not 1 <= args.subjects <= 10:
+        parser.error("--subjects must be between 1 and 10 (3 hours each in a 30-period week)")
+
+    state = asyncio.run(prepare(args.base_url, args))
+    report = []
+    for users in args.levels:
+        rows, queries, elapsed, undercount = asyncio.run(run_level(args.base_url, state, args, users))
+        print_table(rows, title=f"{users} concurrent users, {elapsed:.1f}s")
+        total = sum(row['requests'] for row in rows)
+        print(f"  {total / elapsed:.1f} req/s overall")
+        if undercount:
+            print(f"  warning: /metrics counted {undercount[1]} of the {undercount[0]} requests sent, so the server's "
+                  f"workers are not merging their metrics (start them with PROMETHEUS_MULTIPROC_DIR set); "
+                  f"query counts omitted")
+        for route, totals in sorted((queries or {}).items()):
+            print(f"  {route:<44}{totals['queries']:>9} queries ({totals['per_request']:.1f}/request)")
+        # Login is left out: password hashing dominates it by design
+        degraded = [row['endpoint'] for row in rows if row['endpoint'] != 'login' and row['p95_ms'] > (
+            args.generation_p95_budget_ms if row['endpoint'] == 'generation' else args.p95_budget_ms)]
+        if degraded:
+            print(f"  p95 over budget: {', '.join(degraded)}")
+        report.append({"users": users, "elapsed": elapsed, "endpoints": rows, "queries": queries,
+                       "degraded": degraded})
+
+    saturated = next((level for level in report if level["degraded"]), None)
+    if saturated:
+        print(f"\nDegraded from {saturated['users']} concurrent users ({', '.join(saturated['degraded'])})")
+    else:
+        print(f"\nNo endpoint exceeded its p95 budget up to {args.levels[-1]} users")
+
+    if args.output:
+        with open(args.output, 'w') as fileobj:
+            json.dump(report, fileobj, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Compare the expanded and compact timetable payloads: serialisation time and size on the wire.
+
+Runs without a server or database, on synthetic grid documents:
+
+    python benchmarks/payload_formats.py --sections 24 50 200
+
+For each batch size it serialises the ``/timetable/view/batch/`` payload the
+way the endpoint does (the expanded session lists through DRF's
+JSONRenderer, the ``?layout=compact`` tables and matrices through orjson)
+and reports the median time, the raw size and the size after gzip and
+brotli compression (as scheduler.responses.CompressionMiddleware applies
+them).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import orjson  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from scheduler.grids import compact_grid_documents, expand_grid_document  # noqa: E402
+from scheduler.responses import compress_body  # noqa: E402
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def synthetic_documents(sections, periods, fill, seed):
+    """Grid documents (SectionTimetableGrid.document layout) for ``sections`` sections"""
+    rng = random.Random(seed)
+    documents = []
+    for number in range(sections):
+        semester = number // 6
+        subjects = {str(semester * 10 + j): f"Semester {semester + 1} Subject {j + 1}" for j in range(8)}
+        faculty = {str(semester * 10 + j): f"Prof. Faculty Member {semester * 10 + j}" for j in range(8)}
+        rooms = {str(r): f"Room {r}" if r < 40 else f"Lab {r - 39}" for r in range(1, 46)}
+        grid = []
+        for _ in DAYS:
+            row = []
+            for _ in range(periods):
+                if rng.random() >= fill:
+                    row.append(None)
+                    continue
+                subject = rng.choice(list(subjects))
+                room = rng.choice(list(rooms))
+                row.append([int(subject), int(subject), int(room), int(room) >= 40])
+            grid.append(row)
+        documents.append({
+            "section": chr(ord('A') + number % 6),
+            "days": DAYS,
+            "periods": [str(p) for p in range(1, periods + 1)],
+            "subjects": subjects,
+            "faculty": faculty,
+            "rooms": rooms,
+            "grid": grid,
+        })
+    return documents
+
+
+def expanded_payload(documents):
+    sections = []
+    for number, document in enumerate(documents):
+        expanded = expand_grid_document(document)
+        sections.append({"id": number + 1, "name": document["section"], "semester": number // 6 + 1,
+                         "course": "MCA", "timetable": expanded["timetable"]})
+    return {"days": DAYS, "periods": documents[0]["periods"], "sections": sections, "missing": []}
+
+
+def compact_payload(documents):
+    compact = compact_grid_documents(documents)
+    compact["sections"] = [{"id": number + 1, "name": document["section"], "semester": number // 6 + 1,
+                            "course": "MCA", "grid": encoded["grid"]}
+                           for number, (document, encoded) in enumerate(zip(documents, compact["sections"]))]
+    return {"days": DAYS, "periods": documents[0]["periods"], **compact, "missing": []}
+
+
+def measure(build, serialise, documents, repeat):
+    """(median seconds to build and serialise, body)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = serialise(build(documents))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, nargs='+', default=[24, 50, 200], help="Batch sizes")
+    parser.add_argument('--periods', type=int, default=7, help="Periods per day")
+    parser.add_argument('--fill', type=float, default=0.8, help="Share of periods with a session")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    renderer = JSONRenderer()
+    formats = [
+        ('expanded (DRF)', expanded_payload, renderer.render),
+        ('compact (orjson)', compact_payload, orjson.dumps),
+    ]
+    print(f"{'sections':>8}  {'format':<18}{'serialise ms':>13}{'raw KB':>10}{'gzip KB':>10}{'br KB':>10}")
+    for sections in args.sections:
+        documents = synthetic_documents(sections, args.periods, args.fill, args.seed)
+        baseline = None
+        for label, build, serialise in formats:
+            seconds, body = measure(build, serialise, documents, args.repeat)
+            gzip_encoding, gzipped = compress_body(body, 'gzip')
+            br_encoding, brotlied = compress_body(body, 'br')
+            br_size = f"{len(brotlied) / 1024:>10.1f}" if br_encoding == 'br' else f"{'n/a':>10}"
+            print(f"{sections:>8}  {label:<18}{seconds * 1000:>13.2f}{len(body) / 1024:>10.1f}"
+                  f"{len(gzipped) / 1024:>10.1f}{br_size}")
+            if baseline is None:
+                baseline = (seconds, len(body))
+            else:
+                print(f"{'':>10}compact vs expanded: x{baseline[0] / seconds:.1f} faster, "
+                      f"{100 * (1 - len(body) / baseline[1]):.0f}% smaller before compression")
+
+
+if __name__ == '__main__':
+    main()
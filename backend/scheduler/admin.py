@@ -1,17 +1,237 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .conditional import bump_generation_version
+from .grids import refresh_section_grids, sections_of
 from .models import (
     Course, Semester, Section, Subject, Faculty,
     FacultySubjectAllocation, Room, InstitutionSettings,
-    TimetableSlot, ScheduledSession
+    TimetableSlot, ScheduledSession,
+    TimetableVersion, CurrentTimetable
 )
+from .versions import current_version
 
-admin.site.register(Course)
-admin.site.register(Semester)
-admin.site.register(Section)
-admin.site.register(Subject)
-admin.site.register(Faculty)
-admin.site.register(FacultySubjectAllocation)
-admin.site.register(Room)
-admin.site.register(InstitutionSettings)
-admin.site.register(TimetableSlot)
-admin.site.register(ScheduledSession)
+
+class EstimatedCountPaginator(Paginator):
+    """Uses PostgreSQL's row estimate instead of COUNT(*) for unfiltered large tables.
+
+    Filtered changelists (which go through indexed columns) and small tables
+    still get an exact count.
+    """
+    EXACT_COUNT_BELOW = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.EXACT_COUNT_BELOW:
+                return row[0]
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Sidebar filter with a text box instead of a list of choices (nothing is queried to draw it)"""
+    template = 'admin/scheduler/input_filter.html'
+    lookup = None  # field lookup the typed value is matched exactly against
+
+    def lookups(self, request, model_admin):
+        # A placeholder choice, so the admin shows the filter at all
+        return ((None, None),)
+
+    def choices(self, changelist):
+        # Only the "All" link, plus the other active filters for the form to carry along
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (key, value)
+            for key, values in changelist.get_filters_params().items() if key != self.parameter_name
+            for value in (values if isinstance(values, list) else [values])
+        ]
+        yield all_choice
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if value:
+            return queryset.filter(**{self.lookup: value})
+        return queryset
+
+
+class FacultyEmployeeIdFilter(InputFilter):
+    title = 'faculty employee ID'
+    parameter_name = 'faculty_employee_id'
+    lookup = 'faculty__employee_id'
+
+
+class RoomNameFilter(InputFilter):
+    title = 'room name'
+    parameter_name = 'room_name'
+    lookup = 'room__name'
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code')
+    search_fields = ('name', 'code')
+
+
+@admin.register(Semester)
+class SemesterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'number', 'course')
+    list_select_related = ('course',)
+    list_filter = ('number',)
+    search_fields = ('name', 'course__name')
+    autocomplete_fields = ('course',)
+
+    def get_queryset(self, request):
+        # __str__ follows the course (also used by autocomplete results)
+        return super().get_queryset(request).select_related('course')
+
+
+@admin.register(Section)
+class SectionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'semester')
+    list_select_related = ('semester__course',)
+    search_fields = ('name', 'semester__course__name')
+    autocomplete_fields = ('semester',)
+    ordering = ('semester', 'name')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('semester__course')
+
+
+@admin.register(Subject)
+class SubjectAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code', 'semester', 'weekly_hours', 'lab_required')
+    list_select_related = ('semester__course',)
+    list_filter = ('lab_required',)
+    search_fields = ('name', 'code')
+    autocomplete_fields = ('semester',)
+
+
+class SessionOwnerAdmin(admin.ModelAdmin):
+    """Keeps the section grids in step when deleting rows cascades onto scheduled sessions"""
+    session_field = None  # ScheduledSession foreign key pointing at this model
+
+    def _affected_sections(self, pks):
+        return sections_of(ScheduledSession.objects.filter(**{f"{self.session_field}__in": pks}))
+
+    def _refresh_grids(self, sections):
+        if sections:
+            refresh_section_grids(sections)
+            bump_generation_version()
+
+    def delete_model(self, request, obj):
+        sections = self._affected_sections([obj.pk])
+        super().delete_model(request, obj)
+        self._refresh_grids(sections)
+
+    def delete_queryset(self, request, queryset):
+        sections = self._affected_sections(list(queryset.values_list('pk', flat=True)))
+        super().delete_queryset(request, queryset)
+        self._refresh_grids(sections)
+
+
+@admin.register(Faculty)
+class FacultyAdmin(SessionOwnerAdmin):
+    session_field = 'faculty'
+    list_display = ('name', 'employee_id', 'max_hours_per_week', 'max_hours_per_day', 'created_by')
+    list_select_related = ('created_by',)
+    search_fields = ('name', 'employee_id')
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(FacultySubjectAllocation)
+class FacultySubjectAllocationAdmin(admin.ModelAdmin):
+    list_display = ('faculty', 'subject')
+    list_select_related = ('faculty', 'subject')
+    search_fields = ('faculty__name', 'faculty__employee_id', 'subject__name')
+    autocomplete_fields = ('faculty', 'subject')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Room)
+class RoomAdmin(SessionOwnerAdmin):
+    session_field = 'room'
+    list_display = ('name', 'is_lab', 'created_by')
+    list_select_related = ('created_by',)
+    list_filter = ('is_lab',)
+    search_fields = ('name',)
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(InstitutionSettings)
+class InstitutionSettingsAdmin(admin.ModelAdmin):
+    list_display = ('institution_name', 'course', 'academic_year', 'working_days', 'periods_per_day', 'created_by')
+    list_select_related = ('created_by',)
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(TimetableSlot)
+class TimetableSlotAdmin(admin.ModelAdmin):
+    list_display = ('day', 'period_number')
+    list_filter = ('day',)
+    ordering = ('day', 'period_number')
+
+
+@admin.register(ScheduledSession)
+class ScheduledSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'section', 'subject', 'faculty', 'room', 'slot', 'is_lab_session', 'version_id')
+    list_select_related = ('section__semester__course', 'subject', 'faculty', 'room', 'slot')
+    # Typed-in filters (no Room/Faculty choice lists to load); the matched faculty
+    # member or room is then looked up through the (faculty, slot) / (room, slot) indexes
+    list_filter = (FacultyEmployeeIdFilter, RoomNameFilter)
+    search_fields = ('=faculty__employee_id', '=section__name', 'subject__name')
+    autocomplete_fields = ('section', 'subject', 'faculty', 'room')
+    raw_id_fields = ('slot', 'version')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def _refresh_grids(self, request, sections):
+        # Keep the materialised section grids and the ETag version in step with hand edits
+        refresh_section_grids(sections)
+        bump_generation_version()
+
+    def save_model(self, request, obj, form, change):
+        previous = ScheduledSession.objects.filter(pk=obj.pk).values_list('section_id', flat=True).first()
+        if obj.version_id is None:
+            # Hand-made sessions join the timetable readers currently see
+            obj.version = current_version(obj.section.semester.course_id, request.user)
+        super().save_model(request, obj, form, change)
+        sections = {obj.section}
+        if previous and previous != obj.section_id:
+            sections.add(Section.objects.get(pk=previous))
+        self._refresh_grids(request, sections)
+
+    def delete_model(self, request, obj):
+        section = obj.section
+        super().delete_model(request, obj)
+        self._refresh_grids(request, [section])
+
+    def delete_queryset(self, request, queryset):
+        sections = list(Section.objects.filter(pk__in=queryset.values('section_id')))
+        super().delete_queryset(request, queryset)
+        self._refresh_grids(request, sections)
+
+
+@admin.register(TimetableVersion)
+class TimetableVersionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'course', 'owner', 'created_at', 'retired_at')
+    list_select_related = ('course', 'owner')
+    list_filter = ('course',)
+    raw_id_fields = ('owner',)
+
+
+@admin.register(CurrentTimetable)
+class CurrentTimetableAdmin(admin.ModelAdmin):
+    list_display = ('course', 'version')
+    list_select_related = ('course', 'version')
+    raw_id_fields = ('version',)
@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import time
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from .grids import grid_axes
+from .metrics import record_cache_lookup
+from .models import CurrentTimetable, Faculty, Room, ScheduledSession, Section, TimetableSlot
+
+logger = logging.getLogger(__name__)
+
+DAY_NAMES = dict(TimetableSlot._meta.get_field('day').choices)
+
+# Utilisation analytics of the stored timetable. Three GROUP BY queries count
+# the current sessions per (room | faculty | section, day, period); the counts
+# land in entity × day × period NumPy arrays, from which the heatmaps, load
+# distributions and idle-slot figures are reductions along an axis. Results
+# are cached per timetable version (see analytics_cache_key).
+
+ANALYTICS_CACHE_PREFIX = 'timetable-analytics:'
+UTILISATION_BUCKETS = (0, 25, 50, 75, 90, 100)  # histogram edges, in percent of max_hours_per_week
+
+
+def _load_counts(sessions, field, entity_pos, day_pos, period_pos):
+    """Sessions per entity × day × period from one aggregate query"""
+    counts = np.zeros((len(entity_pos), len(day_pos), len(period_pos)), dtype=np.int32)
+    rows = (sessions.values_list(field, 'slot__day', 'slot__period_number')
+            .annotate(sessions=Count('id'))
+            .order_by())
+    cells = [(entity_pos[entity], day_pos[day], period_pos[period], n)
+             for entity, day, period, n in rows
+             if entity in entity_pos and day in day_pos and period in period_pos]
+    if cells:
+        entity, day, period, n = np.array(cells, dtype=np.int64).T
+        np.add.at(counts, (entity, day, period), n)
+    return counts
+
+
+def _percent(numerator, denominator):
+    return round(100.0 * numerator / denominator, 1) if denominator else None
+
+
+def _idle_slots(occupied):
+    """Free periods between the first and last session of each day (entity × day)"""
+    periods = occupied.shape[-1]
+    busy = occupied.any(axis=-1)
+    first = occupied.argmax(axis=-1)
+    last = periods - 1 - occupied[..., ::-1].argmax(axis=-1)
+    return np.where(busy, last - first + 1 - occupied.sum(axis=-1), 0)
+
+
+def _room_analytics(counts, rooms, slot_mask):
+    occupied = counts > 0
+    available = int(slot_mask.sum())
+    in_use = occupied.sum(axis=0)
+    return {
+        # Rooms in use per day × period, as a count and as a share of all rooms
+        "heatmap": in_use.tolist(),
+        "heatmap_percent": np.round(100.0 * in_use / max(len(rooms), 1), 1).tolist(),
+        "utilisation_percent": _percent(int(occupied.sum()), available * len(rooms)),
+        "rooms": [{
+            "id": room.id,
+            "name": room.name,
+            "is_lab": room.is_lab,
+            "occupancy": counts[i].tolist(),  # sessions per day × period (above 1 = double booked)
+            "sessions": int(counts[i].sum()),
+            "utilisation_percent": _percent(int(occupied[i].sum()), available),
+            "idle_slots": available - int(occupied[i].sum()),
+        } for i, room in enumerate(rooms)],
+    }
+
+
+def _faculty_analytics(counts, faculty):
+    hours = counts.sum(axis=(1, 2))
+    per_day = counts.sum(axis=2)
+    limits = np.array([member.max_hours_per_week for member in faculty], dtype=np.float64)
+    utilisation = np.divide(100.0 * hours, limits, out=np.zeros(len(faculty)), where=limits > 0)
+    edges = np.array(UTILISATION_BUCKETS + (np.inf,), dtype=np.float64)
+    histogram, _ = np.histogram(utilisation, bins=edges)
+    labels = [f"{low}-{high}%" for low, high in zip(UTILISATION_BUCKETS, UTILISATION_BUCKETS[1:])] + ["100% or more"]
+
+    return {
+        "distribution": {
+            "mean_percent": round(float(utilisation.mean()), 1) if len(faculty) else None,
+            "median_percent": round(float(np.median(utilisation)), 1) if len(faculty) else None,
+            "histogram": dict(zip(labels, histogram.tolist())),
+        },
+        "faculty": [{
+            "id": member.id,
+            "name": member.name,
+            "employee_id": member.employee_id,
+            "hours": int(hours[i]),
+            "max_hours_per_week": member.max_hours_per_week,
+            "utilisation_percent": _percent(int(hours[i]), member.max_hours_per_week),
+            "hours_per_day": per_day[i].tolist(),
+            "days_over_daily_limit": int((per_day[i] > member.max_hours_per_day).sum()),
+            "idle_slots": int(_idle_slots(counts[i] > 0).sum()),
+        } for i, member in enumerate(faculty)],
+    }
+
+
+def _section_analytics(counts, sections, slot_mask):
+    occupied = counts > 0
+    idle = _idle_slots(occupied)
+    available = int(slot_mask.sum())
+    return {
+        "sessions_per_day": counts.sum(axis=(0, 2)).tolist(),
+        "sections": [{
+            "id": section.id,
+            "name": section.name,
+            "semester": section.semester.number,
+            "course": section.semester.course.name,
+            "sessions_per_day": counts[i].sum(axis=1).tolist(),
+            "idle_slots_per_day": idle[i].tolist(),  # gaps between the day's first and last session
+            "idle_slots": int(idle[i].sum()),
+            "free_slots": available - int(occupied[i].sum()),
+        } for i, section in enumerate(sections)],
+    }
+
+
+def timetable_analytics(sessions=None):
+    """Room, faculty and section utilisation of the stored timetable.
+
+    Day × period matrices follow the ``days`` and ``periods`` axes of the
+    payload. Costs three aggregate queries plus one each for slots, rooms,
+    faculty and the sections that have sessions.
+    """
+    started = time.perf_counter()
+    sessions = ScheduledSession.current.all() if sessions is None else sessions
+
+    slots = list(TimetableSlot.objects.order_by('day', 'period_number'))
+    day_numbers, period_numbers = grid_axes(slots)
+    day_pos = {day: i for i, day in enumerate(day_numbers)}
+    period_pos = {period: i for i, period in enumerate(period_numbers)}
+    slot_mask = np.zeros((len(day_numbers), len(period_numbers)), dtype=bool)
+    for slot in slots:
+        slot_mask[day_pos[slot.day], period_pos[slot.period_number]] = True
+
+    rooms = list(Room.objects.order_by('name', 'id'))
+    faculty = list(Faculty.objects.order_by('name', 'id'))
+    room_counts = _load_counts(sessions, 'room_id', {room.id: i for i, room in enumerate(rooms)}, day_pos, period_pos)
+    faculty_counts = _load_counts(sessions, 'faculty_id', {member.id: i for i, member in enumerate(faculty)},
+                                  day_pos, period_pos)
+
+    sections = list(Section.objects.filter(pk__in=sessions.values('section_id'))
+                    .select_related('semester__course').order_by('semester__course__name', 'semester__number', 'name'))
+    section_counts = _load_counts(sessions, 'section_id', {section.id: i for i, section in enumerate(sections)},
+                                  day_pos, period_pos)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Timetable analytics computed in {elapsed * 1000:.1f}ms "
+                f"({len(rooms)} rooms, {len(faculty)} faculty, {len(sections)} sections)")
+    return {
+        "days": [DAY_NAMES.get(day, day) for day in day_numbers],
+        "periods": [str(period) for period in period_numbers],
+        "sessions": int(section_counts.sum()),
+        "rooms": _room_analytics(room_counts, rooms, slot_mask),
+        "faculty": _faculty_analytics(faculty_counts, faculty),
+        "sections": _section_analytics(section_counts, sections, slot_mask),
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+
+def analytics_cache_key(generation_version):
+    """Key of the analytics for the current timetable versions at ``generation_version``.
+
+    New versions change the CurrentTimetable pointers; moves, swaps and admin
+    edits stay within a version but advance the generation counter.
+    """
+    pointers = CurrentTimetable.objects.order_by('course_id').values_list('course_id', 'version_id')
+    digest = hashlib.sha1(repr((generation_version, list(pointers))).encode()).hexdigest()
+    return ANALYTICS_CACHE_PREFIX + digest
+
+
+def cached_timetable_analytics(generation_version):
+    """``timetable_analytics()`` memoised per timetable version"""
+    cache = caches[getattr(settings, 'TIMETABLE_ANALYTICS_CACHE', 'default')]
+    key = analytics_cache_key(generation_version)
+    analytics = cache.get(key)
+    record_cache_lookup('analytics', analytics is not None)
+    if analytics is None:
+        analytics = timetable_analytics()
+        cache.set(key, analytics, getattr(settings, 'TIMETABLE_ANALYTICS_CACHE_TIMEOUT', 3600))
+    return analytics
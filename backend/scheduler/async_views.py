@@ -0,0 +1,168 @@
+import logging
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from .conditional import async_conditional_timetable_view
+from .grids import compact_grid_document, expand_grid_document, rebuild_grid_document
+from .models import CurrentTimetable, Faculty, InstitutionSettings, Room, Section, SectionTimetableGrid
+from .responses import json_response, wants_compact
+from .token_auth import aauthenticate_token
+
+logger = logging.getLogger(__name__)
+
+# Async twins of the read-only endpoints in views.py. They are plain Django
+# async views (DRF function views are sync only), so under ASGI (uvicorn
+# backend.asgi:application) a worker can serve many concurrent reads instead
+# of one per WSGI thread. Responses match the sync endpoints.
+
+
+def async_login_required(view_func):
+    """Token (or session) authentication for async views, mirroring the DRF settings"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'token' and key.strip():
+            user = await aauthenticate_token(key.strip())
+            if user is None:
+                return JsonResponse({'detail': 'Invalid token.'}, status=401)
+        else:
+            user = await request.auser()
+            if not user.is_authenticated:
+                return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        request.user = user
+        return await view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+@require_GET
+@async_login_required
+@async_conditional_timetable_view
+async def view_timetable(request, section_id):
+    logger.info(f"Timetable view requested by user: {request.user.username} for section: {section_id}")
+
+    grid = await SectionTimetableGrid.objects.filter(pk=section_id).afirst()
+    if grid is not None:
+        document = grid.document
+    else:
+        section = await Section.objects.filter(id=section_id).afirst()
+        if section is None:
+            return JsonResponse({'error': 'Section not found'}, status=404)
+        document = await sync_to_async(rebuild_grid_document)(section)
+
+    if wants_compact(request.GET):
+        return json_response(compact_grid_document(document))
+    return JsonResponse(expand_grid_document(document))
+
+
+@require_GET
+@async_login_required
+@async_conditional_timetable_view
+async def list_timetables(request):
+    """List all available timetables"""
+    try:
+        sections = Section.objects.annotate(
+            sessions_count=Count('scheduledsession', filter=Q(
+                scheduledsession__version__in=CurrentTimetable.objects.values('version')
+            ))
+        ).filter(sessions_count__gt=0).select_related('semester__course').order_by('id')
+
+        timetables = [{
+            'id': section.id,
+            'name': section.name,
+            'semester': section.semester.number,
+            'course': section.semester.course.name,
+            'sessions_count': section.sessions_count
+        } async for section in sections]
+
+        logger.info(f"Listed {len(timetables)} timetables for user: {request.user.username}")
+        return JsonResponse({'timetables': timetables, 'total_count': len(timetables)})
+
+    except Exception as e:
+        logger.error(f"Error listing timetables: {str(e)}")
+        return JsonResponse({'error': 'Failed to fetch timetables'}, status=500)
+
+
+@require_GET
+@async_login_required
+@async_conditional_timetable_view
+async def get_section_navigation(request, section_id):
+    """Get navigation info for a specific section"""
+    try:
+        current_section = await Section.objects.select_related('semester').aget(id=section_id)
+
+        sections = Section.objects.filter(
+            scheduledsession__version__in=CurrentTimetable.objects.values('version'),
+            semester__course_id=current_section.semester.course_id
+        ).distinct().select_related('semester').order_by('semester__number', 'name')
+
+        navigation_data = [{
+            'id': section.id,
+            'name': section.name,
+            'semester': section.semester.number,
+            'display_name': f"Semester {section.semester.number} - Section {section.name}"
+        } async for section in sections]
+
+        return JsonResponse({
+            'current_section': {
+                'id': current_section.id,
+                'name': current_section.name,
+                'semester': current_section.semester.number
+            },
+            'all_sections': navigation_data
+        })
+
+    except Section.DoesNotExist:
+        return JsonResponse({'error': 'Section not found'}, status=404)
+    except Exception as e:
+        logger.error(f"Error getting section navigation: {str(e)}")
+        return JsonResponse({'error': 'Failed to fetch navigation data'}, status=500)
+
+
+@require_GET
+@async_login_required
+async def get_user_setup_status(request):
+    """Check if user has completed one-time setup"""
+    try:
+        user = request.user
+        institute = await InstitutionSettings.objects.filter(
+            created_by=user,
+            is_setup_complete=True
+        ).afirst()
+
+        institute_data = None
+        faculties_data = []
+        rooms_data = []
+
+        if institute:
+            institute_data = {
+                'name': institute.institution_name,
+                'academicYear': institute.academic_year,
+                'course': institute.course,
+                'workingDays': institute.working_days,
+                'periodsPerDay': institute.periods_per_day,
+                'periodDuration': institute.period_duration
+            }
+            faculties_data = [{
+                'name': f.name,
+                'empId': f.employee_id,
+                'maxHours': f.max_hours_per_week
+            } async for f in Faculty.objects.filter(created_by=user)]
+            rooms_data = [{
+                'name': r.name,
+                'isLab': r.is_lab
+            } async for r in Room.objects.filter(created_by=user)]
+
+        return JsonResponse({
+            'setup_complete': institute is not None,
+            'institute': institute_data,
+            'faculties': faculties_data,
+            'rooms': rooms_data
+        })
+
+    except Exception as e:
+        logger.error(f"Error checking setup status: {str(e)}")
+        return JsonResponse({'error': 'Failed to check setup status'}, status=500)
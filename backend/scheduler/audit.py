@@ -0,0 +1,72 @@
+import logging
+import time
+from django.db.models import Count, F
+from .models import ScheduledSession, TimetableSlot
+
+logger = logging.getLogger(__name__)
+
+DAY_NAMES = dict(TimetableSlot._meta.get_field('day').choices)
+
+# Integrity audit of the stored timetable. Each check is a single aggregate
+# query over ScheduledSession, so the audit costs a fixed number of queries
+# however many sessions there are, and catches conflicts introduced outside
+# the generator (e.g. hand edits in the Django admin).
+
+
+def _double_bookings(sessions, field, name_field):
+    """(entity, slot) pairs holding more than one session"""
+    rows = (sessions.values(field, name_field, 'slot__day', 'slot__period_number')
+            .annotate(sessions=Count('id'))
+            .filter(sessions__gt=1)
+            .order_by(field, 'slot__day', 'slot__period_number'))
+    return [{
+        "id": row[field],
+        "name": row[name_field],
+        "day": DAY_NAMES.get(row['slot__day'], row['slot__day']),
+        "period": row['slot__period_number'],
+        "sessions": row['sessions'],
+    } for row in rows]
+
+
+def audit_timetable(sessions=None):
+    """Run every check and return ``{ok, sessions, counts, conflicts, elapsed_ms}``"""
+    started = time.perf_counter()
+    sessions = ScheduledSession.current.all() if sessions is None else sessions
+
+    faculty_overruns = (sessions.values('faculty', 'faculty__name', 'faculty__max_hours_per_week')
+                        .annotate(hours=Count('id'))
+                        .filter(hours__gt=F('faculty__max_hours_per_week'))
+                        .order_by('faculty'))
+    lab_mismatches = (sessions.filter(is_lab_session=True, room__is_lab=False)
+                      .values('room', 'room__name')
+                      .annotate(sessions=Count('id'))
+                      .order_by('room'))
+
+    conflicts = {
+        "faculty_double_bookings": _double_bookings(sessions, 'faculty', 'faculty__name'),
+        "room_double_bookings": _double_bookings(sessions, 'room', 'room__name'),
+        "section_double_bookings": _double_bookings(sessions, 'section', 'section__name'),
+        "faculty_hour_overruns": [{
+            "id": row['faculty'],
+            "name": row['faculty__name'],
+            "hours": row['hours'],
+            "max_hours_per_week": row['faculty__max_hours_per_week'],
+        } for row in faculty_overruns],
+        "lab_room_mismatches": [{
+            "id": row['room'],
+            "name": row['room__name'],
+            "sessions": row['sessions'],
+        } for row in lab_mismatches],
+    }
+    counts = {kind: len(rows) for kind, rows in conflicts.items()}
+    total_sessions = sessions.count()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Timetable audit: {sum(counts.values())} conflicts over {total_sessions} sessions in {elapsed_ms:.1f} ms")
+    return {
+        "ok": not any(counts.values()),
+        "sessions": total_sessions,
+        "counts": counts,
+        "conflicts": conflicts,
+        "elapsed_ms": elapsed_ms,
+    }
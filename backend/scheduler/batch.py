@@ -0,0 +1,144 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.db import connections
+from .models import Course, InstitutionSettings
+from .timetable_generator import generate_timetable
+
+logger = logging.getLogger(__name__)
+
+# Fan-out of timetable generation over many institutions. Each institution
+# (an InstitutionSettings row) is regenerated for its own course as a new
+# timetable version (see versions.py), so a failure in one leaves the others
+# and the course's current timetable untouched. Institutions
+# are assumed to be independent, i.e. not to share faculty or rooms; two
+# institutions naming the same course would race for that course's current
+# version, so only the first of them (lowest id) is regenerated in a batch.
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+def resolve_course(settings):
+    """The one Course named by ``settings.course`` (ValueError when there is none or several)"""
+    courses = list(Course.objects.filter(name=settings.course).order_by('id')[:2])
+    if not courses:
+        raise ValueError(f"Course '{settings.course}' not found")
+    if len(courses) > 1:
+        raise ValueError(f"Course name '{settings.course}' matches several courses")
+    return courses[0]
+
+
+def split_by_course(institution_ids):
+    """(institution ids to regenerate, report rows of the ones skipped as duplicates of a course)"""
+    institutions = {pk: (name, course) for pk, name, course in InstitutionSettings.objects
+                    .filter(pk__in=institution_ids).values_list('id', 'institution_name', 'course')}
+    first_by_course = {}
+    unique, duplicates = [], []
+    for institution_id in sorted(set(institution_ids)):
+        if institution_id not in institutions:
+            unique.append(institution_id)  # reported as failed by generate_institution
+            continue
+        name, course = institutions[institution_id]
+        if course in first_by_course:
+            duplicates.append({
+                "institution": institution_id, "status": "skipped", "name": name, "course": course,
+                "error": f"Course '{course}' is already regenerated by institution {first_by_course[course]}",
+                "elapsed_ms": 0.0,
+            })
+        else:
+            first_by_course[course] = institution_id
+            unique.append(institution_id)
+    return unique, duplicates
+
+
+def generate_institution(institution_id, options):
+    """Regenerate one institution and return its report row (never raises)"""
+    started = time.perf_counter()
+    row = {"institution": institution_id, "status": "failed"}
+    try:
+        settings = InstitutionSettings.objects.select_related('created_by').get(pk=institution_id)
+        row.update(name=settings.institution_name, course=settings.course,
+                   owner=settings.created_by.username if settings.created_by else None)
+
+        course = resolve_course(settings)
+
+        result = generate_timetable(
+            owner=settings.created_by, settings=settings, course=course,
+            room_owner=settings.created_by, **options
+        )
+        row["status"] = result["status"]
+        row["timings"] = result.get("timings", {})
+        if result["status"] == "success":
+            row.update(result["stats"])
+        else:
+            row["error"] = result["message"]
+    except Exception as e:
+        logger.exception(f"Batch generation failed for institution {institution_id}")
+        row["error"] = str(e)
+    finally:
+        # Workers are long-lived: don't keep one connection per finished job idle
+        connections.close_all()
+    row["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return row
+
+
+def batch_generate(institution_ids=None, workers=None, on_result=None, **options):
+    """Regenerate ``institution_ids`` (default: every completed setup) on a process pool.
+
+    ``options`` are passed to ``generate_timetable`` (seed, solver, dry_run, ...).
+    Institutions sharing a course are regenerated once, by the lowest id; the
+    others get a "skipped" row. ``on_result(row)`` is called as each
+    institution finishes. Returns
+    ``{"institutions": [rows in id order], "summary": {...}}``.
+    """
+    if institution_ids is None:
+        institution_ids = list(InstitutionSettings.objects.filter(is_setup_complete=True)
+                               .order_by('id').values_list('id', flat=True))
+    institution_ids, duplicates = split_by_course(institution_ids)
+    for row in duplicates:
+        logger.warning(f"Skipping institution {row['institution']}: {row['error']}")
+        if on_result:
+            on_result(row)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(institution_ids) or 1))
+    logger.info(f"Batch generation of {len(institution_ids)} institutions on {workers} workers")
+
+    started = time.perf_counter()
+    rows = []
+    if workers == 1:
+        for institution_id in institution_ids:
+            rows.append(generate_institution(institution_id, options))
+            if on_result:
+                on_result(rows[-1])
+    else:
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+            futures = [executor.submit(generate_institution, institution_id, options)
+                       for institution_id in institution_ids]
+            for future in as_completed(futures):
+                rows.append(future.result())
+                if on_result:
+                    on_result(rows[-1])
+    elapsed = time.perf_counter() - started
+
+    rows.extend(duplicates)
+    rows.sort(key=lambda row: row["institution"])
+    succeeded = sum(1 for row in rows if row["status"] == "success")
+    return {
+        "institutions": rows,
+        "summary": {
+            "institutions": len(rows),
+            "succeeded": succeeded,
+            "failed": len(rows) - succeeded - len(duplicates),
+            "duplicates": len(duplicates),
+            "workers": workers,
+            "elapsed_s": elapsed,
+            "institutions_per_s": len(rows) / elapsed if elapsed else 0.0,
+            "scheduled": sum(row.get("scheduled", 0) for row in rows),
+            "skipped": sum(row.get("skipped", 0) for row in rows),
+        },
+    }
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework.response import Response
+from .models import TimetableGenerationState
+
+logger = logging.getLogger(__name__)
+
+
+# Sessions live in one shared table, so a single counter row covers every
+# reader. Anything that writes or deletes sessions bumps it; conditional GETs
+# only read it (a missing row is version 0).
+GENERATION_STATE_ID = 1
+NEVER_GENERATED = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def bump_generation_version():
+    """Advance the generation counter after the sessions change"""
+    now = timezone.now()
+    bump = dict(version=F('version') + 1, generated_at=now)
+    if TimetableGenerationState.objects.filter(pk=GENERATION_STATE_ID).update(**bump):
+        return
+    try:
+        with transaction.atomic():
+            TimetableGenerationState.objects.create(pk=GENERATION_STATE_ID, version=1, generated_at=now)
+    except IntegrityError:
+        # Another request created the row first
+        TimetableGenerationState.objects.filter(pk=GENERATION_STATE_ID).update(**bump)
+
+
+def _unsaved_state():
+    return TimetableGenerationState(pk=GENERATION_STATE_ID, version=0, generated_at=NEVER_GENERATED)
+
+
+def get_generation_state():
+    """The generation counter (read only)"""
+    return TimetableGenerationState.objects.filter(pk=GENERATION_STATE_ID).first() or _unsaved_state()
+
+
+async def aget_generation_state():
+    return await TimetableGenerationState.objects.filter(pk=GENERATION_STATE_ID).afirst() or _unsaved_state()
+
+
+def make_timetable_etag(request, state):
+    """Strong ETag from the generation version and the requested resource"""
+    resource = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:12]
+    return quote_etag(f"{state.version}-{resource}")
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Weak comparison: compressed responses carry a W/ ETag (see responses.py)
+        etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def conditional_timetable_view(view_func):
+    """Answer conditional GETs for timetable reads from the generation counter.
+
+    A matching ``If-None-Match`` (or a fresh ``If-Modified-Since``) gets a 304
+    before the wrapped view runs, so the session tables are never queried.
+    Apply below ``@api_view`` so the request is already authenticated.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        state = get_generation_state()
+        etag = make_timetable_etag(request, state)
+        last_modified = int(state.generated_at.timestamp())
+
+        if _not_modified(request, etag, last_modified):
+            response = Response(status=304)
+        else:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        return _add_validators(response, etag, last_modified)
+
+    return wrapper
+
+
+def async_conditional_timetable_view(view_func):
+    """``conditional_timetable_view`` for the async read views (request.user must be set)"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        state = await aget_generation_state()
+        etag = make_timetable_etag(request, state)
+        last_modified = int(state.generated_at.timestamp())
+
+        if _not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        else:
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        return _add_validators(response, etag, last_modified)
+
+    return wrapper
@@ -0,0 +1,142 @@
+import csv
+import json
+from datetime import datetime, timedelta
+from django.utils import timezone
+from .models import ScheduledSession, TimetableSlot
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SCOPES = ('section', 'faculty', 'room')
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'ics': 'text/calendar',
+}
+
+DAY_NAMES = dict(TimetableSlot._meta.get_field('day').choices)
+
+EXPORT_FIELDS = (
+    'id', 'section_id', 'section__name', 'section__semester__number', 'section__semester__course__name',
+    'subject__name', 'faculty_id', 'faculty__name', 'faculty__employee_id', 'room_id', 'room__name',
+    'slot__day', 'slot__period_number', 'is_lab_session',
+)
+
+# Leading sort keys per scope so each section/faculty/room comes out contiguously
+SCOPE_ORDERING = {
+    'section': ('section__semester__course__name', 'section__semester__number', 'section__name', 'section_id'),
+    'faculty': ('faculty__name', 'faculty_id'),
+    'room': ('room__name', 'room_id'),
+}
+
+CSV_HEADER = ['course', 'semester', 'section', 'day', 'period', 'subject',
+              'faculty', 'employee_id', 'room', 'is_lab']
+
+
+def iter_session_rows(scope):
+    """Stream every scheduled session as a dict, ordered for the given scope.
+
+    Uses a single ``values()`` query read through ``iterator()``, so only one
+    chunk of rows is in memory at a time.
+    """
+    ordering = SCOPE_ORDERING[scope] + ('slot__day', 'slot__period_number')
+    return (
+        ScheduledSession.current.order_by(*ordering)
+        .values(*EXPORT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def _row_values(row):
+    return [
+        row['section__semester__course__name'], row['section__semester__number'], row['section__name'],
+        DAY_NAMES[row['slot__day']], row['slot__period_number'], row['subject__name'],
+        row['faculty__name'], row['faculty__employee_id'], row['room__name'], row['is_lab_session'],
+    ]
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(scope):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in iter_session_rows(scope):
+        yield writer.writerow(_row_values(row))
+
+
+def stream_jsonl(scope):
+    for row in iter_session_rows(scope):
+        yield json.dumps(dict(zip(CSV_HEADER, _row_values(row)))) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# iCalendar
+# ---------------------------------------------------------------------------
+
+def _ics_escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _ics_line(line):
+    """Fold a content line to 75 octets as RFC 5545 requires"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # never split a multi-byte character
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_occurrence_dates(day, term_start, term_end):
+    """Lazily yield every date in [term_start, term_end] falling on ``day`` (1 = Monday)"""
+    current = term_start + timedelta(days=(day - 1 - term_start.weekday()) % 7)
+    while current <= term_end:
+        yield current
+        current += timedelta(days=7)
+
+
+def stream_ics(scope, term_start, term_end, day_start, period_minutes):
+    """Expand the weekly timetable into dated events across the term.
+
+    Occurrences are generated per session as the rows stream past, so nothing
+    beyond the current session is held in memory.
+    """
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+    yield _ics_line("BEGIN:VCALENDAR")
+    yield _ics_line("VERSION:2.0")
+    yield _ics_line("PRODID:-//Timetable Generator//Export//EN")
+    yield _ics_line(f"X-WR-CALNAME:Timetable by {scope}")
+
+    for row in iter_session_rows(scope):
+        offset = timedelta(minutes=(row['slot__period_number'] - 1) * period_minutes)
+        summary = f"{row['subject__name']} ({row['section__name']})"
+        description = (f"Semester {row['section__semester__number']} - Section {row['section__name']}, "
+                       f"{row['section__semester__course__name']}; Faculty: {row['faculty__name']}")
+        if row['is_lab_session']:
+            summary += " [Lab]"
+
+        for date in iter_occurrence_dates(row['slot__day'], term_start, term_end):
+            start = datetime.combine(date, day_start) + offset
+            end = start + timedelta(minutes=period_minutes)
+            yield (
+                _ics_line("BEGIN:VEVENT")
+                + _ics_line(f"UID:session-{row['id']}-{date:%Y%m%d}@timetable")
+                + _ics_line(f"DTSTAMP:{stamp}")
+                + _ics_line(f"DTSTART:{start:%Y%m%dT%H%M%S}")
+                + _ics_line(f"DTEND:{end:%Y%m%dT%H%M%S}")
+                + _ics_line(f"SUMMARY:{_ics_escape(summary)}")
+                + _ics_line(f"LOCATION:{_ics_escape(row['room__name'])}")
+                + _ics_line(f"DESCRIPTION:{_ics_escape(description)}")
+                + _ics_line("END:VEVENT")
+            )
+
+    yield _ics_line("END:VCALENDAR")
@@ -0,0 +1,103 @@
+import logging
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+def _violation(kind, entity, demand, capacity, message):
+    return {"kind": kind, "entity": entity, "demand": demand, "capacity": capacity, "message": message}
+
+
+def check_feasibility(problem):
+    """Capacity bounds that any timetable for ``problem`` must satisfy.
+
+    One pass over the session demands plus one per faculty/section/room pool,
+    so it runs in milliseconds and can be used to reject a setup before the
+    solver starts. Every violated bound is reported, not just the first.
+    """
+    started = time.perf_counter()
+    slot_count = len(problem.slots)
+    violations = []
+
+    faculty_demand = defaultdict(int)
+    section_demand = defaultdict(int)
+    pool_demand = defaultdict(int)  # "lab" / "classroom" -> sessions
+    total = 0
+
+    for demand in problem.demands:
+        faculty_demand[demand.faculty.id] += demand.requested
+        section_demand[demand.section.id] += demand.sessions
+        pool_demand["lab" if demand.is_lab else "classroom"] += demand.sessions
+        total += demand.sessions
+
+    # Per-faculty bounds: weekly limit, one class per slot, daily limit
+    for faculty_id, hours in faculty_demand.items():
+        faculty = problem.faculty[faculty_id]
+        if hours > faculty.max_hours_per_week:
+            violations.append(_violation(
+                "faculty_weekly_hours", faculty.name, hours, faculty.max_hours_per_week,
+                f"Faculty {faculty.name} is allocated {hours} hours/week but may teach at most {faculty.max_hours_per_week}"))
+        if hours > slot_count:
+            violations.append(_violation(
+                "faculty_slots", faculty.name, hours, slot_count,
+                f"Faculty {faculty.name} is allocated {hours} hours but the week has only {slot_count} slots"))
+        daily_capacity = faculty.max_hours_per_day * problem.working_days
+        if hours > daily_capacity:
+            violations.append(_violation(
+                "faculty_daily_hours", faculty.name, hours, daily_capacity,
+                f"Faculty {faculty.name} needs {hours} hours but {faculty.max_hours_per_day} hours/day "
+                f"over {problem.working_days} days allows only {daily_capacity}"))
+
+    # Per-section bound: a section attends one class per slot
+    sections = {section.id: section for section in problem.sections}
+    for section_id, sessions in section_demand.items():
+        if sessions > slot_count:
+            section = sections[section_id]
+            label = f"Semester {section.semester.number} - Section {section.name}"
+            violations.append(_violation(
+                "section_slots", label, sessions, slot_count,
+                f"{label} needs {sessions} sessions/week but has only {slot_count} slots"))
+
+    # Per-room-type bounds (labs fall back to classrooms when there are none)
+    lab_rooms = sum(1 for room in problem.rooms if room.is_lab)
+    classrooms = len(problem.rooms) - lab_rooms
+    pools = {"lab": lab_rooms or classrooms or len(problem.rooms),
+             "classroom": classrooms or len(problem.rooms)}
+    if lab_rooms == 0 and pool_demand["lab"]:
+        # Both kinds of session compete for the same classrooms
+        pool_demand = {"classroom": pool_demand["lab"] + pool_demand["classroom"]}
+    for pool, sessions in pool_demand.items():
+        capacity = pools[pool] * slot_count
+        if sessions > capacity:
+            violations.append(_violation(
+                f"{pool}_capacity", pool, sessions, capacity,
+                f"{sessions} {pool} sessions/week need more than the {pools[pool]} {pool} room(s) "
+                f"x {slot_count} slots = {capacity} available"))
+
+    # Pigeonhole over all slots: every session needs its own (room, slot) pair
+    room_slot_capacity = len(problem.rooms) * slot_count
+    if total > room_slot_capacity:
+        violations.append(_violation(
+            "room_slots", "all rooms", total, room_slot_capacity,
+            f"{total} sessions/week exceed {len(problem.rooms)} rooms x {slot_count} slots = {room_slot_capacity}"))
+    if not problem.rooms and total:
+        violations.append(_violation("no_rooms", "all rooms", total, 0, "No rooms are configured"))
+
+    # Not a capacity bound: these subjects are simply skipped by the generator
+    warnings = []
+    for section, subject in problem.unallocated:
+        warnings.append(_violation(
+            "unallocated_subject", subject.name, subject.weekly_hours, 0,
+            f"No faculty allocated for subject {subject.name} (section {section.name})"))
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Feasibility check: {len(violations)} violations in {elapsed_ms:.2f} ms")
+    return {
+        "feasible": not violations,
+        "total_sessions": total,
+        "slots": slot_count,
+        "violations": violations,
+        "warnings": warnings,
+        "elapsed_ms": elapsed_ms,
+    }
@@ -0,0 +1,186 @@
+import logging
+from .models import CurrentTimetable, ScheduledSession, Section, SectionTimetableGrid, TimetableSlot
+
+logger = logging.getLogger(__name__)
+
+# Grid document layout (stored in SectionTimetableGrid.document):
+# {
+#     "section": "A",
+#     "days": ["Mon", "Tue", ...],            # one row per working day
+#     "periods": ["1", "2", ...],             # one column per period
+#     "subjects": {"<id>": "<name>"},         # lookup tables for the cells
+#     "faculty": {"<id>": "<name>"},
+#     "rooms": {"<id>": "<name>"},
+#     "grid": [[null | [subject_id, faculty_id, room_id, is_lab], ...], ...]
+# }
+
+
+def grid_axes(slots):
+    """Return (day numbers, period numbers) covered by the given slots, in order"""
+    day_numbers = sorted({slot.day for slot in slots})
+    period_numbers = sorted({slot.period_number for slot in slots})
+    return day_numbers, period_numbers
+
+
+def build_grid_document(section, slots, entries):
+    """Build the compact grid document for one section.
+
+    ``entries`` is an iterable of (slot, subject, faculty, room, is_lab) tuples.
+    """
+    day_numbers, period_numbers = grid_axes(slots)
+    day_names = dict(TimetableSlot._meta.get_field('day').choices)
+    day_index = {day: i for i, day in enumerate(day_numbers)}
+    period_index = {period: i for i, period in enumerate(period_numbers)}
+
+    grid = [[None] * len(period_numbers) for _ in day_numbers]
+    subjects, faculty, rooms = {}, {}, {}
+
+    for slot, subject, fac, room, is_lab in entries:
+        if slot.day not in day_index or slot.period_number not in period_index:
+            continue
+        subjects[str(subject.id)] = subject.name
+        faculty[str(fac.id)] = fac.name
+        rooms[str(room.id)] = room.name
+        grid[day_index[slot.day]][period_index[slot.period_number]] = [
+            subject.id, fac.id, room.id, is_lab
+        ]
+
+    return {
+        "section": section.name,
+        "days": [day_names[day] for day in day_numbers],
+        "periods": [str(p) for p in period_numbers],
+        "subjects": subjects,
+        "faculty": faculty,
+        "rooms": rooms,
+        "grid": grid,
+    }
+
+
+def build_section_grids(sections, slots, placements):
+    """Unsaved grid rows for ``sections`` built from ``placements``.
+
+    ``placements`` maps section id -> list of (slot, subject, faculty, room, is_lab).
+    They are stored together with the timetable version swap (see versions.py)
+    so grids and sessions stay in step.
+    """
+    return [
+        SectionTimetableGrid(
+            section=section,
+            document=build_grid_document(section, slots, placements.get(section.id, [])),
+        )
+        for section in sections
+    ]
+
+
+def rebuild_grid_document(section):
+    """Build a grid document from stored sessions (for timetables generated before grids existed)"""
+    slots = list(TimetableSlot.objects.all())
+    sessions = ScheduledSession.current.filter(section=section).select_related(
+        'slot', 'subject', 'faculty', 'room'
+    )
+    entries = [(s.slot, s.subject, s.faculty, s.room, s.is_lab_session) for s in sessions]
+    return build_grid_document(section, slots, entries)
+
+
+def refresh_section_grids(sections):
+    """Rewrite the stored grids of ``sections`` from their current sessions (after edits or cascading deletes)"""
+    for section in sections:
+        SectionTimetableGrid.objects.update_or_create(
+            section=section, defaults={"document": rebuild_grid_document(section)}
+        )
+
+
+def sections_of(sessions):
+    """Sections whose current timetable includes any of ``sessions`` (evaluate before deleting them)"""
+    return list(Section.objects.filter(pk__in=sessions.filter(
+        version__in=CurrentTimetable.objects.values('version')
+    ).values('section_id')))
+
+
+def compact_grid_documents(documents):
+    """Dictionary-encode grid documents for the ``layout=compact`` responses.
+
+    Subject, faculty and room names go into string tables shared by all the
+    documents, each distinct (subject, faculty, room, is_lab) combination
+    once into ``cells``, and every section becomes a days × periods integer
+    matrix of cell indexes (-1 = free period).
+    """
+    tables = {"subjects": {}, "faculty": {}, "rooms": {}}
+    cells, cell_index, sections = [], {}, []
+
+    def intern(table, names):
+        # Document ids -> positions in the shared table
+        interned = tables[table]
+        return {int(key): interned.setdefault(name, len(interned)) for key, name in names.items()}
+
+    for document in documents:
+        subjects = intern("subjects", document["subjects"])
+        faculty = intern("faculty", document["faculty"])
+        rooms = intern("rooms", document["rooms"])
+        encoded_cells = {}  # this document's cells, keyed by their raw values
+        matrix = []
+        for row in document["grid"]:
+            encoded = []
+            for cell in row:
+                if cell is None:
+                    encoded.append(-1)
+                    continue
+                raw = tuple(cell)
+                index = encoded_cells.get(raw)
+                if index is None:
+                    subject_id, faculty_id, room_id, is_lab = raw
+                    key = (subjects[subject_id], faculty[faculty_id], rooms[room_id], int(bool(is_lab)))
+                    index = cell_index.get(key)
+                    if index is None:
+                        index = cell_index[key] = len(cells)
+                        cells.append(list(key))
+                    encoded_cells[raw] = index
+                encoded.append(index)
+            matrix.append(encoded)
+        sections.append({"section": document["section"], "grid": matrix})
+
+    return {
+        "subjects": list(tables["subjects"]),
+        "faculty": list(tables["faculty"]),
+        "rooms": list(tables["rooms"]),
+        "cells": cells,  # [subject, faculty, room, is_lab] indexes into the tables above
+        "sections": sections,
+    }
+
+
+def compact_grid_document(document):
+    """``compact_grid_documents`` for a single section (the ``view_timetable`` compact payload)"""
+    compact = compact_grid_documents([document])
+    section = compact.pop("sections")[0]
+    return {"section": section["section"], "days": document["days"], "periods": document["periods"],
+            **compact, "grid": section["grid"]}
+
+
+def expand_grid_document(document):
+    """Turn a grid document into the ``view_timetable`` response payload"""
+    subjects = document["subjects"]
+    faculty = document["faculty"]
+    rooms = document["rooms"]
+    periods = document["periods"]
+
+    timetable = []
+    for day_name, row in zip(document["days"], document["grid"]):
+        for period, cell in zip(periods, row):
+            if cell is None:
+                continue
+            subject_id, faculty_id, room_id, is_lab = cell
+            timetable.append({
+                "day": day_name,
+                "period": int(period),
+                "subject": subjects[str(subject_id)],
+                "faculty": faculty[str(faculty_id)],
+                "room": rooms[str(room_id)],
+                "is_lab": is_lab,
+            })
+
+    return {
+        "section": document["section"],
+        "days": document["days"],
+        "periods": periods,
+        "timetable": timetable,
+    }
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from .metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Idempotency-Key support for the setup and generation POSTs. The first
+# request with a key leaves an "in progress" marker in the cache (cache.add,
+# so only one request wins it) and replaces it with its response when done.
+# Repeats of the key (double clicks, client retries) get that response back
+# with an ``Idempotent-Replayed`` header; repeats that arrive while the first
+# request is still running wait for it and return its response. Keys are
+# scoped to the user and kept for IDEMPOTENCY_KEY_TTL seconds. With several
+# worker processes IDEMPOTENCY_CACHE must be a cache they share (Redis,
+# memcached or the database cache); the default local-memory cache only
+# catches duplicates that reach the same process.
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_CACHE_PREFIX = 'idempotency:'
+MAX_KEY_LENGTH = 255
+
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+
+
+def _idempotency_cache():
+    return caches[getattr(settings, 'IDEMPOTENCY_CACHE', 'default')]
+
+
+def request_fingerprint(request):
+    """Hash of what the request asks for, so a key reused for another request is caught"""
+    digest = hashlib.sha256(f"{request.method} {request.get_full_path()}\n".encode())
+    if request.content_type.startswith('multipart/'):
+        # Uploads are hashed from the parsed files (the raw body is not kept)
+        for name, upload in sorted(request.FILES.items()):
+            digest.update(f"{name}:{upload.name}:{upload.size}\n".encode())
+            for chunk in upload.chunks():
+                digest.update(chunk)
+            upload.seek(0)
+        digest.update(repr(sorted(request.POST.lists())).encode())
+    else:
+        digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _replay(entry):
+    response = Response(entry["data"], status=entry["status"])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _run_and_store(cache, cache_key, fingerprint, view_func, request, *args, **kwargs):
+    try:
+        response = view_func(request, *args, **kwargs)
+    except BaseException:
+        cache.delete(cache_key)
+        raise
+    if response.status_code >= 500 or not isinstance(response, Response):
+        # Server errors are not final (a retry may succeed), so the key is released
+        cache.delete(cache_key)
+        return response
+    cache.set(cache_key, {
+        "state": DONE,
+        "fingerprint": fingerprint,
+        "status": response.status_code,
+        "data": response.data,
+    }, getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 3600))
+    return response
+
+
+def idempotent_view(view_func):
+    """Honour an ``Idempotency-Key`` header on a DRF POST view (place it below the DRF decorators).
+
+    Requests without the header run as before. A key seen with a different
+    method, path or body is rejected with 422; a request still in progress
+    after IDEMPOTENCY_WAIT_TIMEOUT seconds answers the duplicate with 409.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+        if not key:
+            return view_func(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'}, status=400)
+
+        cache = _idempotency_cache()
+        user_id = request.user.pk if request.user.is_authenticated else 0
+        cache_key = IDEMPOTENCY_CACHE_PREFIX + hashlib.sha256(f"{user_id}:{key}".encode()).hexdigest()
+        fingerprint = request_fingerprint(request)
+        in_progress_timeout = getattr(settings, 'IDEMPOTENCY_IN_PROGRESS_TIMEOUT', 900)
+        deadline = time.monotonic() + getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 600)
+        poll_interval = getattr(settings, 'IDEMPOTENCY_POLL_INTERVAL', 0.25)
+
+        waited = False
+        while True:
+            if cache.add(cache_key, {"state": IN_PROGRESS, "fingerprint": fingerprint}, in_progress_timeout):
+                record_cache_lookup('idempotency', False)
+                return _run_and_store(cache, cache_key, fingerprint, view_func, request, *args, **kwargs)
+
+            entry = cache.get(cache_key)
+            if entry is None:
+                continue  # the first request failed or its marker expired; try to take over
+            if entry["fingerprint"] != fingerprint:
+                return Response({'error': f'This {IDEMPOTENCY_HEADER} was already used for a different request'},
+                                status=422)
+            if entry["state"] == DONE:
+                record_cache_lookup('idempotency', True)
+                logger.info(f"Replaying response for {IDEMPOTENCY_HEADER} {key!r} of user {user_id}")
+                return _replay(entry)
+            if time.monotonic() >= deadline:
+                response = Response({'error': f'A request with this {IDEMPOTENCY_HEADER} is still in progress'},
+                                    status=409)
+                response['Retry-After'] = str(max(1, round(poll_interval * 4)))
+                return response
+            if not waited:
+                logger.info(f"Waiting for the in-progress request with {IDEMPOTENCY_HEADER} {key!r} of user {user_id}")
+                waited = True
+            time.sleep(poll_interval)
+
+    return wrapper
@@ -0,0 +1,334 @@
+import codecs
+import csv
+import logging
+from itertools import islice
+from django.db import transaction
+from .conditional import bump_generation_version
+from .models import Course, Faculty, FacultySubjectAllocation, InstitutionSettings, Room, Section, Semester, Subject
+from .setup_pipeline import subject_code_stem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100  # keeps the report bounded for badly broken files
+
+IMPORT_KINDS = ('faculty', 'rooms', 'subjects')
+
+# Accepted header spellings, normalised (lower case, spaces -> underscores)
+FACULTY_COLUMNS = {
+    'name': ('name', 'faculty', 'faculty_name'),
+    'employee_id': ('employee_id', 'empid', 'emp_id'),
+    'max_hours_per_week': ('max_hours_per_week', 'maxhours', 'max_hours'),
+    'max_hours_per_day': ('max_hours_per_day',),
+}
+ROOM_COLUMNS = {
+    'name': ('name', 'room', 'room_name'),
+    'is_lab': ('is_lab', 'islab', 'lab'),
+}
+SUBJECT_COLUMNS = {
+    'semester': ('semester', 'semester_number'),
+    'name': ('name', 'subject', 'subject_name'),
+    'weekly_hours': ('weekly_hours', 'weeklyhours', 'hours'),
+    'is_lab': ('is_lab', 'islab', 'lab', 'lab_required'),
+    'lab_hours': ('lab_hours', 'labhours'),
+    'faculty': ('faculty', 'faculty_name', 'employee_id', 'empid'),
+    'sections': ('sections', 'section'),
+}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'lab'}
+
+
+class SetupImportError(Exception):
+    """Raised when an import cannot start (unreadable file, unknown kind, missing setup)"""
+
+
+# ---------------------------------------------------------------------------
+# Row readers (streaming, one row in memory at a time)
+# ---------------------------------------------------------------------------
+
+def _normalise_header(value):
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def iter_csv_rows(fileobj):
+    """Yield (line number, row dict) from a binary CSV file object"""
+    reader = csv.reader(codecs.iterdecode(fileobj, 'utf-8-sig'))
+    try:
+        headers = [_normalise_header(h) for h in next(reader)]
+    except StopIteration:
+        return
+    for values in reader:
+        if any(v.strip() for v in values):
+            yield reader.line_num, dict(zip(headers, values))
+
+
+def iter_xlsx_rows(fileobj):
+    """Yield (row number, row dict) from the first sheet of an XLSX workbook (read-only mode)"""
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception as e:
+        raise SetupImportError(f"Could not read workbook: {e}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalise_header(h) for h in next(rows, ())]
+        for number, values in enumerate(rows, start=2):
+            if any(v not in (None, '') for v in values):
+                yield number, dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """Pick a row reader from the file name's extension"""
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(fileobj)
+    if name.endswith('.csv') or name.endswith('.txt'):
+        return iter_csv_rows(fileobj)
+    raise SetupImportError("Only .csv and .xlsx files are supported")
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _pick(row, columns, field):
+    for header in columns[field]:
+        value = row.get(header)
+        if value is not None and str(value).strip() != '':
+            return str(value).strip()
+    return None
+
+
+def _int_or_none(value, default=None):
+    if value is None:
+        return default
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Per-kind chunk writers
+# ---------------------------------------------------------------------------
+
+def _import_room_chunk(chunk, user, context, report):
+    rooms = []
+    for line, row in chunk:
+        name = _pick(row, ROOM_COLUMNS, 'name')
+        if not name:
+            report.error(line, "room name is required")
+            continue
+        is_lab = (_pick(row, ROOM_COLUMNS, 'is_lab') or '').lower() in TRUE_VALUES
+        rooms.append(Room(name=name, is_lab=is_lab, created_by=user))
+    Room.objects.bulk_create(rooms)
+    return len(rooms)
+
+
+def _import_faculty_chunk(chunk, user, context, report):
+    cleaned = []
+    for line, row in chunk:
+        name = _pick(row, FACULTY_COLUMNS, 'name')
+        emp_id = _pick(row, FACULTY_COLUMNS, 'employee_id')
+        if not name or not emp_id:
+            report.error(line, "faculty name and employee_id are required")
+            continue
+        max_week = _int_or_none(_pick(row, FACULTY_COLUMNS, 'max_hours_per_week'), 18)
+        max_day = _int_or_none(_pick(row, FACULTY_COLUMNS, 'max_hours_per_day'), 4)
+        if max_week is None or max_day is None or max_week < 0 or max_day < 0:
+            report.error(line, f"hour limits for {emp_id} must be non-negative numbers")
+            continue
+        cleaned.append((line, name, emp_id, max_week, max_day))
+
+    # One query per chunk to reject employee IDs that already exist
+    existing = set(Faculty.objects.filter(
+        employee_id__in=[emp_id for _, _, emp_id, _, _ in cleaned]
+    ).values_list('employee_id', flat=True))
+
+    faculties = []
+    for line, name, emp_id, max_week, max_day in cleaned:
+        if emp_id in existing:
+            report.error(line, f"employee_id {emp_id} already exists")
+            continue
+        existing.add(emp_id)
+        faculties.append(Faculty(
+            name=name, employee_id=emp_id, max_hours_per_week=max_week,
+            max_hours_per_day=max_day, created_by=user,
+        ))
+    Faculty.objects.bulk_create(faculties)
+    return len(faculties)
+
+
+def _subject_context(user, course_name=None):
+    """Course plus semester/section caches for a subject catalogue import.
+
+    The caches hold one entry per semester and section, not per row, so they
+    stay small however long the file is.
+    """
+    if course_name is None:
+        institute = InstitutionSettings.objects.filter(created_by=user).first() if user else None
+        if not institute:
+            raise SetupImportError("Complete institute setup (or pass a course) before importing subjects")
+        course_name = institute.course
+    course, _ = Course.objects.get_or_create(
+        name=course_name, defaults={"code": course_name[:20].upper().replace(' ', '_')}
+    )
+    semesters = {s.number: s for s in Semester.objects.filter(course=course)}
+    sections = {(s.semester_id, s.name) for s in Section.objects.filter(semester__course=course)}
+    return {'course': course, 'semesters': semesters, 'sections': sections}
+
+
+def _import_subject_chunk(chunk, user, context, report):
+    course = context['course']
+    cleaned = []
+    for line, row in chunk:
+        number = _int_or_none(_pick(row, SUBJECT_COLUMNS, 'semester'))
+        name = _pick(row, SUBJECT_COLUMNS, 'name')
+        faculty = _pick(row, SUBJECT_COLUMNS, 'faculty')
+        weekly_hours = _int_or_none(_pick(row, SUBJECT_COLUMNS, 'weekly_hours'), 3)
+        lab_hours = _int_or_none(_pick(row, SUBJECT_COLUMNS, 'lab_hours'), 0)
+        if number is None or not name or not faculty:
+            report.error(line, "semester, subject name and faculty are required")
+            continue
+        if weekly_hours is None or lab_hours is None or weekly_hours < 0 or lab_hours < 0:
+            report.error(line, f"hours for {name} must be non-negative numbers")
+            continue
+        is_lab = (_pick(row, SUBJECT_COLUMNS, 'is_lab') or '').lower() in TRUE_VALUES
+        sections = [s.strip() for s in (_pick(row, SUBJECT_COLUMNS, 'sections') or '').replace(',', ';').split(';')]
+        code = f"{subject_code_stem(name)}_{number}_{course.id}"
+        cleaned.append((line, number, name, faculty, weekly_hours, is_lab, lab_hours, [s for s in sections if s], code))
+
+    # Resolve faculty (by name or employee id) and existing codes with one query each
+    references = {row[3] for row in cleaned}
+    faculty_qs = Faculty.objects.filter(name__in=references) | Faculty.objects.filter(employee_id__in=references)
+    if user is not None:
+        faculty_qs = faculty_qs.filter(created_by=user)
+    faculty_map = {}
+    for fac in faculty_qs:
+        faculty_map.setdefault(fac.employee_id, fac)
+        faculty_map.setdefault(fac.name, fac)
+    existing_codes = set(Subject.objects.filter(code__in=[row[8] for row in cleaned]).values_list('code', flat=True))
+
+    accepted = []
+    for line, number, name, faculty, weekly_hours, is_lab, lab_hours, section_names, code in cleaned:
+        faculty_obj = faculty_map.get(faculty)
+        if faculty_obj is None:
+            report.error(line, f"faculty '{faculty}' not found")
+            continue
+        if code in existing_codes:
+            report.error(line, f"subject {name} already exists in semester {number}")
+            continue
+        existing_codes.add(code)
+        accepted.append((number, name, faculty_obj, weekly_hours, is_lab, lab_hours, section_names, code))
+
+    # New semesters are created as they are first seen (bounded by the semester count)
+    semesters = context['semesters']
+    new_numbers = sorted({row[0] for row in accepted} - semesters.keys())
+    for semester in Semester.objects.bulk_create([
+        Semester(course=course, name=f"Semester {number}", number=number) for number in new_numbers
+    ]):
+        semesters[semester.number] = semester
+
+    subjects, allocations, sections = [], [], []
+    for number, name, faculty_obj, weekly_hours, is_lab, lab_hours, section_names, code in accepted:
+        semester = semesters[number]
+        subject = Subject(
+            name=name, semester=semester, code=code, weekly_hours=weekly_hours,
+            lab_required=is_lab, lab_hours=lab_hours,
+        )
+        subjects.append(subject)
+        allocations.append(FacultySubjectAllocation(faculty=faculty_obj, subject=subject))
+        for section_name in section_names:
+            key = (semester.id, section_name)
+            if key not in context['sections']:
+                context['sections'].add(key)
+                sections.append(Section(semester=semester, name=section_name))
+
+    Subject.objects.bulk_create(subjects)
+    Section.objects.bulk_create(sections)
+    FacultySubjectAllocation.objects.bulk_create(allocations)
+    return len(subjects)
+
+
+CHUNK_WRITERS = {
+    'faculty': _import_faculty_chunk,
+    'rooms': _import_room_chunk,
+    'subjects': _import_subject_chunk,
+}
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+class ImportReport:
+    """Running totals for one import; errors are capped at MAX_REPORTED_ERRORS"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Row {line}: {message}")
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'rows': self.rows,
+            'created': self.created,
+            'skipped': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+
+def import_rows(kind, rows, user=None, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None, course_name=None):
+    """Validate and insert ``rows`` chunk by chunk.
+
+    ``rows`` is an iterator of (line number, row dict), e.g. from
+    ``iter_rows``. Each chunk is validated and bulk-inserted in its own
+    transaction, so memory is bounded by ``chunk_size``. ``on_progress`` is
+    called after every chunk with a small dict of per-chunk counts.
+    """
+    if kind not in CHUNK_WRITERS:
+        raise SetupImportError(f"Unknown import kind '{kind}' (expected one of {', '.join(IMPORT_KINDS)})")
+
+    writer = CHUNK_WRITERS[kind]
+    context = _subject_context(user, course_name) if kind == 'subjects' else {}
+    report = ImportReport(kind)
+
+    for number, chunk in enumerate(_chunks(rows, chunk_size), start=1):
+        errors_before = report.error_count
+        with transaction.atomic():
+            created = writer(chunk, user, context, report)
+            if created:
+                bump_generation_version()  # new faculty/rooms show up in the views and the occupancy index
+        report.rows += len(chunk)
+        report.created += created
+
+        progress = {
+            'chunk': number,
+            'rows': len(chunk),
+            'created': created,
+            'skipped': report.error_count - errors_before,
+            'total_rows': report.rows,
+            'total_created': report.created,
+        }
+        logger.info(f"Import {kind}: chunk {number} ({report.rows} rows read, {report.created} created)")
+        if on_progress:
+            on_progress(progress)
+
+    return report.as_dict()
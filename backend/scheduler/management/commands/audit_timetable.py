@@ -0,0 +1,31 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.audit import audit_timetable
+
+
+class Command(BaseCommand):
+    help = "Check the stored timetable for double bookings, faculty hour overruns and lab-room mismatches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+
+    def handle(self, *args, **options):
+        report = audit_timetable()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for kind, rows in report['conflicts'].items():
+                for row in rows:
+                    where = f" on {row['day']} period {row['period']}" if 'day' in row else ''
+                    detail = (f"{row['hours']}/{row['max_hours_per_week']} hours" if 'hours' in row
+                              else f"{row['sessions']} sessions")
+                    self.stdout.write(f"{kind}: {row['name']}{where} ({detail})")
+
+        if not report['ok']:
+            raise CommandError(
+                f"{sum(report['counts'].values())} conflicts found in {report['sessions']} sessions"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"No conflicts in {report['sessions']} sessions ({report['elapsed_ms']:.1f} ms)"
+        ))
@@ -0,0 +1,63 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.batch import batch_generate
+from scheduler.timetable_generator import DEFAULT_ATTEMPTS, SOLVER_MODES
+
+
+class Command(BaseCommand):
+    help = "Regenerate the timetables of many institutions in parallel and print a summary report"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institutions', help="Comma-separated InstitutionSettings ids (default: every completed setup)")
+        parser.add_argument('--workers', type=int, help="Worker processes (default: number of CPUs)")
+        parser.add_argument('--seed', type=int, help="Seed used for every institution")
+        parser.add_argument('--solver', choices=SOLVER_MODES, default='greedy')
+        parser.add_argument('--attempts', type=int, default=DEFAULT_ATTEMPTS, help="Passes for the restarts solver")
+        parser.add_argument('--time-limit', type=float, help="Per-institution seconds after which no new restart attempts start")
+        parser.add_argument('--abort-if-infeasible', action='store_true')
+        parser.add_argument('--dry-run', action='store_true', help="Solve and report without writing sessions")
+        parser.add_argument('--no-cache', action='store_true', help="Always solve instead of reusing a memoised solution")
+        parser.add_argument('--output', help="Write the full report as JSON to this file")
+
+    def handle(self, *args, **options):
+        institution_ids = None
+        if options['institutions']:
+            try:
+                institution_ids = [int(value) for value in options['institutions'].split(',') if value.strip()]
+            except ValueError:
+                raise CommandError("--institutions must be a comma-separated list of ids")
+
+        def report_progress(row):
+            if row['status'] == 'success':
+                self.stdout.write(
+                    f"[{row['institution']}] {row.get('name', '?')} / {row.get('course', '?')}: "
+                    f"{row['scheduled']} scheduled, {row['skipped']} skipped in {row['elapsed_ms']:.0f} ms"
+                )
+            else:
+                self.stderr.write(f"[{row['institution']}] {row.get('name', '?')}: {row['status']} - {row.get('error')}")
+
+        report = batch_generate(
+            institution_ids=institution_ids,
+            workers=options['workers'],
+            on_result=report_progress,
+            abort_on_infeasible=options['abort_if_infeasible'],
+            seed=options['seed'],
+            solver=options['solver'],
+            attempts=max(1, options['attempts']),
+            time_limit=options['time_limit'],
+            dry_run=options['dry_run'],
+            use_cache=not options['no_cache'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump(report, fileobj, indent=2, default=str)
+
+        summary = report['summary']
+        style = self.style.SUCCESS if not summary['failed'] else self.style.WARNING
+        self.stdout.write(style(
+            f"{summary['succeeded']}/{summary['institutions']} institutions regenerated "
+            f"({summary['failed']} failed, {summary['duplicates']} skipped as duplicate courses) on {summary['workers']} workers in {summary['elapsed_s']:.1f}s "
+            f"= {summary['institutions_per_s']:.2f} institutions/s; "
+            f"{summary['scheduled']} sessions scheduled, {summary['skipped']} skipped"
+        ))
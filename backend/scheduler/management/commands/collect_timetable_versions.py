@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from scheduler.versions import collect_versions
+
+
+class Command(BaseCommand):
+    help = "Delete replaced and abandoned timetable versions and their sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention', type=int, default=None,
+                            help="Keep replaced versions this many seconds (default: TIMETABLE_VERSION_RETENTION)")
+
+    def handle(self, *args, **options):
+        collected = collect_versions(retention=options['retention'])
+        self.stdout.write(self.style.SUCCESS(f"Collected {collected} timetable versions"))
@@ -0,0 +1,90 @@
+import json
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.models import Course, InstitutionSettings
+from scheduler.timetable_generator import DEFAULT_ATTEMPTS, SOLVER_MODES, generate_timetable
+
+
+class Command(BaseCommand):
+    help = "Generate the timetable from the stored setup without going through the HTTP API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--institution', type=int, help="InstitutionSettings id (defaults to the --user's institute, else the first one)")
+        parser.add_argument('--user', help="Username whose institute is used and who owns the generated timetable (and may move its sessions)")
+        parser.add_argument('--course', help="Only regenerate this course's sections (other courses keep their sessions)")
+        parser.add_argument('--seed', type=int, help="Seed for reproducible runs")
+        parser.add_argument('--solver', choices=SOLVER_MODES, default='greedy',
+                            help="greedy: one pass; restarts: best of --attempts passes")
+        parser.add_argument('--attempts', type=int, default=DEFAULT_ATTEMPTS, help="Passes for the restarts solver")
+        parser.add_argument('--workers', type=int, default=1, help="Processes running restart attempts in parallel")
+        parser.add_argument('--time-limit', type=float, help="Seconds after which no new restart attempts start")
+        parser.add_argument('--abort-if-infeasible', action='store_true', help="Stop before solving when a capacity bound is violated")
+        parser.add_argument('--dry-run', action='store_true', help="Solve and report without writing sessions")
+        parser.add_argument('--no-cache', action='store_true', help="Always solve instead of reusing a memoised solution")
+        parser.add_argument('--output', help="Write the full result (timetable, stats, timings) as JSON to this file")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['user']:
+            try:
+                owner = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+
+        settings = None
+        if options['institution']:
+            settings = InstitutionSettings.objects.filter(pk=options['institution']).first()
+            if settings is None:
+                raise CommandError(f"Institution {options['institution']} not found")
+        elif owner is not None:
+            settings = InstitutionSettings.objects.filter(created_by=owner).first()
+
+        course = None
+        if options['course']:
+            course = Course.objects.filter(name=options['course']).first()
+            if course is None:
+                raise CommandError(f"Course '{options['course']}' not found")
+
+        started = time.perf_counter()
+        try:
+            result = generate_timetable(
+                owner=owner,
+                abort_on_infeasible=options['abort_if_infeasible'],
+                seed=options['seed'],
+                solver=options['solver'],
+                attempts=max(1, options['attempts']),
+                workers=max(1, options['workers']),
+                time_limit=options['time_limit'],
+                dry_run=options['dry_run'],
+                use_cache=not options['no_cache'],
+                settings=settings,
+                course=course,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump(result, fileobj, indent=2, default=str)
+
+        for phase, elapsed in result.get('timings', {}).items():
+            self.stdout.write(f"{phase[:-3]:<12}{elapsed:>10.1f} ms")
+        self.stdout.write(f"{'total':<12}{total_ms:>10.1f} ms")
+
+        feasibility = result.get('feasibility', {})
+        for violation in feasibility.get('violations', []):
+            self.stderr.write(f"infeasible: {violation['message']}")
+
+        if result['status'] != 'success':
+            raise CommandError(result['message'])
+
+        stats = result['stats']
+        self.stdout.write(
+            f"solver {stats['solver']} (seed {stats['seed']}, {stats['attempts']} attempt(s)"
+            f"{', cached' if stats['cached'] else ''}): "
+            f"{stats['scheduled']} scheduled, {stats['skipped']} skipped, "
+            f"{stats['success_rate']:.1f}% success, {stats['slot_utilization']:.1f}% slot utilisation"
+        )
+        self.stdout.write(self.style.SUCCESS("Dry run: nothing written" if result['dry_run'] else result['message']))
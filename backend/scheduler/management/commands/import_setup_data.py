@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.importers import DEFAULT_CHUNK_SIZE, IMPORT_KINDS, SetupImportError, import_rows, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Stream faculty, rooms or a subject/section catalogue from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORT_KINDS)
+        parser.add_argument('path', help="Path to a .csv or .xlsx file")
+        parser.add_argument('--user', help="Username that will own the imported rows")
+        parser.add_argument('--course', help="Course name for subject imports (defaults to the user's institute course)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found")
+
+        def report_progress(progress):
+            self.stdout.write(
+                f"chunk {progress['chunk']}: {progress['created']}/{progress['rows']} created, "
+                f"{progress['skipped']} skipped ({progress['total_rows']} rows read)"
+            )
+
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = import_rows(
+                    options['kind'], iter_rows(fileobj, options['path']), user=user,
+                    chunk_size=max(1, options['chunk_size']), on_progress=report_progress,
+                    course_name=options['course'],
+                )
+        except (OSError, SetupImportError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(error)
+        if report['errors_truncated']:
+            self.stderr.write(f"... {report['skipped'] - len(report['errors'])} more errors not shown")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} of {report['rows']} {report['kind']} rows "
+            f"({report['skipped']} skipped)"
+        ))
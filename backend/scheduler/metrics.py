@@ -0,0 +1,135 @@
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+# Prometheus metrics served at /metrics. Under gunicorn/uvicorn with several
+# worker processes set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+# directory before the workers start: every process then writes its samples
+# there and the /metrics view merges them, whichever worker answers the
+# scrape. Without it the metrics of the answering process are returned.
+
+REQUEST_SECONDS = Histogram(
+    'timetable_http_request_duration_seconds', 'HTTP request latency by endpoint',
+    ['method', 'endpoint', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'timetable_http_request_db_queries', 'Database queries per HTTP request',
+    ['endpoint'], buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+GENERATION_SECONDS = Histogram(
+    'timetable_generation_duration_seconds', 'Timetable generation wall time',
+    ['solver', 'mode', 'status'], buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+GENERATION_SUCCESS_RATE = Histogram(
+    'timetable_generation_success_rate_percent', 'Share of requested sessions that were scheduled',
+    ['solver'], buckets=(50, 75, 90, 95, 98, 99, 100),
+)
+GENERATIONS_IN_PROGRESS = Gauge(
+    'timetable_generations_in_progress', 'Generations currently running', multiprocess_mode='livesum',
+)
+CACHE_REQUESTS = Counter(
+    'timetable_cache_requests_total', 'Cache lookups by cache and result (hit/miss)', ['cache', 'result'],
+)
+
+_request_queries = ContextVar('request_queries', default=None)
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def instrument_generation(generate):
+    """Time ``generate_timetable`` calls and record their status and success rate"""
+    @wraps(generate)
+    def wrapper(*args, **kwargs):
+        solver = kwargs.get('solver', 'greedy')
+        mode = 'dry_run' if kwargs.get('dry_run') else 'write'
+        status = 'error'
+        started = time.perf_counter()
+        with GENERATIONS_IN_PROGRESS.track_inprogress():
+            try:
+                result = generate(*args, **kwargs)
+                status = result['status']
+                if status == 'success':
+                    GENERATION_SUCCESS_RATE.labels(solver=solver).observe(result['stats']['success_rate'])
+                return result
+            finally:
+                GENERATION_SECONDS.labels(solver=solver, mode=mode, status=status).observe(
+                    time.perf_counter() - started
+                )
+    return wrapper
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+# New connections (including the ones sync_to_async threads open) count queries
+connection_created.connect(_install_query_counter)
+
+
+class MetricsMiddleware:
+    """Records latency and database query count of every request, labelled by URL route.
+
+    Put it first in MIDDLEWARE so the whole stack is timed. The query
+    counter lives in a context variable, so queries that async views run
+    through sync_to_async are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _begin(self):
+        _install_query_counter(None, connection)
+        counter = [0]
+        return _request_queries.set(counter), counter, time.perf_counter()
+
+    def _finish(self, request, response, token, counter, started):
+        elapsed = time.perf_counter() - started
+        _request_queries.reset(token)
+        match = getattr(request, 'resolver_match', None)
+        endpoint = '/' + match.route if match is not None and match.route else 'unmatched'
+        REQUEST_SECONDS.labels(method=request.method, endpoint=endpoint, status=str(response.status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(endpoint=endpoint).observe(counter[0])
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, counter, started = self._begin()
+        response = self.get_response(request)
+        return self._finish(request, response, token, counter, started)
+
+    async def __acall__(self, request):
+        token, counter, started = self._begin()
+        response = await self.get_response(request)
+        return self._finish(request, response, token, counter, started)
+
+
+def metrics_view(request):
+    """Prometheus text exposition of every metric (merged across worker processes)"""
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0003_timetable_generation_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduledsession',
+            index=models.Index(fields=['faculty', 'slot'], name='session_faculty_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledsession',
+            index=models.Index(fields=['room', 'slot'], name='session_room_slot_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def adopt_existing_sessions(apps, schema_editor):
+    # Sessions generated before versioning become each course's current version
+    ScheduledSession = apps.get_model('scheduler', 'ScheduledSession')
+    TimetableVersion = apps.get_model('scheduler', 'TimetableVersion')
+    CurrentTimetable = apps.get_model('scheduler', 'CurrentTimetable')
+    course_ids = (ScheduledSession.objects.order_by()
+                  .values_list('section__semester__course_id', flat=True).distinct())
+    for course_id in list(course_ids):
+        version = TimetableVersion.objects.create(course_id=course_id)
+        CurrentTimetable.objects.create(course_id=course_id, version=version)
+        ScheduledSession.objects.filter(section__semester__course_id=course_id).update(version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0004_session_inverse_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimetableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('retired_at', models.DateTimeField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='scheduler.course')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CurrentTimetable',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='scheduler.course')),
+                ('version', models.OneToOneField(on_delete=django.db.models.deletion.RESTRICT, to='scheduler.timetableversion')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scheduledsession',
+            name='version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='scheduler.timetableversion'),
+        ),
+        migrations.RunPython(adopt_existing_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:12
+
+from django.db import migrations
+
+
+def collapse_generation_states(apps, schema_editor):
+    # The per-owner counters were all bumped together; keep one row (pk 1)
+    TimetableGenerationState = apps.get_model('scheduler', 'TimetableGenerationState')
+    states = list(TimetableGenerationState.objects.all())
+    if not states:
+        return
+    version = max(state.version for state in states)
+    generated_at = max(state.generated_at for state in states)
+    TimetableGenerationState.objects.all().delete()
+    TimetableGenerationState.objects.create(pk=1, version=version, generated_at=generated_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0005_timetable_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_generation_states, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='timetablegenerationstate',
+            name='owner',
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 class Course(models.Model):
@@ -96,6 +97,11 @@ class TimetableSlot(models.Model):
         day_name = dict([(1,'Mon'),(2,'Tue'),(3,'Wed'),(4,'Thu'),(5,'Fri'),(6,'Sat'),(7,'Sun')])[self.day]
         return f"{day_name} - Period {self.period_number}"
 
+class CurrentSessionManager(models.Manager):
+    # Only sessions of the timetable versions readers should see (see scheduler/versions.py)
+    def get_queryset(self):
+        return super().get_queryset().filter(version__in=CurrentTimetable.objects.values('version'))
+
 class ScheduledSession(models.Model):
     section = models.ForeignKey(Section, on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
@@ -103,6 +109,54 @@ class ScheduledSession(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     slot = models.ForeignKey(TimetableSlot, on_delete=models.CASCADE)
     is_lab_session = models.BooleanField(default=False)
+    version = models.ForeignKey('TimetableVersion', on_delete=models.CASCADE, null=True, blank=True)
+
+    objects = models.Manager()
+    current = CurrentSessionManager()
+
+    class Meta:
+        indexes = [
+            # Inverse lookups for faculty-wise and room-wise timetables
+            models.Index(fields=['faculty', 'slot'], name='session_faculty_slot_idx'),
+            models.Index(fields=['room', 'slot'], name='session_room_slot_idx'),
+        ]
     
     def __str__(self):
         return f"{self.section} - {self.subject.name} - {self.slot}"
+
+class SectionTimetableGrid(models.Model):
+    # Precomputed days × periods grid for one section, rewritten by the generator
+    section = models.OneToOneField(Section, on_delete=models.CASCADE, primary_key=True)
+    document = models.JSONField()  # see scheduler/grids.py for the layout
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Grid for {self.section_id}"
+
+class TimetableGenerationState(models.Model):
+    # Single-row counter (see scheduler/conditional.py); bumped whenever the
+    # sessions change and used for ETags
+    version = models.PositiveIntegerField(default=0)
+    generated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Generation v{self.version}"
+
+class TimetableVersion(models.Model):
+    # One generated timetable for a course. Its sessions are written while it
+    # is invisible and go live when the course's CurrentTimetable points at it
+    owner = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(default=timezone.now)
+    retired_at = models.DateTimeField(null=True, blank=True)  # replaced by a newer version
+
+    def __str__(self):
+        return f"Timetable version {self.id} ({self.course_id})"
+
+class CurrentTimetable(models.Model):
+    # The version readers see for each course; flipped in one short transaction
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True)
+    version = models.OneToOneField(TimetableVersion, on_delete=models.RESTRICT)
+
+    def __str__(self):
+        return f"{self.course_id} -> version {self.version_id}"
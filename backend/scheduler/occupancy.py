@@ -0,0 +1,267 @@
+import logging
+import threading
+import numpy as np
+from .conditional import GENERATION_STATE_ID, bump_generation_version, get_generation_state
+from .grids import refresh_section_grids
+from .models import CurrentTimetable, Faculty, Room, ScheduledSession, TimetableGenerationState, TimetableSlot
+from .problem import candidate_rooms
+
+logger = logging.getLogger(__name__)
+
+# Occupancy matrices for interactive edits of the stored timetable. One
+# query loads every session; faculty, rooms and sections become rows of
+# entity × slot count matrices, so "is X free at slot t" is a single lookup
+# and every feasible (slot, room) for a session falls out of a few vectorised
+# mask operations. The built index is kept per process until the timetable
+# changes (see OccupancyIndex.current).
+
+SESSION_FIELDS = ('id', 'section_id', 'subject_id', 'faculty_id', 'room_id', 'slot_id', 'is_lab_session')
+
+
+_latest_lock = threading.Lock()
+_latest = {"key": None, "index": None}
+
+
+def occupancy_key():
+    """The generation counter plus the CurrentTimetable pointers (two small queries).
+
+    New versions move the pointers; moves, swaps, admin edits, setups and
+    imports advance the counter.
+    """
+    pointers = tuple(CurrentTimetable.objects.order_by('course_id').values_list('course_id', 'version_id'))
+    return get_generation_state().version, pointers
+
+
+class OccupancyIndex:
+    """Faculty × slot, room × slot and section × slot session counts of the stored timetable"""
+
+    def __init__(self, sessions, slots, rooms, faculty):
+        self.slots = slots
+        self.rooms = rooms
+        self.faculty = faculty
+        self.slot_pos = {slot.id: i for i, slot in enumerate(slots)}
+        self.room_pos = {room.id: i for i, room in enumerate(rooms)}
+        self.faculty_pos = {member.id: i for i, member in enumerate(faculty)}
+        self.slot_day = np.array([slot.day for slot in slots], dtype=np.int16)
+        self.days = sorted(set(self.slot_day.tolist()))
+
+        # id, section, subject, faculty, room, slot, is_lab (one row per session)
+        self.sessions = {row[0]: row for row in sessions}
+        section_ids = sorted({row[1] for row in sessions})
+        self.section_pos = {section_id: i for i, section_id in enumerate(section_ids)}
+
+        t = len(slots)
+        self.faculty_load = np.zeros((len(faculty), t), dtype=np.int16)
+        self.room_load = np.zeros((len(rooms), t), dtype=np.int16)
+        self.section_load = np.zeros((len(section_ids), t), dtype=np.int16)
+        self.section_subject = np.zeros((len(section_ids), t), dtype=np.int64)  # subject id (0 = free)
+        for _, section_id, subject_id, faculty_id, room_id, slot_id, _ in sessions:
+            slot = self.slot_pos.get(slot_id)
+            if slot is None:
+                continue
+            if faculty_id in self.faculty_pos:
+                self.faculty_load[self.faculty_pos[faculty_id], slot] += 1
+            if room_id in self.room_pos:
+                self.room_load[self.room_pos[room_id], slot] += 1
+            self.section_load[self.section_pos[section_id], slot] += 1
+            self.section_subject[self.section_pos[section_id], slot] = subject_id
+
+    @classmethod
+    def build(cls):
+        """Load the stored timetable (one query for sessions, one each for slots, rooms and faculty)"""
+        return cls(
+            list(ScheduledSession.current.values_list(*SESSION_FIELDS)),
+            list(TimetableSlot.objects.order_by('day', 'period_number')),
+            list(Room.objects.order_by('id')),
+            list(Faculty.objects.order_by('id')),
+        )
+
+    @classmethod
+    def current(cls):
+        """``build()`` reused while ``occupancy_key()`` is unchanged; the index is never modified in place"""
+        key = occupancy_key()
+        with _latest_lock:
+            if _latest["key"] == key:
+                return _latest["index"]
+        # Read after the key, so the index is never older than the key it is stored under
+        index = cls.build()
+        with _latest_lock:
+            _latest.update(key=key, index=index)
+        return index
+
+    # -- per-session views (the session's own booking is excluded) ----------
+
+    def _own(self, session_id):
+        return self.sessions[session_id]
+
+    def faculty_hours(self, faculty_id):
+        """Sessions per week and per day for one faculty member"""
+        row = self.faculty_load[self.faculty_pos[faculty_id]]
+        return int(row.sum()), {day: int(row[self.slot_day == day].sum()) for day in self.days}
+
+    def conflicts(self, session_id, slot_id, room_id, ignore=()):
+        """Reasons ``session_id`` cannot sit at (slot, room); O(1) matrix lookups.
+
+        ``ignore`` lists other session ids that will move away at the same
+        time (a swap).
+        """
+        _, section_id, _, faculty_id, _, own_slot_id, is_lab = self._own(session_id)
+        if slot_id not in self.slot_pos:
+            return ["slot_not_found"]
+        if room_id not in self.room_pos:
+            return ["room_not_found"]
+        slot = self.slot_pos[slot_id]
+        leaving = [self.sessions[other] for other in (session_id, *ignore)]
+
+        def still_booked(matrix, positions, column, key):
+            # Sessions left in the cell once the moving ones are gone
+            count = int(matrix[positions[key], slot])
+            count -= sum(1 for row in leaving if row[column] == key and row[5] == slot_id)
+            return count > 0
+
+        reasons = []
+        if still_booked(self.faculty_load, self.faculty_pos, 3, faculty_id):
+            reasons.append("faculty_busy")
+        if still_booked(self.section_load, self.section_pos, 1, section_id):
+            reasons.append("section_busy")
+        if still_booked(self.room_load, self.room_pos, 4, room_id):
+            reasons.append("room_busy")
+
+        room = self.rooms[self.room_pos[room_id]]
+        if room not in candidate_rooms(self.rooms, is_lab):
+            reasons.append("room_type")
+
+        day = self.slots[slot].day
+        own_day = self.slots[self.slot_pos[own_slot_id]].day if own_slot_id in self.slot_pos else None
+        if day != own_day:
+            member = self.faculty[self.faculty_pos[faculty_id]]
+            _, per_day = self.faculty_hours(faculty_id)
+            hours = per_day.get(day, 0) - sum(
+                1 for row in leaving
+                if row[3] == faculty_id and row[5] in self.slot_pos and self.slots[self.slot_pos[row[5]]].day == day
+            )
+            if hours >= member.max_hours_per_day:
+                reasons.append("faculty_daily_hours")
+        return reasons
+
+    def alternatives(self, session_id, limit=None):
+        """Every feasible (slot, room) for a session, best first.
+
+        Ranking (lower is better): the subject already taught to the section
+        that day, the faculty's load that day, a change of room, and distance
+        from the current day.
+        """
+        _, section_id, subject_id, faculty_id, room_id, own_slot_id, is_lab = self._own(session_id)
+        own = self.slot_pos.get(own_slot_id)
+        f = self.faculty_pos[faculty_id]
+        s = self.section_pos[section_id]
+
+        faculty_row = self.faculty_load[f].copy()
+        section_row = self.section_load[s].copy()
+        subject_row = self.section_subject[s].copy()
+        if own is not None:
+            faculty_row[own] -= 1
+            section_row[own] -= 1
+            subject_row[own] = 0
+
+        # Daily limits: moving within the current day never adds hours to it
+        member = self.faculty[f]
+        own_day = self.slots[own].day if own is not None else None
+        day_load = {day: int(faculty_row[self.slot_day == day].sum()) for day in self.days}
+        day_ok = np.array([day == own_day or day_load[day] < member.max_hours_per_day
+                           for day in self.slot_day.tolist()], dtype=bool)
+        repeated = {day: bool((subject_row[self.slot_day == day] == subject_id).any()) for day in self.days}
+
+        # The current slot stays open for a room change; the current room there
+        # is still marked busy by the session itself
+        slot_ok = (faculty_row == 0) & (section_row == 0) & day_ok
+
+        rooms = candidate_rooms(self.rooms, is_lab)
+        room_rows = np.array([self.room_pos[room.id] for room in rooms], dtype=np.int64)
+        free_rooms = self.room_load[room_rows] == 0
+
+        options = []
+        for room_index, slot in np.argwhere(free_rooms & slot_ok[None, :]).tolist():
+            slot_obj = self.slots[slot]
+            room = rooms[room_index]
+            score = (3.0 * repeated[slot_obj.day] + 0.5 * day_load[slot_obj.day]
+                     + 1.0 * (room.id != room_id)
+                     + 0.1 * (abs(slot_obj.day - own_day) if own_day is not None else 0))
+            options.append({
+                "slot": slot_obj.id,
+                "day": slot_obj.get_day_display(),
+                "period": slot_obj.period_number,
+                "room": room.id,
+                "room_name": room.name,
+                "score": round(score, 2),
+            })
+        options.sort(key=lambda option: (option["score"], option["slot"], option["room"]))
+        return options[:limit] if limit else options
+
+    def substitutes(self, faculty_id, day, allocated=frozenset(), limit=None):
+        """Cover candidates for each of ``faculty_id``'s sessions on ``day``.
+
+        A candidate is free in the session's slot and below both their weekly
+        and daily hour limits. Candidates allocated to the session's subject
+        (``allocated`` holds (faculty_id, subject_id) pairs) come first, then
+        the least loaded. Returns [(session row, [candidate dicts])] in period order.
+        """
+        absent = self.faculty_pos[faculty_id]
+        on_day = self.slot_day == day
+        weekly = self.faculty_load.sum(axis=1)
+        daily = self.faculty_load[:, on_day].sum(axis=1)
+        max_weekly = np.array([member.max_hours_per_week for member in self.faculty])
+        max_daily = np.array([member.max_hours_per_day for member in self.faculty])
+        has_capacity = (weekly < max_weekly) & (daily < max_daily)
+        has_capacity[absent] = False
+
+        affected = sorted(
+            (row for row in self.sessions.values()
+             if row[3] == faculty_id and row[5] in self.slot_pos and self.slot_day[self.slot_pos[row[5]]] == day),
+            key=lambda row: self.slot_pos[row[5]],
+        )
+        results = []
+        for row in affected:
+            subject_id, slot = row[2], self.slot_pos[row[5]]
+            free = np.flatnonzero(has_capacity & (self.faculty_load[:, slot] == 0))
+            candidates = [{
+                "id": self.faculty[i].id,
+                "name": self.faculty[i].name,
+                "employee_id": self.faculty[i].employee_id,
+                "allocated": (self.faculty[i].id, subject_id) in allocated,
+                "weekly_hours": int(weekly[i]),
+                "max_hours_per_week": int(max_weekly[i]),
+                "day_hours": int(daily[i]),
+                "max_hours_per_day": int(max_daily[i]),
+            } for i in free.tolist()]
+            candidates.sort(key=lambda c: (not c["allocated"], c["weekly_hours"], c["day_hours"], c["id"]))
+            results.append((row, candidates[:limit] if limit else candidates))
+        return results
+
+
+def lock_timetable_edits():
+    """Take the generation counter row for update, so edits run one at a time.
+
+    Call first inside the edit's transaction, before ``OccupancyIndex.current()``.
+    Locking only the edited sessions would let two edits of different sessions
+    each check against an index missing the other's move and both book the
+    same room, faculty member or section.
+    """
+    TimetableGenerationState.objects.select_for_update().get_or_create(pk=GENERATION_STATE_ID)
+
+
+def move_sessions(moves):
+    """Write ``{session_id: (slot_id, room_id)}`` and refresh the affected section grids.
+
+    Call inside a transaction after ``lock_timetable_edits()`` and checking the
+    moves against the current index.
+    """
+    sessions = ScheduledSession.objects.select_related('section').in_bulk(list(moves))
+    for session_id, (slot_id, room_id) in moves.items():
+        sessions[session_id].slot_id = slot_id
+        sessions[session_id].room_id = room_id
+    ScheduledSession.objects.bulk_update(sessions.values(), ['slot', 'room'])
+
+    refresh_section_grids({session.section for session in sessions.values()})
+    bump_generation_version()
+    logger.info(f"Moved {len(moves)} session(s): {moves}")
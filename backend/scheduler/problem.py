@@ -0,0 +1,155 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from .models import (
+    FacultySubjectAllocation, Faculty, InstitutionSettings, Room, ScheduledSession, Section, Subject, TimetableSlot
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS_PER_SUBJECT = 6  # Cap at 6 sessions per week
+
+
+def candidate_rooms(rooms, is_lab):
+    """Rooms a session may use: labs for lab sessions (falling back to classrooms), classrooms otherwise"""
+    labs = [room for room in rooms if room.is_lab]
+    classrooms = [room for room in rooms if not room.is_lab]
+    candidates = (labs or classrooms) if is_lab else classrooms
+    return candidates or list(rooms)
+
+
+@dataclass
+class SessionDemand:
+    """Weekly sessions one section needs for one subject"""
+    section: Section
+    subject: Subject
+    faculty: Faculty
+    sessions: int
+    requested: int  # hours asked for before the faculty-limit reduction
+    is_lab: bool
+    rooms: list
+
+
+@dataclass
+class Problem:
+    """In-memory snapshot of everything the generator needs, loaded in a fixed number of queries"""
+    settings: InstitutionSettings
+    slots: list
+    sections: list
+    subjects_by_semester: dict
+    faculty: dict           # faculty_id -> Faculty
+    allocations: dict       # subject_id -> faculty_id (first allocation, as the generator always used)
+    rooms: list
+    demands: list = field(default_factory=list)
+    unallocated: list = field(default_factory=list)  # (section, subject) pairs with no faculty
+    course: object = None   # Course the snapshot is limited to (None = every section)
+    fixed: list = field(default_factory=list)  # (slot_id, faculty_id, room_id) kept from other courses
+    overlaid: bool = False  # changed by a what-if overlay, never written back
+
+    @property
+    def working_days(self):
+        return self.settings.working_days
+
+    @property
+    def periods_per_day(self):
+        return self.settings.periods_per_day
+
+    def rooms_for(self, is_lab):
+        """Candidate rooms for a session (labs fall back to classrooms, then any room)"""
+        return candidate_rooms(self.rooms, is_lab)
+
+
+@dataclass
+class Solution:
+    """Outcome of one solver run, held in memory until it is written"""
+    seed: object
+    placements: list = field(default_factory=list)  # (section, subject, faculty, room, slot, is_lab)
+    scheduled: int = 0
+    skipped: int = 0
+    total_sessions: int = 0
+    faculty_hours: dict = field(default_factory=dict)  # faculty_id -> hours placed
+    attempts: int = 1
+
+
+def build_demands(problem):
+    """(Re)compute ``problem.demands`` from the snapshot's sections, subjects and allocations"""
+    problem.demands = []
+    problem.unallocated = []
+    room_lists = {True: problem.rooms_for(True), False: problem.rooms_for(False)}
+    has_labs = any(room.is_lab for room in problem.rooms)
+
+    for section in problem.sections:
+        for subject in problem.subjects_by_semester.get(section.semester_id, []):
+            faculty_id = problem.allocations.get(subject.id)
+            if faculty_id is None or faculty_id not in problem.faculty:
+                problem.unallocated.append((section, subject))
+                continue
+
+            if subject.lab_required and not has_labs:
+                logger.warning(f"No lab rooms available for {subject.name}, using regular rooms")
+
+            faculty = problem.faculty[faculty_id]
+            requested = min(subject.weekly_hours, MAX_SESSIONS_PER_SUBJECT)
+            sessions = requested
+            limit = faculty.max_hours_per_week
+            if limit < sessions:
+                sessions = max(1, limit)
+
+            problem.demands.append(SessionDemand(
+                section=section,
+                subject=subject,
+                faculty=faculty,
+                sessions=sessions,
+                requested=requested,
+                is_lab=subject.lab_required,
+                rooms=room_lists[subject.lab_required],
+            ))
+    return problem.demands
+
+
+def load_problem(settings=None, course=None, room_owner=None):
+    """Snapshot the stored setup (settings, slots, sections, subjects, allocations, faculty, rooms).
+
+    With ``course`` only that course's sections are scheduled; sessions already
+    placed for other courses are loaded into ``fixed`` so their faculty and
+    rooms stay occupied. ``room_owner`` limits the rooms to the ones that user
+    set up (when they have any).
+    """
+    settings = settings or InstitutionSettings.objects.first()
+    if not settings:
+        raise ValueError("No institution settings found")
+
+    sections = Section.objects.select_related('semester').order_by('id')
+    fixed = []
+    if course is not None:
+        sections = sections.filter(semester__course=course)
+        fixed = list(ScheduledSession.current.exclude(section__semester__course=course)
+                     .values_list('slot_id', 'faculty_id', 'room_id'))
+    sections = list(sections)
+    slots = list(TimetableSlot.objects.all().order_by('day', 'period_number'))
+
+    subjects_by_semester = defaultdict(list)
+    for subject in Subject.objects.filter(semester_id__in={s.semester_id for s in sections}).order_by('id'):
+        subjects_by_semester[subject.semester_id].append(subject)
+
+    allocations = {}
+    for subject_id, faculty_id in FacultySubjectAllocation.objects.order_by('id').values_list('subject_id', 'faculty_id'):
+        allocations.setdefault(subject_id, faculty_id)
+
+    rooms = Room.objects.all().order_by('id')
+    if room_owner is not None and rooms.filter(created_by=room_owner).exists():
+        rooms = rooms.filter(created_by=room_owner)
+
+    problem = Problem(
+        settings=settings,
+        slots=slots,
+        sections=sections,
+        subjects_by_semester=dict(subjects_by_semester),
+        faculty={f.id: f for f in Faculty.objects.all()},
+        allocations=allocations,
+        rooms=list(rooms),
+        course=course,
+        fixed=fixed,
+    )
+    build_demands(problem)
+    return problem
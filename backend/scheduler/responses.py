@@ -0,0 +1,97 @@
+import gzip
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+import orjson
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Fast JSON responses for the large grid payloads, and compression of large
+# responses. DRF's renderer goes through the stdlib json encoder; the compact
+# timetable layouts are serialised with orjson directly instead.
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/x-ndjson')
+
+
+def wants_compact(params):
+    """True when the client asked for the dictionary-encoded layout (``?layout=compact``)"""
+    return params.get('layout') == 'compact'
+
+
+def json_response(payload, status=200):
+    """JSON response serialised with orjson"""
+    return HttpResponse(orjson.dumps(payload), status=status, content_type='application/json')
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def compress_body(body, accept_encoding):
+    """(encoding, compressed body) for the best encoding the client accepts, or (None, body)"""
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br', brotli.compress(body, quality=getattr(settings, 'RESPONSE_BROTLI_QUALITY', 4))
+    if 'gzip' in accepted:
+        return 'gzip', gzip.compress(body, compresslevel=getattr(settings, 'RESPONSE_GZIP_LEVEL', 6), mtime=0)
+    return None, body
+
+
+class CompressionMiddleware:
+    """Brotli (when installed and accepted) or gzip for responses above RESPONSE_COMPRESSION_MIN_BYTES.
+
+    Streaming responses (exports) and small bodies pass through untouched.
+    Like Django's GZipMiddleware it weakens the ETag of compressed bodies;
+    conditional.py compares ETags weakly, so 304s keep working.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _compress(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (response.streaming or response.has_header('Content-Encoding')
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', 1024)):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding, body = compress_body(response.content, request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._compress(request, await self.get_response(request))
@@ -0,0 +1,160 @@
+import numpy as np
+
+# Soft-constraint quality metrics for generated timetables. Candidate
+# assignments are stacked into dense NumPy tensors (candidate × entity × day ×
+# period) and every metric is computed for all candidates at once, so the
+# restart and local-search modes can rank thousands of candidates per second.
+# All metrics are penalties: lower is better.
+
+DEFAULT_WEIGHTS = {
+    "section_gaps": 1.0,            # free periods between a section's first and last class of a day
+    "faculty_gaps": 0.5,            # the same for faculty
+    "subject_repeats": 2.0,         # extra theory sessions of a subject on the same day
+    "section_load_variance": 1.0,   # variance of sessions per day, averaged over sections
+    "faculty_load_variance": 0.5,   # the same for faculty
+    "streak_excess": 3.0,           # periods beyond a faculty's max_consecutive_classes
+    "room_churn": 0.25,             # room changes between back-to-back classes of a section
+}
+
+# Columns of an assignment array (one row per placed session)
+SECTION, FACULTY, SUBJECT, ROOM, DAY, PERIOD, LAB = range(7)
+
+
+class ScoringIndex:
+    """Dense integer indexes for one problem's sections, faculty, subjects, rooms and slots"""
+
+    def __init__(self, problem):
+        self.section_index = {section.id: i for i, section in enumerate(problem.sections)}
+        self.faculty_index = {faculty_id: i for i, faculty_id in enumerate(problem.faculty)}
+        subject_ids = sorted({demand.subject.id for demand in problem.demands})
+        self.subject_index = {subject_id: i for i, subject_id in enumerate(subject_ids)}
+        self.room_index = {room.id: i for i, room in enumerate(problem.rooms)}
+        self.days = max((slot.day for slot in problem.slots), default=0)
+        self.periods = max((slot.period_number for slot in problem.slots), default=0)
+        self.max_consecutive = np.array(
+            [problem.faculty[faculty_id].max_consecutive_classes for faculty_id in problem.faculty], dtype=np.int16
+        )
+
+    @property
+    def shape(self):
+        return len(self.section_index), len(self.faculty_index), self.days, self.periods
+
+    def assignment(self, placements):
+        """(section, subject, faculty, room, slot, is_lab) placements -> int array of shape (N, 7)"""
+        rows = [
+            (self.section_index[section.id], self.faculty_index[faculty.id], self.subject_index[subject.id],
+             self.room_index[room.id], slot.day - 1, slot.period_number - 1, is_lab)
+            for section, subject, faculty, room, slot, is_lab in placements
+        ]
+        return np.array(rows, dtype=np.int32).reshape(-1, 7)
+
+
+def build_tensors(index, assignments):
+    """Stack K assignment arrays into (K, S, D, P) section and (K, F, D, P) faculty tensors.
+
+    Cells hold subject/room numbers + 1 (0 = free); faculty cells count
+    sessions so double bookings stay visible.
+    """
+    sections, faculty, days, periods = index.shape
+    k = len(assignments)
+    candidate = np.repeat(np.arange(k), [len(a) for a in assignments])
+    rows = np.concatenate(assignments) if k else np.zeros((0, 7), dtype=np.int32)
+
+    section_cell = (candidate, rows[:, SECTION], rows[:, DAY], rows[:, PERIOD])
+    section_subject = np.zeros((k, sections, days, periods), dtype=np.int32)
+    section_subject[section_cell] = rows[:, SUBJECT] + 1
+    section_room = np.zeros((k, sections, days, periods), dtype=np.int32)
+    section_room[section_cell] = rows[:, ROOM] + 1
+    section_lab = np.zeros((k, sections, days, periods), dtype=bool)
+    section_lab[section_cell] = rows[:, LAB].astype(bool)
+
+    faculty_load = np.zeros((k, faculty, days, periods), dtype=np.int16)
+    np.add.at(faculty_load, (candidate, rows[:, FACULTY], rows[:, DAY], rows[:, PERIOD]), 1)
+
+    return {
+        "section_subject": section_subject,
+        "section_room": section_room,
+        "section_lab": section_lab,
+        "faculty_load": faculty_load,
+    }
+
+
+def _idle_gaps(busy):
+    """Free periods between the first and last busy period of each (…, day) row, summed per candidate"""
+    periods = busy.shape[-1]
+    count = busy.sum(axis=-1)
+    first = busy.argmax(axis=-1)
+    last = periods - 1 - busy[..., ::-1].argmax(axis=-1)
+    gaps = np.where(count > 0, last - first + 1 - count, 0)
+    return gaps.reshape(gaps.shape[0], -1).sum(axis=1)
+
+
+def _daily_load_variance(busy):
+    """Variance of sessions per day, averaged over entities (rows with no sessions count as 0)"""
+    per_day = busy.sum(axis=-1)
+    if per_day.shape[1] == 0 or per_day.shape[2] == 0:
+        return np.zeros(per_day.shape[0])
+    return per_day.var(axis=-1).mean(axis=1)
+
+
+def _subject_repeats(section_subject, section_lab):
+    """Sessions of a theory subject beyond the first on the same day"""
+    theory = np.where(section_lab, 0, section_subject)
+    ordered = np.sort(theory, axis=-1)
+    distinct = (ordered[..., :1] > 0).sum(axis=-1) + (
+        (ordered[..., 1:] != ordered[..., :-1]) & (ordered[..., 1:] > 0)
+    ).sum(axis=-1)
+    repeats = (theory > 0).sum(axis=-1) - distinct
+    return repeats.reshape(repeats.shape[0], -1).sum(axis=1)
+
+
+def _streak_excess(busy, limits):
+    """Periods of each consecutive run beyond the faculty's limit (longest run per day)"""
+    run = np.zeros(busy.shape[:-1], dtype=np.int16)
+    longest = np.zeros_like(run)
+    for period in range(busy.shape[-1]):
+        run = (run + 1) * busy[..., period]
+        np.maximum(longest, run, out=longest)
+    excess = np.clip(longest - limits[None, :, None], 0, None)
+    return excess.reshape(excess.shape[0], -1).sum(axis=1)
+
+
+def _room_churn(section_room):
+    """Room changes between back-to-back classes of the same section and day"""
+    before, after = section_room[..., :-1], section_room[..., 1:]
+    changes = (before != after) & (before > 0) & (after > 0)
+    return changes.reshape(changes.shape[0], -1).sum(axis=1)
+
+
+def score_tensors(index, tensors, weights=None):
+    """Every metric as a (K,) array plus the weighted ``penalty``"""
+    weights = weights or DEFAULT_WEIGHTS
+    section_busy = tensors["section_subject"] > 0
+    faculty_busy = tensors["faculty_load"] > 0
+
+    metrics = {
+        "section_gaps": _idle_gaps(section_busy),
+        "faculty_gaps": _idle_gaps(faculty_busy),
+        "subject_repeats": _subject_repeats(tensors["section_subject"], tensors["section_lab"]),
+        "section_load_variance": _daily_load_variance(section_busy),
+        "faculty_load_variance": _daily_load_variance(faculty_busy),
+        "streak_excess": _streak_excess(faculty_busy, index.max_consecutive),
+        "room_churn": _room_churn(tensors["section_room"]),
+    }
+    metrics["penalty"] = sum(weights.get(name, 0.0) * values for name, values in metrics.items())
+    return metrics
+
+
+def score_assignments(index, assignments, weights=None):
+    """Score K assignment arrays at once; returns {metric: (K,) array}"""
+    return score_tensors(index, build_tensors(index, assignments), weights)
+
+
+def score_solutions(problem, solutions, weights=None, index=None):
+    """Score solver ``Solution`` objects; returns one {metric: float} dict per solution"""
+    index = index or ScoringIndex(problem)
+    metrics = score_assignments(index, [index.assignment(s.placements) for s in solutions], weights)
+    return [
+        {name: round(float(values[k]), 4) for name, values in metrics.items()}
+        for k in range(len(solutions))
+    ]
@@ -0,0 +1,268 @@
+import logging
+from .models import (
+    Faculty, FacultySubjectAllocation, Room, Section, Semester, Subject, TimetableSlot
+)
+
+logger = logging.getLogger(__name__)
+
+# Restrictions (sync with frontend)
+MAX_PERIODS_PER_DAY = 8
+MAX_WORKING_DAYS = 7
+
+
+class SetupValidationError(Exception):
+    """Raised with every problem found in a setup payload, not just the first"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(error.rstrip(".") for error in self.errors))
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def subject_code_stem(name):
+    """Leading part of a generated subject code (suffix is added at write time)"""
+    return name[:10].replace(' ', '').upper()
+
+
+def unique_code_stems(names):
+    """Code stems for the distinct subject ``names`` of one semester, in order.
+
+    Names sharing their first ten characters ("Mathematics I" and
+    "Mathematics II") would get the same stem, so later ones get a numeric
+    tail that no other name in the semester produces.
+    """
+    natural = {subject_code_stem(name) for name in names}
+    used = set()
+    stems = []
+    for name in names:
+        stem = subject_code_stem(name)
+        if stem in used:
+            tail = 2
+            while f"{stem}{tail}" in natural or f"{stem}{tail}" in used:
+                tail += 1
+            stem = f"{stem}{tail}"
+        used.add(stem)
+        stems.append(stem)
+    return stems
+
+
+# ---------------------------------------------------------------------------
+# Validation (in memory, no queries)
+# ---------------------------------------------------------------------------
+
+def validate_institute(data, errors, require_name=False):
+    """Validate the ``institute`` block of a setup payload"""
+    institute = data.get("institute")
+    if not isinstance(institute, dict):
+        errors.append("Institute details are required")
+        return None
+
+    required = ["course", "academicYear", "workingDays", "periodsPerDay", "periodDuration"]
+    if require_name:
+        required.insert(0, "name")
+    for field in required:
+        if institute.get(field) in (None, ""):
+            errors.append(f"Institute {field} is required")
+
+    working_days = _as_int(institute.get("workingDays"))
+    periods_per_day = _as_int(institute.get("periodsPerDay"))
+    period_duration = _as_int(institute.get("periodDuration"))
+    for field, value in (("workingDays", working_days), ("periodsPerDay", periods_per_day),
+                         ("periodDuration", period_duration)):
+        if value is None and institute.get(field) not in (None, ""):
+            errors.append(f"Institute {field} must be a whole number")
+    if periods_per_day is not None and not 1 <= periods_per_day <= MAX_PERIODS_PER_DAY:
+        errors.append(f"Periods per day must be between 1 and {MAX_PERIODS_PER_DAY}.")
+    if working_days is not None and not 1 <= working_days <= MAX_WORKING_DAYS:
+        errors.append(f"Working days must be between 1 and {MAX_WORKING_DAYS}.")
+
+    return {
+        "name": institute.get("name") or "Institution",
+        "course": institute.get("course"),
+        "academic_year": institute.get("academicYear"),
+        "working_days": working_days,
+        "periods_per_day": periods_per_day,
+        "period_duration": period_duration,
+    }
+
+
+def validate_rooms(data, errors):
+    """Validate the ``rooms`` list of a setup payload"""
+    rooms = []
+    for index, room in enumerate(data.get("rooms") or [], start=1):
+        if not room.get("name"):
+            errors.append(f"Room #{index}: name is required")
+            continue
+        rooms.append({"name": room["name"], "is_lab": bool(room.get("isLab", False))})
+    return rooms
+
+
+def validate_faculties(data, errors):
+    """Validate the ``faculties`` list of a setup payload"""
+    faculties = []
+    seen_names, seen_ids = set(), set()
+    for index, fac in enumerate(data.get("faculties") or [], start=1):
+        name, emp_id = fac.get("name"), fac.get("empId")
+        if not name or not emp_id:
+            errors.append(f"Faculty #{index}: name and empId are required")
+            continue
+        if name in seen_names:
+            errors.append(f"Faculty name '{name}' is listed more than once")
+        if emp_id in seen_ids:
+            errors.append(f"Employee ID '{emp_id}' is listed more than once")
+        seen_names.add(name)
+        seen_ids.add(emp_id)
+
+        max_hours = _as_int(fac.get("maxHours", 18))
+        if max_hours is None or max_hours < 0:
+            errors.append(f"Faculty '{name}': maxHours must be a non-negative number")
+            max_hours = 18
+        faculties.append({"name": name, "employee_id": emp_id, "max_hours_per_week": max_hours})
+    return faculties
+
+
+def validate_academics(academics, faculty_names, errors):
+    """Validate the ``academics`` list against the known faculty names.
+
+    A subject listed more than once in a semester (one entry per faculty
+    member) becomes one subject taught by all of them.
+    """
+    if not academics:
+        errors.append("Academic data is required")
+        return []
+
+    semesters = []
+    seen_numbers = set()
+    for sem_data in academics:
+        number = _as_int(sem_data.get("semester"))
+        if number is None:
+            errors.append(f"Invalid semester number: {sem_data.get('semester')}")
+            continue
+        if number in seen_numbers:
+            errors.append(f"Semester {number} is listed more than once")
+        seen_numbers.add(number)
+
+        if not sem_data.get("subjects"):
+            errors.append(f"No subjects defined for semester {number}")
+
+        subjects = {}  # name -> cleaned subject
+        for subj_data in sem_data.get("subjects") or []:
+            name = subj_data.get("name")
+            if not name:
+                errors.append(f"Subject name is required for semester {number}")
+                continue
+            faculty_name = subj_data.get("faculty")
+            if not faculty_name:
+                errors.append(f"Faculty assignment is required for subject {name}")
+                continue
+            if faculty_name not in faculty_names:
+                errors.append(f"Faculty '{faculty_name}' not found in your setup (subject {name}, semester {number})")
+                continue
+
+            weekly_hours = _as_int(subj_data.get("weeklyHours", 3))
+            lab_hours = _as_int(subj_data.get("labHours", 0))
+            if weekly_hours is None or weekly_hours < 0 or lab_hours is None or lab_hours < 0:
+                errors.append(f"Subject {name}: weeklyHours and labHours must be non-negative numbers")
+                continue
+
+            subject = subjects.setdefault(name, {
+                "name": name,
+                "weekly_hours": weekly_hours,
+                "lab_required": bool(subj_data.get("isLab", False)),
+                "lab_hours": lab_hours,
+                "faculty": [],
+            })
+            if faculty_name not in subject["faculty"]:
+                subject["faculty"].append(faculty_name)
+
+        for subject, stem in zip(subjects.values(), unique_code_stems(list(subjects))):
+            subject["stem"] = stem
+
+        sections = [str(name).strip() for name in sem_data.get("sections") or [] if str(name).strip()]
+        if not sections:
+            errors.append(f"No sections defined for semester {number}")
+
+        semesters.append({"number": number, "subjects": list(subjects.values()), "sections": sections})
+
+    return semesters
+
+
+def raise_if_errors(errors):
+    if errors:
+        raise SetupValidationError(errors)
+
+
+# ---------------------------------------------------------------------------
+# Bulk writes (one INSERT per model)
+# ---------------------------------------------------------------------------
+
+def create_timetable_slots(working_days, periods_per_day):
+    return TimetableSlot.objects.bulk_create([
+        TimetableSlot(day=day, period_number=period)
+        for day in range(1, working_days + 1)
+        for period in range(1, periods_per_day + 1)
+    ])
+
+
+def create_rooms(rooms, created_by=None):
+    return Room.objects.bulk_create([
+        Room(name=room["name"], is_lab=room["is_lab"], created_by=created_by)
+        for room in rooms
+    ])
+
+
+def create_faculties(faculties, created_by=None):
+    return Faculty.objects.bulk_create([
+        Faculty(
+            name=fac["name"],
+            employee_id=fac["employee_id"],
+            max_hours_per_week=fac["max_hours_per_week"],
+            created_by=created_by,
+        )
+        for fac in faculties
+    ])
+
+
+def create_academic_structure(course, semesters, faculty_map, code_suffix):
+    """Write semesters, subjects, sections and allocations with one bulk insert each.
+
+    ``faculty_map`` maps faculty name -> Faculty; ``code_suffix(number)``
+    returns the suffix appended to subject code stems. Returns the sections
+    in payload order.
+    """
+    semester_objs = Semester.objects.bulk_create([
+        Semester(course=course, name=f"Semester {sem['number']}", number=sem["number"])
+        for sem in semesters
+    ])
+
+    subject_rows = []  # (Subject, faculty names)
+    section_objs = []
+    for semester_obj, sem in zip(semester_objs, semesters):
+        for subj in sem["subjects"]:
+            subject_rows.append((Subject(
+                name=subj["name"],
+                semester=semester_obj,
+                code=f"{subj['stem']}{code_suffix(sem['number'])}",
+                weekly_hours=subj["weekly_hours"],
+                lab_required=subj["lab_required"],
+                lab_hours=subj["lab_hours"],
+            ), subj["faculty"]))
+        section_objs.extend(Section(name=name, semester=semester_obj) for name in sem["sections"])
+
+    Subject.objects.bulk_create([subject for subject, _ in subject_rows])
+    Section.objects.bulk_create(section_objs)
+    FacultySubjectAllocation.objects.bulk_create([
+        FacultySubjectAllocation(faculty=faculty_map[name], subject=subject)
+        for subject, faculty_names in subject_rows
+        for name in faculty_names
+    ])
+
+    logger.info(f"Created {len(semester_objs)} semesters, {len(subject_rows)} subjects, "
+                f"{len(section_objs)} sections for course {course.name}")
+    return section_objs
@@ -1,5 +1,6 @@
 from .models import *
 from django.db import transaction
+from .conditional import bump_generation_version
 
 @transaction.atomic
 def setup_sample_data():
@@ -15,6 +16,7 @@ def setup_sample_data():
     Faculty.objects.all().delete()
     Room.objects.all().delete()
     InstitutionSettings.objects.all().delete()
+    bump_generation_version()
 
     # Create new data
     course = Course.objects.create(name="MCA", code="MCA")
@@ -0,0 +1,18 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .token_auth import invalidate_cached_token
+
+
+@receiver(post_delete, sender=Token)
+def drop_deleted_token(sender, instance, **kwargs):
+    # Covers logout_user and tokens removed along with their user
+    invalidate_cached_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def drop_tokens_of_inactive_user(sender, instance, **kwargs):
+    if not instance.is_active:
+        for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+            invalidate_cached_token(key)
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from .metrics import record_cache_lookup
+from .problem import Solution
+
+logger = logging.getLogger(__name__)
+
+# Memoised solver results. The academic setup endpoints recreate sections and
+# subjects on every submission, so the key is built from the content of the
+# problem (names, hours, allocations, rooms, slot grid) in solver order rather
+# than from database ids, and stored placements refer to positions in that
+# order. The cache backend (``TIMETABLE_SOLUTION_CACHE``) bounds and evicts
+# the entries.
+
+SOLUTION_CACHE_PREFIX = 'timetable-solution:'
+CANONICAL_VERSION = 2  # bump when the solver changes so old solutions are not replayed
+
+
+def _solution_cache():
+    return caches[getattr(settings, 'TIMETABLE_SOLUTION_CACHE', 'default')]
+
+
+def canonical_problem(problem):
+    """JSON-able description of everything the solver's output depends on"""
+    slot_index = {slot.id: index for index, slot in enumerate(problem.slots)}
+    room_index = {room.id: index for index, room in enumerate(problem.rooms)}
+    faculty_ids = {demand.faculty.id for demand in problem.demands}
+    faculty_ids.update(faculty_id for _, faculty_id, _ in problem.fixed)
+
+    return {
+        "version": CANONICAL_VERSION,
+        "grid": [problem.working_days, problem.periods_per_day,
+                 [[slot.day, slot.period_number] for slot in problem.slots]],
+        "rooms": [[room.name, room.is_lab] for room in problem.rooms],
+        "sections": [[section.semester.number, section.name] for section in problem.sections],
+        "faculty": sorted([problem.faculty[faculty_id].employee_id, problem.faculty[faculty_id].max_hours_per_week]
+                          for faculty_id in faculty_ids if faculty_id in problem.faculty),
+        "demands": [[demand.section.semester.number, demand.section.name, demand.subject.name,
+                     demand.subject.weekly_hours, demand.is_lab, demand.faculty.employee_id, demand.sessions]
+                    for demand in problem.demands],
+        "fixed": sorted([slot_index.get(slot_id, -1),
+                         problem.faculty[faculty_id].employee_id if faculty_id in problem.faculty else None,
+                         room_index.get(room_id, -1)]
+                        for slot_id, faculty_id, room_id in problem.fixed),
+    }
+
+
+def _digest(document):
+    return hashlib.sha256(json.dumps(document, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def problem_hash(problem):
+    """Canonical hash of the problem alone (independent of solver options)"""
+    return _digest(canonical_problem(problem))
+
+
+def solution_key(problem_digest, options):
+    """Cache key for a problem hash plus the solver options that shape the result"""
+    return SOLUTION_CACHE_PREFIX + _digest({"problem": problem_digest, "options": options})
+
+
+def encode_solution(solution, problem):
+    """``solution`` as a JSON-able dict referring to ``problem``'s demands, rooms and slots by position"""
+    demand_index = {(demand.section.id, demand.subject.id): index for index, demand in enumerate(problem.demands)}
+    room_index = {room.id: index for index, room in enumerate(problem.rooms)}
+    slot_index = {slot.id: index for index, slot in enumerate(problem.slots)}
+    return {
+        "seed": solution.seed,
+        "scheduled": solution.scheduled,
+        "skipped": solution.skipped,
+        "total_sessions": solution.total_sessions,
+        "attempts": solution.attempts,
+        "faculty_hours": {problem.faculty[faculty_id].employee_id: hours
+                          for faculty_id, hours in solution.faculty_hours.items() if faculty_id in problem.faculty},
+        "placements": [[demand_index[(section.id, subject.id)], room_index[room.id], slot_index[slot.id]]
+                       for section, subject, faculty, room, slot, is_lab in solution.placements],
+    }
+
+
+def decode_solution(stored, problem):
+    """Rebuild an encoded solution against ``problem``'s rows (same problem_hash, possibly other ids)"""
+    faculty_by_employee_id = {faculty.employee_id: faculty for faculty in problem.faculty.values()}
+    solution = Solution(
+        seed=stored["seed"],
+        scheduled=stored["scheduled"],
+        skipped=stored["skipped"],
+        total_sessions=stored["total_sessions"],
+        attempts=stored["attempts"],
+        faculty_hours={faculty_by_employee_id[employee_id].id: hours
+                       for employee_id, hours in stored["faculty_hours"].items()
+                       if employee_id in faculty_by_employee_id},
+    )
+    for demand_index, room_index, slot_index in stored["placements"]:
+        demand = problem.demands[demand_index]
+        solution.placements.append((demand.section, demand.subject, demand.faculty,
+                                    problem.rooms[room_index], problem.slots[slot_index], demand.is_lab))
+    return solution
+
+
+def get_cached_solution(problem, key):
+    """Rebuild a stored solution against ``problem``'s current rows, or return None"""
+    stored = _solution_cache().get(key)
+    record_cache_lookup('solutions', stored is not None)
+    if stored is None:
+        return None
+    logger.info(f"Reusing cached timetable solution {key[len(SOLUTION_CACHE_PREFIX):][:12]}")
+    return decode_solution(stored, problem)
+
+
+def store_solution(problem, key, solution):
+    """Store ``solution`` by position so it can be replayed onto recreated rows"""
+    _solution_cache().set(key, encode_solution(solution, problem), None)
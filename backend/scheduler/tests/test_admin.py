@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from ..models import Faculty, Room, ScheduledSession
+from .utils import api_client, generate_sample_timetable
+
+CHANGELIST = '/admin/scheduler/scheduledsession/'
+
+
+class ScheduledSessionAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_superuser('admin'))
+
+    def listed(self, query=''):
+        response = self.client.get(CHANGELIST + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl'].result_count
+
+    def test_text_filters(self):
+        faculty = Faculty.objects.get(name="F1")
+        room = Room.objects.get(name="Lab1")
+        self.assertEqual(self.listed('?faculty_employee_id=E1'), ScheduledSession.objects.filter(faculty=faculty).count())
+        self.assertEqual(self.listed('?room_name=Lab1'), ScheduledSession.objects.filter(room=room).count())
+        self.assertEqual(self.listed('?faculty_employee_id=E1&room_name=Lab1'),
+                         ScheduledSession.objects.filter(faculty=faculty, room=room).count())
+        self.assertEqual(self.listed('?faculty_employee_id=nobody'), 0)
+
+    def test_sidebar_does_not_list_faculty_or_rooms(self):
+        response = self.client.get(CHANGELIST + '?room_name=Lab1')
+        self.assertContains(response, 'name="faculty_employee_id"')
+        # The active room filter is carried along by the faculty filter's form
+        self.assertContains(response, '<input type="hidden" name="room_name" value="Lab1">', html=True)
+        content = response.content.decode()
+        sidebar = content[content.index('id="changelist-filter"'):]
+        sidebar = sidebar[:sidebar.index('</nav>')]
+        self.assertNotIn('F1 (E1)', sidebar)
+        self.assertNotIn('R1 (Classroom)', sidebar)
@@ -0,0 +1,71 @@
+from collections import Counter
+import numpy as np
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from prometheus_client import REGISTRY
+from ..analytics import _idle_slots
+from ..models import ScheduledSession
+from .utils import api_client, generate_sample_timetable
+
+
+class IdleSlotsTests(SimpleTestCase):
+    def test_gaps_between_first_and_last_session(self):
+        occupied = np.array([
+            [1, 0, 0, 1, 0],  # two free periods in between
+            [0, 1, 1, 0, 0],  # no gap
+            [0, 0, 0, 0, 0],  # free day
+            [1, 0, 1, 0, 1],
+        ], dtype=bool)
+        self.assertEqual(_idle_slots(occupied).tolist(), [2, 0, 0, 2])
+
+
+class AnalyticsViewTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        _, self.client = api_client()
+        generate_sample_timetable(self.client)
+        self.sessions = list(ScheduledSession.current.select_related('slot'))
+
+    def analytics(self):
+        response = self.client.get('/timetable/analytics/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_totals_match_the_stored_sessions(self):
+        analytics = self.analytics()
+        self.assertEqual(analytics["sessions"], len(self.sessions))
+
+        rooms = {room["id"]: room for room in analytics["rooms"]["rooms"]}
+        per_room = Counter(session.room_id for session in self.sessions)
+        self.assertEqual({pk: room["sessions"] for pk, room in rooms.items() if room["sessions"]}, dict(per_room))
+        in_use = {(session.room_id, session.slot_id) for session in self.sessions}
+        self.assertEqual(sum(map(sum, analytics["rooms"]["heatmap"])), len(in_use))
+
+        faculty = {member["id"]: member for member in analytics["faculty"]["faculty"]}
+        per_faculty = Counter(session.faculty_id for session in self.sessions)
+        for pk, member in faculty.items():
+            self.assertEqual(member["hours"], per_faculty.get(pk, 0))
+            self.assertEqual(sum(member["hours_per_day"]), member["hours"])
+        self.assertEqual(sum(analytics["faculty"]["distribution"]["histogram"].values()), len(faculty))
+
+        sections = analytics["sections"]
+        per_section = Counter(session.section_id for session in self.sessions)
+        self.assertEqual({section["id"]: sum(section["sessions_per_day"]) for section in sections["sections"]},
+                         dict(per_section))
+        self.assertEqual(sum(sections["sessions_per_day"]), len(self.sessions))
+        for section in sections["sections"]:
+            self.assertEqual(len(section["sessions_per_day"]), len(analytics["days"]))
+
+    def test_cached_per_timetable_version(self):
+        def lookups(result):
+            return REGISTRY.get_sample_value('timetable_cache_requests_total',
+                                             {'cache': 'analytics', 'result': result}) or 0.0
+
+        misses, hits = lookups('miss'), lookups('hit')
+        first = self.analytics()
+        self.assertEqual(self.analytics(), first)
+        self.assertEqual((lookups('miss') - misses, lookups('hit') - hits), (1, 1))
+
+        generate_sample_timetable(self.client)
+        self.analytics()
+        self.assertEqual(lookups('miss') - misses, 2)
@@ -0,0 +1,77 @@
+import json
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from ..audit import audit_timetable
+from ..models import Faculty, Room, ScheduledSession
+from .utils import api_client, generate_sample_timetable
+
+
+class AuditTimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        self.sessions = list(ScheduledSession.current.select_related('slot').order_by('id'))
+
+    def double_book(self, **same):
+        """Move a session onto the slot of another session sharing ``same`` (e.g. room=...)"""
+        first = self.sessions[0]
+        other = next(s for s in self.sessions[1:] if s.slot_id != first.slot_id
+                     and all(getattr(s, field) == value for field, value in same.items()))
+        ScheduledSession.objects.filter(pk=other.pk).update(slot=first.slot)
+        return first
+
+    def test_generated_timetable_is_clean(self):
+        report = audit_timetable()
+        self.assertTrue(report["ok"])
+        self.assertEqual(report["sessions"], len(self.sessions))
+        self.assertEqual(set(report["counts"].values()), {0})
+
+    def test_fixed_number_of_queries(self):
+        with self.assertNumQueries(6):
+            audit_timetable()
+
+    def test_seeded_double_bookings_are_found(self):
+        first = self.sessions[0]
+        self.double_book(faculty_id=first.faculty_id, section_id=first.section_id)
+        report = audit_timetable()
+        self.assertFalse(report["ok"])
+        [faculty] = report["conflicts"]["faculty_double_bookings"]
+        self.assertEqual((faculty["id"], faculty["day"], faculty["period"], faculty["sessions"]),
+                         (first.faculty_id, first.slot.get_day_display(), first.slot.period_number, 2))
+        self.assertEqual(report["counts"]["section_double_bookings"], 1)
+
+    def test_room_double_booking(self):
+        first = self.sessions[0]
+        self.double_book(room_id=first.room_id)
+        [room] = audit_timetable()["conflicts"]["room_double_bookings"]
+        self.assertEqual((room["id"], room["sessions"]), (first.room_id, 2))
+
+    def test_hour_overruns_and_lab_mismatches(self):
+        first = self.sessions[0]
+        Faculty.objects.filter(pk=first.faculty_id).update(max_hours_per_week=1)
+        lab = next(s for s in self.sessions if s.is_lab_session)
+        classroom = Room.objects.get(name="R1")
+        ScheduledSession.objects.filter(pk=lab.pk).update(room=classroom)
+
+        conflicts = audit_timetable()["conflicts"]
+        self.assertEqual([row["id"] for row in conflicts["faculty_hour_overruns"]], [first.faculty_id])
+        self.assertEqual(conflicts["lab_room_mismatches"], [{"id": classroom.id, "name": "R1", "sessions": 1}])
+
+    def test_endpoint_and_command(self):
+        _, client = api_client()
+        self.assertTrue(client.get('/timetable/audit/').json()["ok"])
+        output = StringIO()
+        call_command('audit_timetable', stdout=output)
+        self.assertIn(f"No conflicts in {len(self.sessions)} sessions", output.getvalue())
+
+        first = self.sessions[0]
+        self.double_book(room_id=first.room_id)
+        self.assertEqual(client.get('/timetable/audit/').json()["counts"]["room_double_bookings"], 1)
+        output = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('audit_timetable', '--json', stdout=output)
+        self.assertEqual(json.loads(output.getvalue())["counts"]["room_double_bookings"], 1)
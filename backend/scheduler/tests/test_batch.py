@@ -0,0 +1,33 @@
+from django.test import TestCase
+from ..batch import batch_generate
+from ..models import Course, InstitutionSettings
+from .utils import api_client, generate_sample_timetable
+
+
+class BatchGenerateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user, client = api_client()
+        generate_sample_timetable(client)
+        cls.first = InstitutionSettings.objects.get(created_by=user)
+        other, _ = api_client('bob')
+        cls.second = InstitutionSettings.objects.create(
+            institution_name="Other College", course="MCA", academic_year="2025", working_days=5,
+            periods_per_day=6, period_duration=60, created_by=other, is_setup_complete=True,
+        )
+
+    def test_institutions_sharing_a_course_are_generated_once(self):
+        report = batch_generate(workers=1, seed=1)
+        rows = {row["institution"]: row for row in report["institutions"]}
+        self.assertEqual(rows[self.first.id]["status"], "success")
+        self.assertEqual(rows[self.second.id]["status"], "skipped")
+        self.assertIn(f"institution {self.first.id}", rows[self.second.id]["error"])
+        self.assertEqual((report["summary"]["succeeded"], report["summary"]["failed"],
+                          report["summary"]["duplicates"]), (1, 0, 1))
+
+    def test_ambiguous_course_name_fails(self):
+        Course.objects.create(name="MCA", code="MCA-2")
+        report = batch_generate(institution_ids=[self.first.id], workers=1, seed=1)
+        row = report["institutions"][0]
+        self.assertEqual(row["status"], "failed")
+        self.assertIn("matches several courses", row["error"])
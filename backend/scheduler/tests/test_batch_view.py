@@ -0,0 +1,24 @@
+from django.test import TestCase
+from .utils import api_client, generate_sample_timetable
+
+
+class TimetableBatchViewTests(TestCase):
+    def setUp(self):
+        _, self.client = api_client()
+        self.first_section = generate_sample_timetable(self.client).json()['section_id']
+
+    def test_sections_by_id_with_missing_ones(self):
+        ids = f"{self.first_section},{self.first_section + 1},999999"
+        data = self.client.get(f'/timetable/view/batch/?sections={ids}').json()
+        self.assertEqual([section['id'] for section in data['sections']],
+                         [self.first_section, self.first_section + 1])
+        self.assertEqual(data['missing'], [999999])
+
+    def test_semester_filter(self):
+        data = self.client.get('/timetable/view/batch/?semester=3&course=MCA').json()
+        self.assertEqual({section['semester'] for section in data['sections']}, {3})
+
+    def test_invalid_filters_are_400(self):
+        for query in ('sections=1,x', 'semester=abc', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/timetable/view/batch/?{query}').status_code, 400)
@@ -0,0 +1,41 @@
+from django.test import TestCase
+from scheduler.conditional import bump_generation_version, get_generation_state
+from scheduler.models import TimetableGenerationState
+from .utils import INSTITUTE_SETUP, api_client, generate_sample_timetable
+
+
+class GenerationCounterTests(TestCase):
+    def test_reading_never_creates_the_row(self):
+        _, client = api_client()
+        response = client.get('/timetable/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"0-'))
+        self.assertFalse(TimetableGenerationState.objects.exists())
+
+    def test_bump_creates_then_advances_a_single_row(self):
+        self.assertEqual(get_generation_state().version, 0)
+        bump_generation_version()
+        bump_generation_version()
+        self.assertEqual(list(TimetableGenerationState.objects.values_list('pk', 'version')), [(1, 2)])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user, self.client = api_client()
+        generate_sample_timetable(self.client)
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get('/timetable/list/')['ETag']
+        self.assertEqual(self.client.get('/timetable/list/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/timetable/list/', HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+
+    def test_every_reader_shares_the_counter(self):
+        etag = self.client.get('/timetable/list/')['ETag']
+        _, other = api_client('bob')
+        self.assertEqual(other.get('/timetable/list/')['ETag'], etag)
+
+    def test_institute_setup_invalidates_etags(self):
+        # Replacing faculty and rooms cascades onto the stored sessions
+        etag = self.client.get('/timetable/list/')['ETag']
+        self.client.post('/timetable/setup/institute/', INSTITUTE_SETUP, format='json')
+        self.assertEqual(self.client.get('/timetable/list/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
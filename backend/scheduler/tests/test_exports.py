@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import date
+from django.test import SimpleTestCase, TestCase
+from ..exports import CSV_HEADER, _ics_line, iter_occurrence_dates
+from ..models import ScheduledSession
+from .utils import api_client, generate_sample_timetable
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        _, self.client = api_client()
+        self.sessions = ScheduledSession.current.count()
+
+    def export(self, scope, fmt, query=''):
+        response = self.client.get(f'/timetable/export/{scope}/{fmt}/{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_has_one_row_per_session(self):
+        rows = list(csv.reader(io.StringIO(self.export('section', 'csv'))))
+        self.assertEqual(rows[0], CSV_HEADER)
+        self.assertEqual(len(rows) - 1, self.sessions)
+        # Each section comes out contiguously
+        sections = [(row[1], row[2]) for row in rows[1:]]
+        self.assertEqual(sections, sorted(sections, key=lambda key: (int(key[0]), key[1])))
+
+    def test_jsonl_by_faculty(self):
+        records = [json.loads(line) for line in self.export('faculty', 'jsonl').splitlines()]
+        self.assertEqual(len(records), self.sessions)
+        self.assertEqual(set(records[0]), set(CSV_HEADER))
+        faculty = [record["faculty"] for record in records]
+        self.assertEqual(faculty, sorted(faculty))
+        name = records[0]["faculty"]
+        self.assertEqual(faculty.count(name), ScheduledSession.current.filter(faculty__name=name).count())
+
+    def test_ics_has_a_dated_event_per_session_and_week(self):
+        # Two full weeks, Monday 6 to Sunday 19 January 2025
+        calendar = self.export('room', 'ics', '?term_start=2025-01-06&term_end=2025-01-19&day_start=08:30')
+        lines = calendar.split("\r\n")
+        self.assertEqual((lines[0], lines[-2], lines[-1]), ("BEGIN:VCALENDAR", "END:VCALENDAR", ""))
+        self.assertEqual(lines.count("BEGIN:VEVENT"), 2 * self.sessions)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+
+        session = ScheduledSession.current.select_related('slot').order_by('id').first()
+        start = f"DTSTART:202501{5 + session.slot.day:02d}T{8 + session.slot.period_number - 1:02d}3000"
+        self.assertIn(f"UID:session-{session.id}-202501{5 + session.slot.day:02d}@timetable", lines)
+        self.assertIn(start, lines)
+
+    def test_bad_requests(self):
+        for path in ('/timetable/export/course/csv/', '/timetable/export/section/xml/',
+                     '/timetable/export/section/ics/?term_start=2025-01-06',
+                     '/timetable/export/section/ics/?term_start=2025-01-06&term_end=2025-13-01',
+                     '/timetable/export/section/ics/?term_start=2025-02-01&term_end=2025-01-01'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 400)
+
+
+class IcsHelperTests(SimpleTestCase):
+    def test_long_lines_are_folded_without_splitting_characters(self):
+        line = "SUMMARY:" + "é" * 60
+        folded = _ics_line(line)
+        parts = folded[:-2].split("\r\n ")
+        self.assertEqual("".join(parts), line)
+        self.assertTrue(all(len(part.encode()) <= 74 for part in parts[1:]))
+        self.assertLessEqual(len(parts[0].encode()), 75)
+
+    def test_occurrence_dates(self):
+        # 1 January 2025 was a Wednesday
+        self.assertEqual(list(iter_occurrence_dates(1, date(2025, 1, 1), date(2025, 1, 20))),
+                         [date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20)])
+        self.assertEqual(list(iter_occurrence_dates(3, date(2025, 1, 1), date(2025, 1, 7))), [date(2025, 1, 1)])
@@ -0,0 +1,67 @@
+from django.test import TestCase
+from ..feasibility import check_feasibility
+from ..models import FacultySubjectAllocation
+from ..problem import build_demands, load_problem
+from .utils import api_client, generate_sample_timetable
+
+
+class CheckFeasibilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def kinds(self, report):
+        return {violation["kind"] for violation in report["violations"]}
+
+    def test_sample_setup_is_feasible(self):
+        report = check_feasibility(load_problem())
+        self.assertTrue(report["feasible"])
+        self.assertEqual(report["violations"], [])
+        self.assertEqual(report["slots"], 30)
+        self.assertEqual(report["total_sessions"], 4 * 4 * 3)
+
+    def test_faculty_limits(self):
+        problem = load_problem()
+        faculty = next(iter(problem.faculty.values()))
+        faculty.max_hours_per_week = 1
+        faculty.max_hours_per_day = 0
+        report = check_feasibility(problem)
+        self.assertFalse(report["feasible"])
+        self.assertEqual(self.kinds(report), {"faculty_weekly_hours", "faculty_daily_hours"})
+        weekly = next(v for v in report["violations"] if v["kind"] == "faculty_weekly_hours")
+        self.assertEqual((weekly["entity"], weekly["capacity"]), (faculty.name, 1))
+
+    def test_section_and_faculty_slots(self):
+        problem = load_problem()
+        problem.slots = problem.slots[:6]
+        report = check_feasibility(problem)
+        self.assertIn("section_slots", self.kinds(report))
+        self.assertIn("faculty_slots", self.kinds(report))
+        section = next(v for v in report["violations"] if v["kind"] == "section_slots")
+        self.assertEqual((section["demand"], section["capacity"]), (12, 6))
+
+    def test_room_capacity(self):
+        problem = load_problem()
+        problem.rooms = [room for room in problem.rooms if room.is_lab]
+        problem.slots = problem.slots[:12]
+        build_demands(problem)
+        report = check_feasibility(problem)
+        # A single lab room serves every session
+        self.assertIn("classroom_capacity", self.kinds(report))
+        self.assertIn("room_slots", self.kinds(report))
+
+    def test_no_rooms(self):
+        problem = load_problem()
+        problem.rooms = []
+        report = check_feasibility(problem)
+        self.assertIn("no_rooms", self.kinds(report))
+        self.assertFalse(report["feasible"])
+
+    def test_unallocated_subjects_are_warnings(self):
+        FacultySubjectAllocation.objects.filter(subject__name='Sub1_1').delete()
+        report = check_feasibility(load_problem())
+        self.assertTrue(report["feasible"])
+        self.assertEqual([(w["kind"], w["entity"]) for w in report["warnings"]],
+                         [("unallocated_subject", "Sub1_1")] * 2)
+        self.assertEqual(report["total_sessions"], 4 * 4 * 3 - 2 * 3)
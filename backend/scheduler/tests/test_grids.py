@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.test import Client, SimpleTestCase, TestCase
+from ..grids import compact_grid_document, compact_grid_documents, expand_grid_document
+from ..models import ScheduledSession
+from .utils import INSTITUTE_SETUP, api_client, generate_sample_timetable
+
+DAYS = ["Monday", "Tuesday"]
+PERIODS = ["1", "2", "3"]
+
+
+def grid_document(section, subjects, faculty, rooms, grid):
+    return {"section": section, "days": DAYS, "periods": PERIODS,
+            "subjects": subjects, "faculty": faculty, "rooms": rooms, "grid": grid}
+
+
+def expand_compact(compact, grid, days, periods):
+    """The ``timetable`` entries of one compact section matrix (what a client decodes)"""
+    timetable = []
+    for day_name, row in zip(days, grid):
+        for period, index in zip(periods, row):
+            if index == -1:
+                continue
+            subject, faculty, room, is_lab = compact["cells"][index]
+            timetable.append({
+                "day": day_name,
+                "period": int(period),
+                "subject": compact["subjects"][subject],
+                "faculty": compact["faculty"][faculty],
+                "room": compact["rooms"][room],
+                "is_lab": bool(is_lab),
+            })
+    return timetable
+
+
+class CompactGridDocumentsTests(SimpleTestCase):
+    def setUp(self):
+        # The two documents use different ids for the same names
+        self.documents = [
+            grid_document("A", {"1": "Maths", "2": "Physics"}, {"7": "Dr. X"}, {"3": "R1", "4": "Lab1"}, [
+                [[1, 7, 3, False], None, [2, 7, 4, True]],
+                [None, [1, 7, 3, False], None],
+            ]),
+            grid_document("B", {"11": "Maths"}, {"17": "Dr. X", "18": "Dr. Y"}, {"13": "R1"}, [
+                [None, [11, 18, 13, False], None],
+                [[11, 17, 13, False], None, None],
+            ]),
+        ]
+
+    def test_round_trip(self):
+        compact = compact_grid_documents(self.documents)
+        for document, section in zip(self.documents, compact["sections"]):
+            self.assertEqual(section["section"], document["section"])
+            self.assertEqual(expand_compact(compact, section["grid"], DAYS, PERIODS),
+                             expand_grid_document(document)["timetable"])
+
+    def test_tables_and_cells_are_shared(self):
+        compact = compact_grid_documents(self.documents)
+        self.assertEqual(compact["subjects"], ["Maths", "Physics"])
+        self.assertEqual(compact["faculty"], ["Dr. X", "Dr. Y"])
+        self.assertEqual(compact["rooms"], ["R1", "Lab1"])
+        # (Maths, Dr. X, R1, theory) is one cell for both sections
+        self.assertEqual(compact["cells"], [[0, 0, 0, 0], [1, 0, 1, 1], [0, 1, 0, 0]])
+        self.assertEqual([section["grid"] for section in compact["sections"]], [
+            [[0, -1, 1], [-1, 0, -1]],
+            [[-1, 2, -1], [0, -1, -1]],
+        ])
+
+    def test_single_document_and_empty_batch(self):
+        compact = compact_grid_document(self.documents[0])
+        self.assertEqual((compact["section"], compact["days"], compact["periods"]), ("A", DAYS, PERIODS))
+        self.assertEqual(expand_compact(compact, compact["grid"], DAYS, PERIODS),
+                         expand_grid_document(self.documents[0])["timetable"])
+        self.assertEqual(compact_grid_documents([]),
+                         {"subjects": [], "faculty": [], "rooms": [], "cells": [], "sections": []})
+
+
+class CompactLayoutViewTests(TestCase):
+    def setUp(self):
+        _, self.client = api_client()
+        self.first_section = generate_sample_timetable(self.client).json()['section_id']
+
+    def test_batch_layouts_agree(self):
+        query = '/timetable/view/batch/?semester=1&course=MCA'
+        expanded = self.client.get(query).json()
+        compact = self.client.get(query + '&layout=compact').json()
+        self.assertEqual((compact["days"], compact["periods"]), (expanded["days"], expanded["periods"]))
+        self.assertEqual([s["id"] for s in compact["sections"]], [s["id"] for s in expanded["sections"]])
+        for section, reference in zip(compact["sections"], expanded["sections"]):
+            self.assertEqual(expand_compact(compact, section["grid"], compact["days"], compact["periods"]),
+                             reference["timetable"])
+
+    def test_section_layouts_agree(self):
+        expanded = self.client.get(f'/timetable/view/{self.first_section}/').json()
+        compact = self.client.get(f'/timetable/view/{self.first_section}/?layout=compact').json()
+        self.assertTrue(expanded["timetable"])
+        self.assertEqual(expand_compact(compact, compact["grid"], compact["days"], compact["periods"]),
+                         expanded["timetable"])
+
+
+class GridRefreshTests(TestCase):
+    def setUp(self):
+        _, self.client = api_client()
+        generate_sample_timetable(self.client)
+        self.section = ScheduledSession.current.values_list('section_id', flat=True).first()
+
+    def view(self):
+        response = self.client.get(f'/timetable/view/{self.section}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()["timetable"]
+
+    def test_saving_the_institute_setup_again_clears_the_grids(self):
+        self.assertTrue(self.view())
+        response = self.client.post('/timetable/setup/institute/', INSTITUTE_SETUP, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse(ScheduledSession.current.exists())
+        self.assertEqual(self.view(), [])
+        batch = self.client.get(f'/timetable/view/batch/?sections={self.section}').json()
+        self.assertEqual(batch["sections"][0]["timetable"], [])
+
+    def test_admin_deletes_refresh_the_grids(self):
+        admin_client = Client()
+        admin_client.force_login(User.objects.create_superuser('admin'))
+        faculty = ScheduledSession.current.filter(section_id=self.section).first().faculty
+        response = admin_client.post(f'/admin/scheduler/faculty/{faculty.id}/delete/', {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        entries = self.view()
+        self.assertTrue(entries)
+        self.assertNotIn(faculty.name, {entry["faculty"] for entry in entries})
+
+        room = ScheduledSession.current.filter(section_id=self.section).first().room
+        response = admin_client.post('/admin/scheduler/room/', {
+            "action": "delete_selected", "_selected_action": [room.id], "post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn(room.name, {entry["room"] for entry in self.view()})
+
+    def test_unknown_section(self):
+        self.assertEqual(self.client.get('/timetable/view/999999/').status_code, 404)
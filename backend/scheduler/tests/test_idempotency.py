@@ -0,0 +1,94 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from ..models import InstitutionSettings
+from ..views import create_rooms
+from .utils import INSTITUTE_SETUP, api_client
+
+SETUP_URL = '/timetable/setup/institute/'
+INVALID_SETUP = dict(INSTITUTE_SETUP, institute=dict(INSTITUTE_SETUP["institute"], workingDays=0))
+
+
+class IdempotentViewTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        _, self.client = api_client()
+
+    def post(self, key, data=INSTITUTE_SETUP, client=None):
+        return (client or self.client).post(SETUP_URL, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_repeat_is_replayed(self):
+        first = self.post('setup-1')
+        self.assertEqual(first.status_code, 200, first.content)
+        self.assertNotIn('Idempotent-Replayed', first)
+        settings_id = InstitutionSettings.objects.get().id
+
+        repeat = self.post('setup-1')
+        self.assertEqual((repeat.status_code, repeat.json()), (200, first.json()))
+        self.assertEqual(repeat['Idempotent-Replayed'], 'true')
+        # The view did not run again (it would have recreated the settings row)
+        self.assertEqual(InstitutionSettings.objects.get().id, settings_id)
+
+    def test_requests_without_a_key_always_run(self):
+        self.client.post(SETUP_URL, INSTITUTE_SETUP, format='json')
+        settings_id = InstitutionSettings.objects.get().id
+        response = self.client.post(SETUP_URL, INSTITUTE_SETUP, format='json')
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertNotEqual(InstitutionSettings.objects.get().id, settings_id)
+
+    def test_key_reused_for_another_request(self):
+        self.assertEqual(self.post('setup-1').status_code, 200)
+        other = dict(INSTITUTE_SETUP, institute=dict(INSTITUTE_SETUP["institute"], periodsPerDay=7))
+        response = self.post('setup-1', other)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(InstitutionSettings.objects.get().periods_per_day, 6)
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.assertEqual(self.post('setup-1').status_code, 200)
+        _, other_client = api_client('bob')
+        # Another body under the same key would be a 422 if the key were shared
+        own_faculty = [dict(faculty, empId=f"B{i}") for i, faculty in enumerate(INSTITUTE_SETUP["faculties"])]
+        response = self.post('setup-1', dict(INSTITUTE_SETUP, faculties=own_faculty), client=other_client)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(InstitutionSettings.objects.count(), 2)
+
+    def test_client_errors_are_replayed(self):
+        first = self.post('setup-1', INVALID_SETUP)
+        self.assertEqual(first.status_code, 400)
+        repeat = self.post('setup-1', INVALID_SETUP)
+        self.assertEqual((repeat.status_code, repeat['Idempotent-Replayed']), (400, 'true'))
+
+    def test_server_errors_release_the_key(self):
+        with mock.patch('scheduler.views.create_rooms', side_effect=RuntimeError("database went away")):
+            self.assertEqual(self.post('setup-1').status_code, 500)
+        retry = self.post('setup-1')
+        self.assertEqual(retry.status_code, 200, retry.content)
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertTrue(InstitutionSettings.objects.exists())
+
+    def test_exceptions_release_the_key(self):
+        with mock.patch('scheduler.views.setup_error_response', side_effect=RuntimeError("unexpected")):
+            with self.assertRaises(RuntimeError):
+                self.post('setup-1', INVALID_SETUP)
+        response = self.post('setup-1', INVALID_SETUP)
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_duplicate_of_a_request_in_progress(self):
+        duplicates = []
+
+        def create_rooms_and_repeat(*args, **kwargs):
+            duplicates.append(self.post('setup-1'))
+            return create_rooms(*args, **kwargs)
+
+        with mock.patch('scheduler.views.create_rooms', side_effect=create_rooms_and_repeat):
+            self.assertEqual(self.post('setup-1').status_code, 200)
+        self.assertEqual(duplicates[0].status_code, 409)
+        self.assertIn('Retry-After', duplicates[0])
+        self.assertEqual(self.post('setup-1')['Idempotent-Replayed'], 'true')
+
+    def test_overlong_key(self):
+        self.assertEqual(self.post('k' * 256).status_code, 400)
+        self.assertFalse(InstitutionSettings.objects.exists())
@@ -0,0 +1,85 @@
+import io
+from django.contrib.auth.models import User
+from django.test import TestCase
+from openpyxl import Workbook
+from scheduler.importers import SetupImportError, import_rows, iter_csv_rows, iter_rows, iter_xlsx_rows
+from scheduler.models import Faculty, FacultySubjectAllocation, InstitutionSettings, Room, Section, Subject
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode('utf-8-sig'))
+
+
+class RowReaderTests(TestCase):
+    def test_csv_headers_are_normalised_and_blank_rows_skipped(self):
+        rows = list(iter_csv_rows(csv_file("Name,Is Lab\nR1,yes\n,\nR2,no\n")))
+        self.assertEqual(rows, [(2, {'name': 'R1', 'is_lab': 'yes'}), (4, {'name': 'R2', 'is_lab': 'no'})])
+
+    def test_xlsx_rows(self):
+        workbook = Workbook()
+        workbook.active.append(['Emp ID', 'Name'])
+        workbook.active.append(['E1', 'Ann'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        self.assertEqual(list(iter_xlsx_rows(buffer)), [(2, {'emp_id': 'E1', 'name': 'Ann'})])
+
+    def test_unknown_extension(self):
+        with self.assertRaises(SetupImportError):
+            iter_rows(csv_file(""), "faculty.json")
+
+
+class ImportRowsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='alice')
+
+    def test_faculty_chunks_report_progress_and_reject_duplicates(self):
+        Faculty.objects.create(name="Existing", employee_id="E0")
+        progress = []
+        rows = iter_csv_rows(csv_file(
+            "name,empId,maxHours\nAnn,E1,12\nBob,E0,10\nCid,E2,-1\nDee,E1,8\nEve,E3,\n"
+        ))
+        report = import_rows('faculty', rows, user=self.user, chunk_size=2, on_progress=progress.append)
+
+        self.assertEqual((report['rows'], report['created'], report['skipped']), (5, 2, 3))
+        self.assertEqual(report['errors'], [
+            "Row 3: employee_id E0 already exists",
+            "Row 4: hour limits for E2 must be non-negative numbers",
+            "Row 5: employee_id E1 already exists",
+        ])
+        self.assertEqual([p['rows'] for p in progress], [2, 2, 1])
+        self.assertEqual(Faculty.objects.get(employee_id="E3").max_hours_per_week, 18)
+
+    def test_rooms(self):
+        report = import_rows('rooms', iter_csv_rows(csv_file("room,lab\nR1,no\nLab 1,yes\n,yes\n")), user=self.user)
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(list(Room.objects.order_by('name').values_list('name', 'is_lab')),
+                         [("Lab 1", True), ("R1", False)])
+
+    def test_subjects_need_institute_setup(self):
+        with self.assertRaises(SetupImportError):
+            import_rows('subjects', iter([]), user=self.user)
+
+    def test_subjects_create_semesters_sections_and_allocations(self):
+        InstitutionSettings.objects.create(course="MCA", academic_year="2025", working_days=5, periods_per_day=6,
+                                           period_duration=60, created_by=self.user)
+        Faculty.objects.create(name="Ann", employee_id="E1", created_by=self.user)
+        rows = iter_csv_rows(csv_file(
+            "semester,subject,faculty,hours,sections\n"
+            "1,Maths,Ann,4,A;B\n"
+            "1,Physics,E1,3,A\n"
+            "2,Chemistry,Nobody,3,A\n"
+            "1,Maths,Ann,4,A\n"
+        ))
+        report = import_rows('subjects', rows, user=self.user, chunk_size=3)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(report['errors'], ["Row 4: faculty 'Nobody' not found",
+                                            "Row 5: subject Maths already exists in semester 1"])
+        self.assertEqual(sorted(Section.objects.values_list('name', flat=True)), ["A", "B"])
+        self.assertEqual(Subject.objects.get(name="Maths").weekly_hours, 4)
+        self.assertEqual(FacultySubjectAllocation.objects.count(), 2)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(SetupImportError):
+            import_rows('timetables', iter([]))
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from ..models import Faculty, Room, ScheduledSession
+from .utils import api_client, generate_sample_timetable
+
+
+class InverseTimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        _, self.client = api_client()
+
+    def slots(self, entries):
+        return [(entry["day"], entry["period"]) for entry in entries]
+
+    def test_faculty_timetable(self):
+        faculty = Faculty.objects.get(name="F1")
+        sessions = ScheduledSession.current.filter(faculty=faculty)
+        response = self.client.get(f'/timetable/view/faculty/{faculty.id}/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["faculty"]["employee_id"], "E1")
+        self.assertEqual(data["hours_scheduled"], sessions.count())
+        self.assertEqual(len(data["days"]), 5)
+        self.assertEqual(self.slots(data["timetable"]), sorted(
+            self.slots(data["timetable"]), key=lambda slot: (data["days"].index(slot[0]), slot[1])))
+        self.assertEqual({entry["subject"] for entry in data["timetable"]},
+                         set(sessions.values_list('subject__name', flat=True)))
+
+    def test_room_timetable(self):
+        lab = Room.objects.get(name="Lab1")
+        response = self.client.get(f'/timetable/view/room/{lab.id}/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["room"], {"id": lab.id, "name": "Lab1", "is_lab": True})
+        self.assertEqual(data["hours_scheduled"], ScheduledSession.current.filter(room=lab).count())
+        self.assertTrue(data["timetable"])
+        self.assertTrue(all(entry["is_lab"] for entry in data["timetable"]))
+        # A room never holds two sessions at once
+        self.assertEqual(len(set(self.slots(data["timetable"]))), len(data["timetable"]))
+
+    def test_unused_and_unknown_rows(self):
+        idle = Faculty.objects.create(name="Idle", employee_id="IDLE")
+        response = self.client.get(f'/timetable/view/faculty/{idle.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["hours_scheduled"], response.json()["timetable"]), (0, []))
+        self.assertEqual(self.client.get('/timetable/view/faculty/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/timetable/view/room/999999/').status_code, 404)
+
+    def test_single_query_for_the_sessions(self):
+        faculty = Faculty.objects.get(name="F1")
+        self.client.get(f'/timetable/view/faculty/{faculty.id}/')  # warm the auth path
+        # generation counter, the joined session query and the slot axes
+        with self.assertNumQueries(3):
+            self.client.get(f'/timetable/view/faculty/{faculty.id}/')
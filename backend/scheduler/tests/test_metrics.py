@@ -0,0 +1,81 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from .utils import api_client, generate_sample_timetable
+
+VIEW_ROUTE = '/timetable/view/<int:section_id>/'
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class MetricsMiddlewareTests(TestCase):
+    # The metrics are process-wide, so every check compares before/after values
+
+    @classmethod
+    def setUpTestData(cls):
+        user, client = api_client()
+        cls.section = generate_sample_timetable(client).json()['section_id']
+        cls.token = Token.objects.create(user=user).key
+
+    def setUp(self):
+        caches['default'].clear()
+        # Token credentials, which the async views accept too
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def test_latency_and_queries_per_route(self):
+        requests = sample('timetable_http_request_duration_seconds_count',
+                          method='GET', endpoint=VIEW_ROUTE, status='200')
+        queries = sample('timetable_http_request_db_queries_sum', endpoint=VIEW_ROUTE)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(f'/timetable/view/{self.section}/').status_code, 200)
+
+        self.assertEqual(sample('timetable_http_request_duration_seconds_count',
+                                method='GET', endpoint=VIEW_ROUTE, status='200'), requests + 1)
+        self.assertEqual(sample('timetable_http_request_db_queries_sum', endpoint=VIEW_ROUTE),
+                         queries + len(captured))
+
+    def test_async_views_and_unmatched_paths(self):
+        route = '/timetable/async/view/<int:section_id>/'
+        queries = sample('timetable_http_request_db_queries_sum', endpoint=route)
+        self.assertEqual(self.client.get(f'/timetable/async/view/{self.section}/').status_code, 200)
+        # Queries run through sync_to_async are counted as well
+        self.assertGreater(sample('timetable_http_request_db_queries_sum', endpoint=route), queries)
+
+        missing = sample('timetable_http_request_duration_seconds_count',
+                         method='GET', endpoint='unmatched', status='404')
+        self.client.get('/no/such/page/')
+        self.assertEqual(sample('timetable_http_request_duration_seconds_count',
+                                method='GET', endpoint='unmatched', status='404'), missing + 1)
+
+    def test_generation_and_cache_metrics(self):
+        generations = sample('timetable_generation_duration_seconds_count',
+                             solver='greedy', mode='write', status='success')
+        rates = sample('timetable_generation_success_rate_percent_count', solver='greedy')
+        generate_sample_timetable(self.client)
+        self.assertEqual(sample('timetable_generation_duration_seconds_count',
+                                solver='greedy', mode='write', status='success'), generations + 1)
+        self.assertEqual(sample('timetable_generation_success_rate_percent_count', solver='greedy'), rates + 1)
+
+        caches['default'].clear()
+        misses = sample('timetable_cache_requests_total', cache='auth_token', result='miss')
+        hits = sample('timetable_cache_requests_total', cache='auth_token', result='hit')
+        self.client.get('/timetable/setup/status/')
+        self.client.get('/timetable/setup/status/')
+        self.assertEqual(sample('timetable_cache_requests_total', cache='auth_token', result='miss'), misses + 1)
+        self.assertEqual(sample('timetable_cache_requests_total', cache='auth_token', result='hit'), hits + 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get(f'/timetable/view/{self.section}/')
+        response = APIClient().get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn(f'timetable_http_request_db_queries_count{{endpoint="{VIEW_ROUTE}"}}', body)
+        self.assertIn('timetable_generations_in_progress', body)
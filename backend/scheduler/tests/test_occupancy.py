@@ -0,0 +1,153 @@
+from unittest import mock
+from django.test import TestCase
+from .. import occupancy
+from ..models import Room, ScheduledSession
+from ..occupancy import OccupancyIndex
+from .utils import api_client, generate_sample_timetable
+
+
+class OccupancyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        # Test transactions roll back, so the process-wide index must not outlive a test
+        occupancy._latest.update(key=None, index=None)
+        _, self.client = api_client()
+        self.index = OccupancyIndex.current()
+        self.sessions = list(ScheduledSession.current.order_by('id'))
+
+    def other_session(self, session, **same):
+        return next(other for other in self.sessions if other.id != session.id and other.slot_id != session.slot_id
+                    and all(getattr(other, field) == getattr(session, field) for field in same))
+
+
+class ConflictTests(OccupancyTestCase):
+    def test_own_slot_and_room_is_free(self):
+        session = self.sessions[0]
+        self.assertEqual(self.index.conflicts(session.id, session.slot_id, session.room_id), [])
+
+    def test_unknown_slot_and_room(self):
+        session = self.sessions[0]
+        self.assertEqual(self.index.conflicts(session.id, 999999, session.room_id), ["slot_not_found"])
+        self.assertEqual(self.index.conflicts(session.id, session.slot_id, 999999), ["room_not_found"])
+
+    def test_busy_section_faculty_and_room(self):
+        session = self.sessions[0]
+        same_section = self.other_session(session, section_id=session.section_id)
+        self.assertIn("section_busy", self.index.conflicts(session.id, same_section.slot_id, session.room_id))
+
+        other_section = [s for s in self.sessions if s.section_id != session.section_id]
+        same_faculty = next(s for s in other_section if s.faculty_id == session.faculty_id)
+        self.assertIn("faculty_busy", self.index.conflicts(session.id, same_faculty.slot_id, session.room_id))
+
+        elsewhere = next(s for s in other_section if s.faculty_id != session.faculty_id)
+        self.assertIn("room_busy", self.index.conflicts(session.id, elsewhere.slot_id, elsewhere.room_id))
+
+    def test_theory_session_cannot_use_a_lab(self):
+        session = next(s for s in self.sessions if not s.is_lab_session)
+        lab = Room.objects.get(name="Lab1")
+        self.assertIn("room_type", self.index.conflicts(session.id, session.slot_id, lab.id))
+
+    def test_swap_ignores_the_other_session(self):
+        first = self.sessions[0]
+        second = self.other_session(first, section_id=first.section_id, room_id=first.room_id)
+        self.assertIn("section_busy", self.index.conflicts(first.id, second.slot_id, second.room_id))
+        reasons = self.index.conflicts(first.id, second.slot_id, second.room_id, ignore=(second.id,))
+        self.assertNotIn("section_busy", reasons)
+        self.assertNotIn("room_busy", reasons)
+
+    def test_alternatives_are_conflict_free(self):
+        session = self.sessions[0]
+        alternatives = self.index.alternatives(session.id)
+        self.assertTrue(alternatives)
+        for option in alternatives:
+            self.assertEqual(self.index.conflicts(session.id, option["slot"], option["room"]), [])
+
+
+class CurrentIndexTests(OccupancyTestCase):
+    def test_index_is_reused_until_the_timetable_changes(self):
+        self.assertIs(OccupancyIndex.current(), self.index)
+
+        session = self.sessions[0]
+        option = self.index.alternatives(session.id, limit=1)[0]
+        response = self.client.post(f'/timetable/sessions/{session.id}/move/',
+                                    {"slot": option["slot"], "room": option["room"]}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        index = OccupancyIndex.current()
+        self.assertIsNot(index, self.index)
+        self.assertEqual(index.sessions[session.id][4:6], (option["room"], option["slot"]))
+
+
+class EditTests(OccupancyTestCase):
+    def move(self, client, session, option):
+        return client.post(f'/timetable/sessions/{session.id}/move/',
+                           {"slot": option["slot"], "room": option["room"]}, format='json')
+
+    def test_only_the_timetable_owner_can_edit(self):
+        session = self.sessions[0]
+        other = self.other_session(session, section_id=session.section_id)
+        _, stranger = api_client('bob')
+        option = self.index.alternatives(session.id, limit=1)[0]
+        self.assertEqual(self.move(stranger, session, option).status_code, 404)
+        response = stranger.post(f'/timetable/sessions/{session.id}/swap/', {"with": other.id}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual([(s.slot_id, s.room_id) for s in ScheduledSession.current.order_by('id')],
+                         [(s.slot_id, s.room_id) for s in self.sessions])
+
+    def test_edits_are_serialised_before_the_index_is_read(self):
+        session = self.sessions[0]
+        option = self.index.alternatives(session.id, limit=1)[0]
+        calls = mock.Mock()
+        with mock.patch('scheduler.views.lock_timetable_edits', calls.lock), \
+                mock.patch('scheduler.views.OccupancyIndex.current', calls.current):
+            calls.current.return_value = self.index
+            self.assertEqual(self.move(self.client, session, option).status_code, 200)
+        self.assertEqual([name for name, _, _ in calls.mock_calls[:2]], ['lock', 'current'])
+
+
+class SubstituteTests(OccupancyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.absent = self.sessions[0].faculty_id
+        self.day = self.index.slots[self.index.slot_pos[self.sessions[0].slot_id]].day
+
+    def test_candidates_are_free_and_under_their_limits(self):
+        covers = self.index.substitutes(self.absent, self.day)
+        affected = [s for s in self.sessions if s.faculty_id == self.absent and s.slot.day == self.day]
+        self.assertEqual(sorted(row[0] for row, _ in covers), sorted(s.id for s in affected))
+        for row, candidates in covers:
+            slot = self.index.slot_pos[row[5]]
+            for candidate in candidates:
+                self.assertNotEqual(candidate["id"], self.absent)
+                self.assertEqual(self.index.faculty_load[self.index.faculty_pos[candidate["id"]], slot], 0)
+                self.assertLess(candidate["weekly_hours"], candidate["max_hours_per_week"])
+                self.assertLess(candidate["day_hours"], candidate["max_hours_per_day"])
+
+    def test_allocated_faculty_come_first(self):
+        row, candidates = self.index.substitutes(self.absent, self.day)[0]
+        least_loaded = candidates[-1]["id"]
+        row, candidates = self.index.substitutes(self.absent, self.day, allocated={(least_loaded, row[2])})[0]
+        self.assertEqual(candidates[0]["id"], least_loaded)
+        self.assertTrue(candidates[0]["allocated"])
+        self.assertEqual([c["weekly_hours"] for c in candidates[1:]], sorted(c["weekly_hours"] for c in candidates[1:]))
+
+    def test_faculty_at_their_limit_are_left_out(self):
+        row, candidates = self.index.substitutes(self.absent, self.day)[0]
+        full = candidates[0]
+        # setUp starts every test from a freshly built index, so it can be edited in place here
+        self.index.faculty[self.index.faculty_pos[full["id"]]].max_hours_per_week = full["weekly_hours"]
+        _, candidates = self.index.substitutes(self.absent, self.day)[0]
+        self.assertNotIn(full["id"], [c["id"] for c in candidates])
+
+    def test_endpoint(self):
+        response = self.client.get(f'/timetable/substitutes/?faculty={self.absent}&day={self.day}&limit=2')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["faculty"]["id"], self.absent)
+        self.assertTrue(all(len(entry["substitutes"]) <= 2 for entry in data["sessions"]))
+        self.assertEqual(self.client.get('/timetable/substitutes/?faculty=999999&day=Mon').status_code, 404)
+        self.assertEqual(self.client.get(f'/timetable/substitutes/?faculty={self.absent}&day=x').status_code, 400)
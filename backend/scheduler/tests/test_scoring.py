@@ -0,0 +1,72 @@
+from django.test import TestCase
+from ..problem import Solution, load_problem
+from ..scoring import DEFAULT_WEIGHTS, score_solutions
+from .utils import api_client, generate_sample_timetable
+
+
+class ScoreSolutionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        self.problem = load_problem()
+        self.slots = {(slot.day, slot.period_number): slot for slot in self.problem.slots}
+        self.section = self.problem.sections[0]
+        self.demands = [demand for demand in self.problem.demands if demand.section.id == self.section.id]
+        self.theory = [demand for demand in self.demands if not demand.is_lab]
+        self.classroom, self.other_classroom = [room for room in self.problem.rooms if not room.is_lab][:2]
+
+    def solution(self, *cells):
+        """Solution placing (demand, room, day, period) cells"""
+        return Solution(seed=0, placements=[
+            (demand.section, demand.subject, demand.faculty, room, self.slots[(day, period)], demand.is_lab)
+            for demand, room, day, period in cells
+        ])
+
+    def score(self, *cells, weights=None):
+        return score_solutions(self.problem, [self.solution(*cells)], weights)[0]
+
+    def test_empty_solution_has_no_penalty(self):
+        scores = self.score()
+        self.assertEqual(set(scores), set(DEFAULT_WEIGHTS) | {"penalty"})
+        self.assertTrue(all(value == 0 for value in scores.values()))
+
+    def test_section_gaps_and_room_churn(self):
+        first, second = self.theory[:2]
+        scores = self.score((first, self.classroom, 1, 1), (second, self.classroom, 1, 3))
+        self.assertEqual((scores["section_gaps"], scores["room_churn"]), (1, 0))
+        scores = self.score((first, self.classroom, 1, 1), (second, self.other_classroom, 1, 2))
+        self.assertEqual((scores["section_gaps"], scores["room_churn"]), (0, 1))
+
+    def test_subject_repeats_only_count_theory(self):
+        theory = self.theory[0]
+        lab = next(demand for demand in self.demands if demand.is_lab)
+        scores = self.score(*[(theory, self.classroom, 1, period) for period in (1, 2, 3)])
+        self.assertEqual(scores["subject_repeats"], 2)
+        scores = self.score(*[(lab, self.classroom, 1, period) for period in (1, 2)])
+        self.assertEqual(scores["subject_repeats"], 0)
+
+    def test_streak_excess_uses_the_faculty_limit(self):
+        demand = self.theory[0]
+        cells = [(demand, self.classroom, 2, period) for period in range(1, 6)]
+        limit = demand.faculty.max_consecutive_classes
+        self.assertEqual(self.score(*cells)["streak_excess"], max(0, 5 - limit))
+        demand.faculty.max_consecutive_classes = 1
+        self.assertEqual(self.score(*cells)["streak_excess"], 4)
+
+    def test_spreading_sessions_lowers_the_load_variance(self):
+        first, second = self.theory[:2]
+        same_day = self.score((first, self.classroom, 1, 1), (second, self.classroom, 1, 2))
+        two_days = self.score((first, self.classroom, 1, 1), (second, self.classroom, 2, 1))
+        self.assertLess(two_days["section_load_variance"], same_day["section_load_variance"])
+
+    def test_weights_and_batch_order(self):
+        first, second = self.theory[:2]
+        gap = self.solution((first, self.classroom, 1, 1), (second, self.classroom, 1, 4))
+        compact = self.solution((first, self.classroom, 1, 1), (second, self.classroom, 1, 2))
+        scores = score_solutions(self.problem, [gap, compact], weights={"section_gaps": 10.0})
+        self.assertEqual([s["section_gaps"] for s in scores], [2, 0])
+        self.assertEqual([s["penalty"] for s in scores], [20.0, 0.0])
+        self.assertEqual(score_solutions(self.problem, [compact])[0], score_solutions(self.problem, [gap, compact])[1])
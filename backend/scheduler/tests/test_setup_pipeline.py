@@ -0,0 +1,139 @@
+from django.test import SimpleTestCase, TestCase
+from scheduler.models import Course, FacultySubjectAllocation, Section, Subject
+from scheduler.setup_pipeline import (
+    SetupValidationError, create_academic_structure, create_faculties, raise_if_errors,
+    validate_academics, validate_faculties, validate_institute, validate_rooms,
+)
+from .utils import INSTITUTE_SETUP, api_client
+
+
+class ValidateInstituteTests(SimpleTestCase):
+    def test_valid_block_is_cleaned(self):
+        errors = []
+        institute = validate_institute(INSTITUTE_SETUP, errors, require_name=True)
+        self.assertEqual(errors, [])
+        self.assertEqual(institute["working_days"], 5)
+        self.assertEqual(institute["periods_per_day"], 6)
+        self.assertEqual(institute["name"], "Test College")
+
+    def test_every_problem_is_reported(self):
+        errors = []
+        validate_institute({"institute": {"course": "", "academicYear": "2025", "workingDays": "x",
+                                          "periodsPerDay": 12, "periodDuration": 60}}, errors, require_name=True)
+        self.assertIn("Institute name is required", errors)
+        self.assertIn("Institute course is required", errors)
+        self.assertIn("Institute workingDays must be a whole number", errors)
+        self.assertIn("Periods per day must be between 1 and 8.", errors)
+
+    def test_missing_block(self):
+        errors = []
+        self.assertIsNone(validate_institute({}, errors))
+        self.assertEqual(errors, ["Institute details are required"])
+
+
+class ValidateRoomsAndFacultyTests(SimpleTestCase):
+    def test_rooms_need_a_name(self):
+        errors = []
+        rooms = validate_rooms({"rooms": [{"name": "R1", "isLab": True}, {"isLab": False}]}, errors)
+        self.assertEqual(rooms, [{"name": "R1", "is_lab": True}])
+        self.assertEqual(errors, ["Room #2: name is required"])
+
+    def test_duplicate_faculty_and_bad_hours(self):
+        errors = []
+        faculties = validate_faculties({"faculties": [
+            {"name": "A", "empId": "E1", "maxHours": 10},
+            {"name": "A", "empId": "E1", "maxHours": -2},
+            {"name": "B"},
+        ]}, errors)
+        self.assertEqual([fac["max_hours_per_week"] for fac in faculties], [10, 18])
+        self.assertEqual(errors, [
+            "Faculty name 'A' is listed more than once",
+            "Employee ID 'E1' is listed more than once",
+            "Faculty 'A': maxHours must be a non-negative number",
+            "Faculty #3: name and empId are required",
+        ])
+
+
+class ValidateAcademicsTests(SimpleTestCase):
+    def test_repeated_subject_is_taught_by_every_listed_faculty(self):
+        errors = []
+        semesters = validate_academics([{"semester": "2", "sections": ["A", " ", "B"], "subjects": [
+            {"name": "Data Structures", "faculty": "F1", "weeklyHours": 4},
+            {"name": "Data Structures", "faculty": "F2", "weeklyHours": 4},
+        ]}], {"F1", "F2"}, errors)
+        self.assertEqual(errors, [])
+        self.assertEqual(semesters[0]["number"], 2)
+        self.assertEqual(semesters[0]["sections"], ["A", "B"])
+        [subject] = semesters[0]["subjects"]
+        self.assertEqual(subject["stem"], "DATASTRUC")
+        self.assertEqual(subject["faculty"], ["F1", "F2"])
+        self.assertEqual(subject["weekly_hours"], 4)
+
+    def test_subjects_sharing_a_code_stem_are_kept_apart(self):
+        errors = []
+        semesters = validate_academics([{"semester": 1, "sections": ["A"], "subjects": [
+            {"name": "Data Mgmt I", "faculty": "F0", "weeklyHours": 3},
+            {"name": "Data Mgmt II", "faculty": "F1", "weeklyHours": 4},
+            {"name": "Data Mgmt2", "faculty": "F1", "weeklyHours": 2},
+        ]}], {"F0", "F1"}, errors)
+        self.assertEqual(errors, [])
+        subjects = semesters[0]["subjects"]
+        self.assertEqual([(s["name"], s["faculty"], s["weekly_hours"]) for s in subjects], [
+            ("Data Mgmt I", ["F0"], 3), ("Data Mgmt II", ["F1"], 4), ("Data Mgmt2", ["F1"], 2),
+        ])
+        # The numeric tail skips stems that other names produce on their own
+        self.assertEqual([s["stem"] for s in subjects], ["DATAMGMT", "DATAMGMT3", "DATAMGMT2"])
+
+    def test_unknown_faculty_duplicate_semester_and_missing_sections(self):
+        errors = []
+        validate_academics([
+            {"semester": 1, "sections": ["A"], "subjects": [{"name": "Maths", "faculty": "Nobody"}]},
+            {"semester": 1, "sections": [], "subjects": [{"name": "Physics", "faculty": "F1", "weeklyHours": "x"}]},
+            {"semester": "first"},
+        ], {"F1"}, errors)
+        self.assertEqual(errors, [
+            "Faculty 'Nobody' not found in your setup (subject Maths, semester 1)",
+            "Semester 1 is listed more than once",
+            "Subject Physics: weeklyHours and labHours must be non-negative numbers",
+            "No sections defined for semester 1",
+            "Invalid semester number: first",
+        ])
+
+    def test_raise_if_errors_joins_messages(self):
+        raise_if_errors([])
+        with self.assertRaises(SetupValidationError) as raised:
+            raise_if_errors(["First problem.", "Second problem"])
+        self.assertEqual(str(raised.exception), "First problem; Second problem")
+        self.assertEqual(raised.exception.errors, ["First problem.", "Second problem"])
+
+
+class CreateAcademicStructureTests(TestCase):
+    def test_bulk_writes_structure_and_allocations(self):
+        errors = []
+        faculty = create_faculties(validate_faculties(INSTITUTE_SETUP, errors))
+        semesters = validate_academics([{"semester": 1, "sections": ["A", "B"], "subjects": [
+            {"name": "Maths", "faculty": "F0"}, {"name": "Physics", "faculty": "F1"},
+        ]}], {fac.name for fac in faculty}, errors)
+        course = Course.objects.create(name="MCA", code="MCA")
+
+        with self.assertNumQueries(4):
+            sections = create_academic_structure(course, semesters, {fac.name: fac for fac in faculty},
+                                                 code_suffix=lambda number: f"_{number}")
+
+        self.assertEqual([section.name for section in sections], ["A", "B"])
+        self.assertEqual(Section.objects.count(), 2)
+        self.assertEqual(sorted(Subject.objects.values_list('code', flat=True)), ["MATHS_1", "PHYSICS_1"])
+        self.assertEqual(FacultySubjectAllocation.objects.count(), 2)
+
+    def test_academic_setup_keeps_subjects_sharing_a_code_stem(self):
+        _, client = api_client()
+        self.assertEqual(client.post('/timetable/setup/institute/', INSTITUTE_SETUP, format='json').status_code, 200)
+        response = client.post('/timetable/setup/academic/', {"academics": [{"semester": 1, "sections": ["A"], "subjects": [
+            {"name": "Mathematics I", "faculty": "F0", "weeklyHours": 3},
+            {"name": "Mathematics II", "faculty": "F1", "weeklyHours": 4},
+        ]}]}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(sorted(Subject.objects.values_list('name', 'weekly_hours')),
+                         [("Mathematics I", 3), ("Mathematics II", 4)])
+        self.assertEqual(sorted(FacultySubjectAllocation.objects.values_list('subject__name', 'faculty__name')),
+                         [("Mathematics I", "F0"), ("Mathematics II", "F1")])
@@ -0,0 +1,58 @@
+from django.core.cache import caches
+from django.test import TestCase
+from ..problem import load_problem
+from ..solution_cache import get_cached_solution, problem_hash, solution_key, store_solution
+from ..timetable_generator import solve
+from .utils import ACADEMIC_SETUP, api_client, generate_sample_timetable
+
+
+def placement_names(solution):
+    return [(section.semester.number, section.name, subject.name, faculty.employee_id, room.name,
+             slot.day, slot.period_number, is_lab)
+            for section, subject, faculty, room, slot, is_lab in solution.placements]
+
+
+class SolutionCacheTests(TestCase):
+    def setUp(self):
+        caches['solutions'].clear()
+        _, self.client = api_client()
+        generate_sample_timetable(self.client)
+
+    def resubmit_academic_setup(self, academic=ACADEMIC_SETUP):
+        response = self.client.post('/timetable/setup/academic/', academic, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_hash_ignores_recreated_rows(self):
+        problem = load_problem()
+        self.resubmit_academic_setup()
+        recreated = load_problem()
+        self.assertNotEqual([s.id for s in problem.sections], [s.id for s in recreated.sections])
+        self.assertEqual(problem_hash(problem), problem_hash(recreated))
+
+    def test_hash_follows_the_content(self):
+        before = problem_hash(load_problem())
+        academic = {"academics": [dict(ACADEMIC_SETUP["academics"][0]), ACADEMIC_SETUP["academics"][1]]}
+        academic["academics"][0]["subjects"] = [dict(subject, weeklyHours=4)
+                                                for subject in ACADEMIC_SETUP["academics"][0]["subjects"]]
+        self.resubmit_academic_setup(academic)
+        self.assertNotEqual(problem_hash(load_problem()), before)
+
+    def test_stored_solution_replays_onto_recreated_rows(self):
+        problem = load_problem()
+        solution = solve(problem, seed=5)
+        key = solution_key(problem_hash(problem), {"seed": 5})
+        self.assertIsNone(get_cached_solution(problem, key))
+        store_solution(problem, key, solution)
+
+        self.resubmit_academic_setup()
+        recreated = load_problem()
+        replayed = get_cached_solution(recreated, key)
+        self.assertEqual(placement_names(replayed), placement_names(solution))
+        self.assertEqual((replayed.seed, replayed.scheduled, replayed.skipped),
+                         (solution.seed, solution.scheduled, solution.skipped))
+        recreated_sections = {section.id for section in recreated.sections}
+        self.assertTrue(all(placement[0].id in recreated_sections for placement in replayed.placements))
+
+    def test_options_are_part_of_the_key(self):
+        digest = problem_hash(load_problem())
+        self.assertNotEqual(solution_key(digest, {"seed": 1}), solution_key(digest, {"seed": 2}))
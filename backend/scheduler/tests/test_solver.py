@@ -0,0 +1,42 @@
+from django.test import TestCase
+from ..problem import load_problem
+from ..timetable_generator import solve, solve_with_restarts
+from .utils import api_client, generate_sample_timetable
+
+
+def placement_ids(solution):
+    return [(section.id, subject.id, faculty.id, room.id, slot.id, is_lab)
+            for section, subject, faculty, room, slot, is_lab in solution.placements]
+
+
+class SolverDeterminismTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        self.problem = load_problem()
+
+    def test_solve_is_deterministic_per_seed(self):
+        first = solve(self.problem, seed=7)
+        second = solve(self.problem, seed=7)
+        self.assertEqual(placement_ids(first), placement_ids(second))
+        self.assertEqual((first.scheduled, first.skipped), (second.scheduled, second.skipped))
+
+    def test_solve_depends_on_the_seed(self):
+        solutions = [placement_ids(solve(self.problem, seed=seed)) for seed in range(5)]
+        self.assertGreater(len({tuple(placements) for placements in solutions}), 1)
+
+    def test_solve_with_restarts_is_deterministic_per_seed(self):
+        first = solve_with_restarts(self.problem, seed=11, attempts=4)
+        second = solve_with_restarts(self.problem, seed=11, attempts=4)
+        self.assertEqual(first.seed, second.seed)
+        self.assertEqual(first.attempts, 4)
+        self.assertEqual(placement_ids(first), placement_ids(second))
+
+    def test_solve_with_restarts_keeps_the_fewest_skipped(self):
+        best = solve_with_restarts(self.problem, seed=3, attempts=4)
+        # The winning attempt is reproducible from its own seed
+        self.assertEqual(placement_ids(solve(self.problem, seed=best.seed)), placement_ids(best))
+        self.assertEqual(best.skipped, 0)
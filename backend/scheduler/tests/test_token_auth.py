@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..token_auth import _token_cache_key
+
+SYNC_URL = '/timetable/setup/status/'
+ASYNC_URL = '/timetable/async/setup/status/'
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user('alice', password='secret')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def assertStatus(self, status):
+        self.assertEqual(self.client.get(SYNC_URL).status_code, status)
+        self.assertEqual(self.client.get(ASYNC_URL).status_code, status)
+
+    def test_token_lookup_is_cached(self):
+        self.assertEqual(self.client.get(SYNC_URL).status_code, 200)
+        cached = caches['default'].get(_token_cache_key(self.token.key))
+        self.assertEqual(cached.user_id, self.user.id)
+        self.assertNotIn(self.token.key, _token_cache_key(self.token.key))
+        # Only the view's own setup query: the token and its user come from the cache
+        with self.assertNumQueries(1):
+            self.client.get(SYNC_URL)
+        with self.assertNumQueries(1):
+            self.client.get(ASYNC_URL)
+
+    def test_logout_revokes_the_cached_token(self):
+        self.assertStatus(200)
+        self.assertEqual(self.client.post('/timetable/auth/logout/').status_code, 200)
+        self.assertIsNone(caches['default'].get(_token_cache_key(self.token.key)))
+        self.assertStatus(401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertStatus(200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertStatus(401)
+
+    def test_unknown_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token not-a-token')
+        self.assertStatus(401)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from ..models import CurrentTimetable, Faculty, ScheduledSession, Semester, TimetableVersion
+from ..timetable_generator import solve
+from ..versions import activate_versions, collect_versions, create_versions
+from .utils import ACADEMIC_SETUP, api_client, generate_sample_timetable
+
+
+class VersionTestCase(TestCase):
+    def setUp(self):
+        _, self.client = api_client()
+        generate_sample_timetable(self.client)
+        self.pointer = CurrentTimetable.objects.get()
+        self.course_id = self.pointer.course_id
+
+    def copy_version(self):
+        """A new, not yet current version holding a copy of the current sessions"""
+        version = create_versions([self.course_id])[self.course_id]
+        sessions = list(ScheduledSession.current.all())
+        for session in sessions:
+            session.pk, session.version = None, version
+        ScheduledSession.objects.bulk_create(sessions)
+        return version
+
+    def current_version_ids(self):
+        return set(ScheduledSession.current.values_list('version_id', flat=True))
+
+
+class ActivateVersionsTests(VersionTestCase):
+    def test_readers_only_see_the_current_version(self):
+        old = self.pointer.version
+        sessions = ScheduledSession.current.count()
+        new = self.copy_version()
+        self.assertEqual(ScheduledSession.objects.count(), 2 * sessions)
+        self.assertEqual(self.current_version_ids(), {old.id})
+
+        activate_versions([new], [])
+        self.assertEqual(self.current_version_ids(), {new.id})
+        self.assertEqual(ScheduledSession.current.count(), sessions)
+        old.refresh_from_db()
+        self.assertIsNotNone(old.retired_at)
+
+    def test_loser_of_concurrent_swaps_is_retired(self):
+        # Both generations started from the same current version; the later swap wins
+        first, second = self.copy_version(), self.copy_version()
+        activate_versions([first], [])
+        activate_versions([second], [])
+        first.refresh_from_db()
+        self.assertIsNotNone(first.retired_at)
+        self.assertEqual(CurrentTimetable.objects.get().version_id, second.id)
+        self.assertEqual(self.current_version_ids(), {second.id})
+
+
+class CollectVersionsTests(VersionTestCase):
+    def test_retention_and_current_versions(self):
+        old = self.pointer.version
+        new = self.copy_version()
+        activate_versions([new], [])
+
+        self.assertEqual(collect_versions(retention=60), 0)
+        self.assertTrue(TimetableVersion.objects.filter(pk=old.pk).exists())
+
+        TimetableVersion.objects.update(retired_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(collect_versions(retention=60), 1)
+        self.assertFalse(TimetableVersion.objects.filter(pk=old.pk).exists())
+        self.assertFalse(ScheduledSession.objects.filter(version_id=old.pk).exists())
+        # The current version is kept even when marked retired
+        self.assertTrue(TimetableVersion.objects.filter(pk=new.pk).exists())
+        self.assertTrue(ScheduledSession.current.exists())
+
+    def test_abandoned_versions(self):
+        recent = self.copy_version()
+        abandoned = self.copy_version()
+        TimetableVersion.objects.filter(pk=abandoned.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(collect_versions(retention=0), 1)
+        self.assertTrue(TimetableVersion.objects.filter(pk=recent.pk).exists())
+        self.assertFalse(TimetableVersion.objects.filter(pk=abandoned.pk).exists())
+
+
+class SetupGenerationTests(VersionTestCase):
+    def setUp(self):
+        super().setUp()
+        caches['solutions'].clear()  # resubmitting the setup would otherwise replay its solution
+
+    def solve_and_check(self, check):
+        def checked_solve(problem, seed=None):
+            check()
+            return solve(problem, seed)
+        return mock.patch('scheduler.timetable_generator.solve', side_effect=checked_solve)
+
+    def test_readers_keep_the_previous_timetable_during_the_solve(self):
+        sessions = set(ScheduledSession.current.values_list('id', flat=True))
+        semesters = set(Semester.objects.values_list('id', flat=True))
+
+        def check():
+            self.assertEqual(set(ScheduledSession.current.values_list('id', flat=True)), sessions)
+            self.assertEqual(set(Semester.objects.values_list('id', flat=True)), semesters)
+
+        with self.solve_and_check(check) as solver:
+            response = self.client.post('/timetable/setup/academic/', ACADEMIC_SETUP, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(solver.call_count, 1)
+        self.assertTrue(ScheduledSession.current.exists())
+        self.assertFalse(set(ScheduledSession.current.values_list('id', flat=True)) & sessions)
+
+    def test_infeasible_setup_keeps_the_previous_timetable(self):
+        sessions = set(ScheduledSession.current.values_list('id', flat=True))
+        version = self.pointer.version_id
+        academic = {"academics": [dict(ACADEMIC_SETUP["academics"][0], subjects=[
+            dict(subject, name=f"{subject['name']}_{copy}", weeklyHours=6)
+            for copy in range(3) for subject in ACADEMIC_SETUP["academics"][0]["subjects"]
+        ])]}
+        response = self.client.post('/timetable/setup/academic/', dict(academic, abortIfInfeasible=True),
+                                    format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn("previous timetable is still current", response.json()["detail"])
+        self.assertEqual(set(ScheduledSession.current.values_list('id', flat=True)), sessions)
+        self.assertEqual(CurrentTimetable.objects.get().version_id, version)
+        self.assertEqual(Semester.objects.count(), 2)
+
+    def test_setup_changed_during_the_solve(self):
+        sessions = ScheduledSession.current.count()
+        with self.solve_and_check(lambda: Faculty.objects.filter(name="F1").update(max_hours_per_week=4)):
+            response = self.client.post('/timetable/setup/academic/', ACADEMIC_SETUP, format='json')
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual(ScheduledSession.current.count(), sessions)
+
+
+class AdoptExistingSessionsMigrationTests(TransactionTestCase):
+    migrate_from = [('scheduler', '0004_session_inverse_indexes')]
+    migrate_to = [('scheduler', '0005_timetable_versions')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_sessions_become_each_courses_current_version(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+
+        models = {name: apps.get_model('scheduler', name) for name in (
+            'Course', 'Semester', 'Section', 'Subject', 'Faculty', 'Room', 'TimetableSlot', 'ScheduledSession')}
+        slot = models['TimetableSlot'].objects.create(day=1, period_number=1)
+        room = models['Room'].objects.create(name="R1")
+        faculty = models['Faculty'].objects.create(name="F1", employee_id="E1")
+        per_course = {}
+        for code in ("MCA", "MBA"):
+            course = models['Course'].objects.create(name=code, code=code)
+            semester = models['Semester'].objects.create(course=course, name="Semester 1", number=1)
+            section = models['Section'].objects.create(semester=semester, name="A")
+            subject = models['Subject'].objects.create(semester=semester, name=f"{code} 1", code=code, weekly_hours=3)
+            models['ScheduledSession'].objects.create(section=section, subject=subject, faculty=faculty,
+                                                      room=room, slot=slot)
+            per_course[course.id] = section.id
+        models['Course'].objects.create(name="Empty", code="EMPTY")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        apps = executor.loader.project_state(self.migrate_to).apps
+        pointers = dict(apps.get_model('scheduler', 'CurrentTimetable').objects.values_list('course_id', 'version_id'))
+        self.assertEqual(set(pointers), set(per_course))
+        sessions = apps.get_model('scheduler', 'ScheduledSession').objects.values_list(
+            'section__semester__course_id', 'version_id')
+        self.assertEqual(dict(sessions), pointers)
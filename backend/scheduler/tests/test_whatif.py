@@ -0,0 +1,53 @@
+from django.test import TestCase
+from ..models import ScheduledSession
+from ..problem import load_problem
+from ..setup_pipeline import SetupValidationError
+from ..whatif import apply_overlay
+from .utils import api_client, generate_sample_timetable
+
+WHAT_IF_URL = '/timetable/generate/what-if/'
+
+
+class ApplyOverlayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, client = api_client()
+        generate_sample_timetable(client)
+
+    def setUp(self):
+        self.problem = load_problem()
+
+    def test_changes_are_applied_in_memory(self):
+        changes = apply_overlay(self.problem, {
+            "institute": {"workingDays": 6},
+            "rooms": {"add": [{"name": "Lab2", "isLab": True}], "remove": ["R2"]},
+            "faculty": [{"empId": "E1", "maxHours": 20}],
+        })
+        self.assertEqual(len(changes), 4)
+        self.assertEqual(len(self.problem.slots), 36)
+        self.assertEqual(sorted(room.name for room in self.problem.rooms), ["Lab1", "Lab2", "R1"])
+        self.assertEqual(load_problem().settings.working_days, 5)
+
+    def test_malformed_overlays_are_rejected(self):
+        for overlay, error in (
+            ("junk", "overlay must be an object"),
+            ({"rooms": ["Lab2"]}, "overlay rooms must be an object"),
+            ({"rooms": {"add": "Lab2"}}, "overlay rooms.add must be a list"),
+            ({"rooms": {"remove": [{"name": "R1"}]}}, "overlay rooms.remove entries must be names"),
+            ({"faculty": ["E1"]}, "overlay faculty entries must be objects"),
+            ({"allocations": {"subject": "Sub1_0"}}, "overlay allocations must be a list"),
+        ):
+            with self.subTest(overlay=overlay), self.assertRaises(SetupValidationError) as raised:
+                apply_overlay(load_problem(), overlay)
+            self.assertEqual(raised.exception.errors, [error])
+
+    def test_endpoint_answers_400_and_writes_nothing(self):
+        _, client = api_client()
+        sessions = set(ScheduledSession.current.values_list('id', flat=True))
+        response = client.post(WHAT_IF_URL, {"overlay": "junk"}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], ["overlay must be an object"])
+        response = client.post(WHAT_IF_URL, {"overlay": {"subjects": [{"name": "Sub1_1", "weeklyHours": 2}]}},
+                               format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(set(ScheduledSession.current.values_list('id', flat=True)), sessions)
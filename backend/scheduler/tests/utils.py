@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+INSTITUTE_SETUP = {
+    "institute": {"name": "Test College", "course": "MCA", "academicYear": "2025",
+                  "workingDays": 5, "periodsPerDay": 6, "periodDuration": 60},
+    "rooms": [{"name": "R1", "isLab": False}, {"name": "R2", "isLab": False}, {"name": "Lab1", "isLab": True}],
+    "faculties": [{"name": f"F{i}", "empId": f"E{i}", "maxHours": 18} for i in range(6)],
+}
+
+ACADEMIC_SETUP = {"academics": [{
+    "semester": semester,
+    "sections": ["A", "B"],
+    "subjects": [{"name": f"Sub{semester}_{j}", "faculty": f"F{(semester + j) % 6}", "weeklyHours": 3,
+                  "isLab": j == 0, "labHours": 2 if j == 0 else 0} for j in range(4)],
+} for semester in (1, 3)]}
+
+
+def api_client(username='alice'):
+    """(user, APIClient authenticated as that user)"""
+    user, _ = User.objects.get_or_create(username=username)
+    client = APIClient()
+    client.force_authenticate(user)
+    return user, client
+
+
+def generate_sample_timetable(client, academic=ACADEMIC_SETUP):
+    """Institute setup plus a generated timetable through the API; returns the academic response"""
+    response = client.post('/timetable/setup/institute/', INSTITUTE_SETUP, format='json')
+    assert response.status_code == 200, response.content
+    response = client.post('/timetable/setup/academic/', academic, format='json')
+    assert response.status_code == 200, response.content
+    return response
@@ -1,119 +1,91 @@
 import logging
-from .models import Section, Subject, Faculty, Room, TimetableSlot, ScheduledSession, FacultySubjectAllocation, InstitutionSettings
+import time
+from django.db import transaction
+from .models import ScheduledSession
+from .grids import build_section_grids
+from .problem import Solution, load_problem
+from .feasibility import check_feasibility
+from .metrics import instrument_generation
+from .versions import activate_versions, create_versions
+from .scoring import score_solutions
+from .solution_cache import (
+    decode_solution, encode_solution, get_cached_solution, problem_hash, solution_key, store_solution
+)
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import random
 
 logger = logging.getLogger(__name__)
 
-def generate_timetable():
-    """Enhanced timetable generator with strict faculty hour constraints and full week utilization"""
-    
-    sections = Section.objects.all()
-    slots = list(TimetableSlot.objects.all().order_by('day', 'period_number'))
-    settings = InstitutionSettings.objects.first()
+SOLVER_MODES = ('greedy', 'restarts')
+DEFAULT_ATTEMPTS = 8
 
-    if not settings:
-        raise ValueError("No institution settings found")
 
-    if not sections.exists():
-        raise ValueError("No sections found")
-    
-    if not slots:
-        raise ValueError("No time slots found")
+def _ms_since(started):
+    return (time.perf_counter() - started) * 1000
 
-    logger.info("Starting enhanced timetable generation with faculty hour tracking")
-    logger.info("Sections: %d, Total slots: %d (%d days × %d periods)", 
-                sections.count(), len(slots), settings.working_days, settings.periods_per_day)
 
-    # Clear previous sessions
-    ScheduledSession.objects.all().delete()
+def solve(problem, seed=None):
+    """One greedy pass over ``problem`` using its own ``random.Random(seed)``.
+
+    Pure in-memory: conflicts, room use and consecutive-period checks are all
+    tracked in sets, so nothing touches the database until the solution is
+    written.
+    """
+    rng = random.Random(seed)
+    slots = problem.slots
+    settings = problem.settings
 
     # Initialize tracking structures
     faculty_schedule = defaultdict(set)  # faculty_id -> set of slot_ids
     faculty_hours_used = defaultdict(int)  # faculty_id -> total hours used
     room_schedule = defaultdict(set)     # room_id -> set of slot_ids
     section_schedule = defaultdict(set)  # section_id -> set of slot_ids
-    
+    placed = set()                       # (section_id, subject_id, slot_id) already scheduled
+
+    # Sessions of other courses keep their faculty and rooms busy
+    for slot_id, faculty_id, room_id in problem.fixed:
+        faculty_schedule[faculty_id].add(slot_id)
+        faculty_hours_used[faculty_id] += 1
+        room_schedule[room_id].add(slot_id)
+
     # Track sessions per day for better distribution
     section_day_count = defaultdict(lambda: defaultdict(int))  # section_id -> day -> count
     subject_day_count = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))  # section -> subject -> day -> count
 
-    result = []
-    
-    # Get faculty hour limits and log them
-    faculty_limits = {}
-    faculties = Faculty.objects.all()
-    for faculty in faculties:
-        faculty_limits[faculty.id] = faculty.max_hours_per_week
-        logger.info(f"Faculty {faculty.name} ({faculty.id}): {faculty.max_hours_per_week} hours/week limit")
-    
-    # Collect all sessions that need to be scheduled
+    solution = Solution(seed=seed)
+    faculty_limits = {faculty.id: faculty.max_hours_per_week for faculty in problem.faculty.values()}
+
+    # Collect all sessions that need to be scheduled (demands were built from the snapshot)
     all_sessions = []
-    
-    for section in sections:
-        subjects = Subject.objects.filter(semester=section.semester)
-        logger.info(f"Section {section.name} (ID: {section.id}): {subjects.count()} subjects")
-        
-        for subject in subjects:
-            allocation = FacultySubjectAllocation.objects.filter(subject=subject).first()
-            if not allocation:
-                logger.warning(f"No faculty allocated for subject {subject.name}")
-                continue
-            
-            faculty = allocation.faculty
-            sessions_needed = min(subject.weekly_hours, 6)  # Cap at 6 sessions per week
-            
-            # Check if faculty has enough remaining hours
-            faculty_remaining = faculty_limits.get(faculty.id, 18) - faculty_hours_used.get(faculty.id, 0)
-            if faculty_remaining < sessions_needed:
-                logger.warning(f"Faculty {faculty.name} has only {faculty_remaining} hours remaining, reducing {subject.name} from {sessions_needed} to {max(1, faculty_remaining)} sessions")
-                sessions_needed = max(1, faculty_remaining)
-            
-            # Get appropriate rooms
-            if subject.lab_required:
-                available_rooms = list(Room.objects.filter(is_lab=True))
-                if not available_rooms:
-                    logger.warning(f"No lab rooms available for {subject.name}, using regular rooms")
-                    available_rooms = list(Room.objects.filter(is_lab=False))
-            else:
-                available_rooms = list(Room.objects.filter(is_lab=False))
-            
-            if not available_rooms:
-                available_rooms = list(Room.objects.all())
-            
-            logger.info(f"Subject {subject.name}: {sessions_needed} sessions, Faculty: {faculty.name}, Rooms: {len(available_rooms)}")
-            
-            # Create session scheduling requests
-            for session_num in range(sessions_needed):
-                all_sessions.append({
-                    'section': section,
-                    'subject': subject,
-                    'faculty': faculty,
-                    'available_rooms': available_rooms,
-                    'session_num': session_num,
-                    'is_lab': subject.lab_required,
-                    'priority': session_num  # Earlier sessions have higher priority
-                })
-    
-    logger.info(f"Total sessions to schedule: {len(all_sessions)}")
-    
+    for demand in problem.demands:
+        for session_num in range(demand.sessions):
+            all_sessions.append({
+                'section': demand.section,
+                'subject': demand.subject,
+                'faculty': demand.faculty,
+                'available_rooms': demand.rooms,
+                'session_num': session_num,
+                'is_lab': demand.is_lab,
+                'priority': session_num  # Earlier sessions have higher priority
+            })
+    solution.total_sessions = len(all_sessions)
+
     # Sort sessions to prioritize better distribution
     def session_sort_key(session):
         faculty_load = faculty_hours_used.get(session['faculty'].id, 0)
         section_load = len(section_schedule.get(session['section'].id, []))
-        return (faculty_load, section_load, session['priority'], random.random())
-    
+        return (faculty_load, section_load, session['priority'], rng.random())
+
     all_sessions.sort(key=session_sort_key)
-    
+
     # Group slots by day for strategic scheduling
     slots_by_day = defaultdict(list)
+    slot_at = {}
     for slot in slots:
         slots_by_day[slot.day].append(slot)
-    
-    # Schedule sessions with enhanced logic
-    scheduled_count = 0
-    skipped_count = 0
-    
+        slot_at[(slot.day, slot.period_number)] = slot
+
     for session_data in all_sessions:
         section = session_data['section']
         subject = session_data['subject']
@@ -121,100 +93,94 @@ def generate_timetable():
         available_rooms = session_data['available_rooms']
         session_num = session_data['session_num']
         is_lab = session_data['is_lab']
-        
+
         # Check faculty hour limit first
         if faculty_hours_used.get(faculty.id, 0) >= faculty_limits.get(faculty.id, 18):
             logger.warning(f"Faculty {faculty.name} has reached hour limit ({faculty_limits.get(faculty.id, 18)} hours)")
-            skipped_count += 1
+            solution.skipped += 1
             continue
-        
-        scheduled = False
+
         best_slot = None
         best_room = None
-        
+
         # Enhanced day selection strategy
         day_scores = []
-        
+
         for day in range(1, settings.working_days + 1):
             # Factors for day selection scoring (lower score = better)
             subject_sessions_today = subject_day_count[section.id][subject.id][day]
             section_sessions_today = section_day_count[section.id][day]
-            
+
             # Prefer days with:
             # - Fewer sessions for this specific subject-section combination
             # - Fewer overall sessions for this section
             # - Avoid overloading any single day
-            score = (subject_sessions_today * 5) + (section_sessions_today * 2) + random.uniform(0, 0.5)
+            score = (subject_sessions_today * 5) + (section_sessions_today * 2) + rng.uniform(0, 0.5)
             day_scores.append((score, day))
-        
+
         # Sort by score (ascending - lower is better)
         day_scores.sort()
-        
+
         # Try to schedule on the best available days
         for score, preferred_day in day_scores:
-            if scheduled:
-                break
-                
             available_slots = slots_by_day[preferred_day]
             # Shuffle slots within the day for period variety
-            random.shuffle(available_slots)
-            
+            rng.shuffle(available_slots)
+
             for slot in available_slots:
                 # Check all conflicts
                 if slot.id in faculty_schedule[faculty.id]:
                     continue  # Faculty conflict
                 if slot.id in section_schedule[section.id]:
                     continue  # Section conflict
-                
+
                 # Find an available room
                 room_found = None
                 # Randomize room selection to distribute usage
                 shuffled_rooms = available_rooms.copy()
-                random.shuffle(shuffled_rooms)
-                
+                rng.shuffle(shuffled_rooms)
+
                 for room in shuffled_rooms:
                     if slot.id not in room_schedule[room.id]:
                         room_found = room
                         break
-                
+
                 if not room_found:
                     continue  # No room available
-                
+
                 # Check for too many consecutive sessions of same subject
                 consecutive_limit = 2 if is_lab else 1
                 consecutive_count = 0
-                
+
                 # Check previous periods
                 for prev_period in range(max(1, slot.period_number - consecutive_limit), slot.period_number):
-                    prev_slot = next((s for s in slots if s.day == slot.day and s.period_number == prev_period), None)
-                    if prev_slot and ScheduledSession.objects.filter(
-                        section=section, subject=subject, slot=prev_slot).exists():
+                    prev_slot = slot_at.get((slot.day, prev_period))
+                    if prev_slot and (section.id, subject.id, prev_slot.id) in placed:
                         consecutive_count += 1
-                
+
                 # Check next periods
                 for next_period in range(slot.period_number + 1, min(settings.periods_per_day + 1, slot.period_number + consecutive_limit + 1)):
-                    next_slot = next((s for s in slots if s.day == slot.day and s.period_number == next_period), None)
-                    if next_slot and ScheduledSession.objects.filter(
-                        section=section, subject=subject, slot=next_slot).exists():
+                    next_slot = slot_at.get((slot.day, next_period))
+                    if next_slot and (section.id, subject.id, next_slot.id) in placed:
                         consecutive_count += 1
-                
+
                 if consecutive_count >= consecutive_limit:
                     continue  # Too many consecutive sessions
-                
+
                 # This slot is suitable!
                 best_slot = slot
                 best_room = room_found
                 break
-            
+
             if best_slot:
                 break
-        
+
         # If no preferred slot found, try any available slot as fallback
         if not best_slot:
             for slot in slots:
-                if (slot.id not in faculty_schedule[faculty.id] and 
+                if (slot.id not in faculty_schedule[faculty.id] and
                     slot.id not in section_schedule[section.id]):
-                    
+
                     for room in available_rooms:
                         if slot.id not in room_schedule[room.id]:
                             best_slot = slot
@@ -222,7 +188,7 @@ def generate_timetable():
                             break
                     if best_slot:
                         break
-        
+
         # Schedule the session if we found a slot
         if best_slot and best_room:
             # Update all tracking structures
@@ -232,67 +198,282 @@ def generate_timetable():
             section_schedule[section.id].add(best_slot.id)
             section_day_count[section.id][best_slot.day] += 1
             subject_day_count[section.id][subject.id][best_slot.day] += 1
-            
-            # Save to database
-            ScheduledSession.objects.create(
-                section=section,
-                subject=subject,
-                faculty=faculty,
-                room=best_room,
-                slot=best_slot,
-                is_lab_session=is_lab
-            )
-            
-            # Add to result
-            result.append({
-                "section": section.id,
-                "subject": subject.name,
-                "faculty": faculty.name,
-                "room": best_room.name,
-                "day": best_slot.day,
-                "period": best_slot.period_number,
-                "is_lab": is_lab
-            })
-            
-            scheduled_count += 1
-            logger.info(f"✓ Scheduled: {section.name}-{subject.name} on Day {best_slot.day} Period {best_slot.period_number} "
-                       f"(Faculty {faculty.name}: {faculty_hours_used[faculty.id]}/{faculty_limits.get(faculty.id, 18)} hours)")
+            placed.add((section.id, subject.id, best_slot.id))
+
+            solution.placements.append((section, subject, faculty, best_room, best_slot, is_lab))
+            solution.scheduled += 1
+            logger.debug(f"✓ Scheduled: {section.name}-{subject.name} on Day {best_slot.day} Period {best_slot.period_number} "
+                         f"(Faculty {faculty.name}: {faculty_hours_used[faculty.id]}/{faculty_limits.get(faculty.id, 18)} hours)")
+        else:
+            logger.debug(f"✗ Could not schedule: {section.name}-{subject.name} (session {session_num})")
+            solution.skipped += 1
+
+    solution.faculty_hours = dict(faculty_hours_used)
+    return solution
+
+
+def _solve_attempt(problem, seed):
+    # Runs in a worker process: the problem snapshot arrives pickled
+    return solve(problem, seed)
+
+
+def solve_with_restarts(problem, seed=None, attempts=DEFAULT_ATTEMPTS, workers=1, time_limit=None):
+    """Best of several greedy passes with seeds derived from ``seed``.
+
+    Attempts run ``workers`` at a time (in separate processes when ``workers``
+    > 1); no new wave starts once ``time_limit`` seconds have passed. The
+    solution with the fewest skipped sessions wins, then the one with the
+    lowest quality penalty (see scoring.py), earlier attempts on ties.
+    """
+    seeds = [random.Random(seed).randrange(2 ** 32)]
+    seed_rng = random.Random(seeds[0])
+    seeds.extend(seed_rng.randrange(2 ** 32) for _ in range(max(1, attempts) - 1))
+
+    started = time.perf_counter()
+    solutions = []
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) if workers > 1 else None
+    try:
+        for wave_start in range(0, len(seeds), max(1, workers)):
+            if solutions and time_limit is not None and time.perf_counter() - started >= time_limit:
+                logger.info(f"Time limit of {time_limit}s reached after {len(solutions)} attempts")
+                break
+            wave = seeds[wave_start:wave_start + max(1, workers)]
+            if executor is not None:
+                solutions.extend(executor.map(_solve_attempt, [problem] * len(wave), wave))
+            else:
+                solutions.extend(solve(problem, wave_seed) for wave_seed in wave)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Fewest skipped sessions first, then the lowest soft-constraint penalty
+    penalties = score_solutions(problem, solutions)
+    best_index = min(range(len(solutions)),
+                     key=lambda i: (solutions[i].skipped, penalties[i]["penalty"], i))
+    best = solutions[best_index]
+    best.attempts = len(solutions)
+    logger.info(f"Best of {len(solutions)} attempts: seed {best.seed}, {best.skipped} skipped, "
+                f"penalty {penalties[best_index]['penalty']}")
+    return best
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+def write_solution(problem, solution, owner=None):
+    """Store ``solution`` as a new timetable version of each course and make it current.
+
+    The sessions are bulk-inserted against versions no reader can see yet;
+    only the swap (pointers, section grids, ETag counter) runs in one short
+    transaction, so readers keep getting the previous timetable until then.
+    """
+    versions = create_versions({section.semester.course_id for section in problem.sections}, owner)
+
+    ScheduledSession.objects.bulk_create([
+        ScheduledSession(
+            section=section,
+            subject=subject,
+            faculty=faculty,
+            room=room,
+            slot=slot,
+            is_lab_session=is_lab,
+            version=versions[section.semester.course_id]
+        )
+        for section, subject, faculty, room, slot, is_lab in solution.placements
+    ], batch_size=1000)
+
+    # Materialise per-section grids alongside the sessions
+    placements = defaultdict(list)  # section_id -> [(slot, subject, faculty, room, is_lab)]
+    for section, subject, faculty, room, slot, is_lab in solution.placements:
+        placements[section.id].append((slot, subject, faculty, room, is_lab))
+    grids = build_section_grids(problem.sections, problem.slots, placements)
+
+    activate_versions(versions.values(), grids)
+
+
+class SetupChangedError(Exception):
+    """The stored setup changed while a submitted setup was being solved"""
+
+
+def generate_with_setup(write_setup, owner=None, **options):
+    """Solve a submitted setup before it is stored, then store it together with its timetable.
+
+    ``write_setup()`` replaces the stored setup with the submitted one and
+    returns the new sections. It runs twice: in a transaction that is rolled
+    back, to take the snapshot the solver works on with no lock held, and in
+    the transaction that writes the solution as a new timetable version and
+    makes it current. Readers keep the previous setup and timetable until
+    that commit, and an infeasible or failed solve leaves both in place.
+    Returns ``(result, sections)``; sections is empty when nothing was written.
+    """
+    with transaction.atomic():
+        write_setup()
+        snapshot = load_problem()
+        transaction.set_rollback(True)
+
+    written = []
+
+    def write(problem, solution):
+        # Placements travel by position onto the rows written for real
+        encoded = encode_solution(solution, problem)
+        with transaction.atomic():
+            sections = write_setup()
+            stored = load_problem()
+            if problem_hash(stored) != problem_hash(problem):
+                raise SetupChangedError("The stored setup changed during generation; submit the setup again")
+            solution = decode_solution(encoded, stored)
+            write_solution(stored, solution, owner)
+        written.extend(sections)
+        return stored, solution
+
+    result = generate_timetable(owner=owner, problem=snapshot, writer=write, **options)
+    return result, written
+
+
+@instrument_generation
+def generate_timetable(owner=None, abort_on_infeasible=False, seed=None, solver='greedy',
+                       attempts=DEFAULT_ATTEMPTS, workers=1, time_limit=None, dry_run=False,
+                       settings=None, course=None, room_owner=None, use_cache=True, problem=None, writer=None):
+    """Enhanced timetable generator with strict faculty hour constraints and full week utilization.
+
+    Runs in phases (load, feasibility, solve, write) whose timings are
+    returned under ``timings``. ``dry_run`` solves without writing anything.
+    Without a ``seed`` the seed is derived from the problem hash, so an
+    identical setup yields the identical timetable and the solve is served
+    from the solution cache (unless ``use_cache`` is off or a ``time_limit``
+    makes the result depend on machine speed). A prebuilt ``problem`` (a
+    snapshot taken inside the caller's setup transaction) is solved instead
+    of loading the stored setup; what-if overlays (see whatif.py) can only be
+    run as a dry run. ``writer(problem, solution)`` replaces write_solution
+    and returns the (problem, solution) it stored (see generate_with_setup).
+    """
+    if solver not in SOLVER_MODES:
+        raise ValueError(f"Unknown solver '{solver}' (expected one of {', '.join(SOLVER_MODES)})")
+    timings = {}
+
+    started = time.perf_counter()
+    if problem is None:
+        problem = load_problem(settings=settings, course=course, room_owner=room_owner)
+    elif problem.overlaid and not dry_run:
+        raise ValueError("A what-if problem can only be solved as a dry run")
+    sections = problem.sections
+    slots = problem.slots
+    settings = problem.settings
+    timings["load_ms"] = _ms_since(started)
+
+    if not sections:
+        raise ValueError("No sections found")
+
+    if not slots:
+        raise ValueError("No time slots found")
+
+    # Cheap capacity bounds first, so hopeless setups never reach the solver
+    started = time.perf_counter()
+    feasibility = check_feasibility(problem)
+    timings["feasibility_ms"] = _ms_since(started)
+    for violation in feasibility["violations"]:
+        logger.warning(f"Infeasible setup: {violation['message']}")
+    if abort_on_infeasible and not feasibility["feasible"]:
+        return {
+            "status": "infeasible",
+            "message": "; ".join(v["message"] for v in feasibility["violations"]),
+            "feasibility": feasibility,
+            "timings": timings,
+        }
+
+    logger.info("Starting enhanced timetable generation with faculty hour tracking")
+    logger.info("Sections: %d, Total slots: %d (%d days × %d periods)",
+                len(sections), len(slots), settings.working_days, settings.periods_per_day)
+    for section, subject in problem.unallocated:
+        logger.warning(f"No faculty allocated for subject {subject.name}")
+    for demand in problem.demands:
+        if demand.sessions < demand.requested:
+            logger.warning(f"Faculty {demand.faculty.name} has only {demand.faculty.max_hours_per_week} hours remaining, reducing {demand.subject.name} from {demand.requested} to {demand.sessions} sessions")
+
+    started = time.perf_counter()
+    digest = problem_hash(problem)
+    if seed is None:
+        seed = int(digest[:8], 16)
+    cache_key = solution_key(digest, {
+        "solver": solver, "seed": seed, "attempts": attempts if solver == 'restarts' else 1
+    })
+    use_cache = use_cache and time_limit is None
+
+    solution = get_cached_solution(problem, cache_key) if use_cache else None
+    cached = solution is not None
+    if solution is None:
+        if solver == 'restarts':
+            solution = solve_with_restarts(problem, seed=seed, attempts=attempts, workers=workers, time_limit=time_limit)
         else:
-            logger.warning(f"✗ Could not schedule: {section.name}-{subject.name} (session {session_num})")
-            skipped_count += 1
+            solution = solve(problem, seed)
+        if use_cache:
+            store_solution(problem, cache_key, solution)
+    timings["solve_ms"] = _ms_since(started)
+    logger.info(f"Total sessions to schedule: {solution.total_sessions}")
+
+    if solution.scheduled == 0:
+        # Checked before writing, so the current timetable is kept
+        raise ValueError("No sessions could be scheduled. Please check faculty hour limits and room availability.")
+
+    if not dry_run:
+        started = time.perf_counter()
+        if writer is None:
+            write_solution(problem, solution, owner)
+        else:
+            problem, solution = writer(problem, solution)
+        timings["write_ms"] = _ms_since(started)
+
+    scheduled_count = solution.scheduled
+    skipped_count = solution.skipped
 
     # Final statistics and validation
     logger.info(f"Scheduling completed: {scheduled_count} scheduled, {skipped_count} skipped")
-    
+
     # Log faculty hour usage
-    for faculty_id, hours_used in faculty_hours_used.items():
-        faculty = Faculty.objects.get(id=faculty_id)
-        limit = faculty_limits.get(faculty_id, 18)
+    for faculty_id, hours_used in solution.faculty_hours.items():
+        faculty = problem.faculty[faculty_id]
+        limit = faculty.max_hours_per_week
         percentage = (hours_used / limit) * 100 if limit > 0 else 0
         logger.info(f"Faculty {faculty.name}: {hours_used}/{limit} hours used ({percentage:.1f}%)")
-    
+
     # Log day distribution
-    total_slots_used = len(slots) * sections.count()
+    total_slots_used = len(slots) * len(sections)
     slots_scheduled = scheduled_count
     utilization = (slots_scheduled / total_slots_used) * 100 if total_slots_used > 0 else 0
     logger.info(f"Overall slot utilization: {slots_scheduled}/{total_slots_used} ({utilization:.1f}%)")
-    
-    if scheduled_count == 0:
-        raise ValueError("No sessions could be scheduled. Please check faculty hour limits and room availability.")
-    
-    success_rate = (scheduled_count / len(all_sessions)) * 100
+
+    success_rate = (scheduled_count / solution.total_sessions) * 100
     message = f"✔ Timetable generated with {scheduled_count} sessions ({success_rate:.1f}% success rate)!"
     if skipped_count > 0:
         message += f" {skipped_count} sessions could not be scheduled due to constraints."
-    
+
     return {
-        "status": "success", 
+        "status": "success",
         "message": message,
-        "timetable": result,
+        "timetable": [{
+            "section": section.id,
+            "subject": subject.name,
+            "faculty": faculty.name,
+            "room": room.name,
+            "day": slot.day,
+            "period": slot.period_number,
+            "is_lab": is_lab
+        } for section, subject, faculty, room, slot, is_lab in solution.placements],
         "stats": {
             "scheduled": scheduled_count,
             "skipped": skipped_count,
             "success_rate": success_rate,
-            "slot_utilization": utilization
-        }
+            "slot_utilization": utilization,
+            "solver": solver,
+            "seed": solution.seed,
+            "attempts": solution.attempts,
+            "cached": cached,
+            "problem_hash": digest
+        },
+        "quality": score_solutions(problem, [solution])[0],
+        "feasibility": feasibility,
+        "timings": timings,
+        "dry_run": dry_run
     }
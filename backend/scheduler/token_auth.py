@@ -0,0 +1,69 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from .metrics import record_cache_lookup
+
+# Kept apart from authentication.py (which holds the auth views) because DRF
+# imports this class while loading its own views module.
+
+TOKEN_CACHE_PREFIX = 'auth-token:'
+
+
+def _token_cache():
+    return caches[getattr(settings, 'AUTH_TOKEN_CACHE', 'default')]
+
+
+def _token_cache_key(key):
+    # Hash the key so raw tokens never end up in the cache backend
+    return TOKEN_CACHE_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_cached_token(key):
+    """Drop a token from the authentication cache"""
+    _token_cache().delete(_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for DRF's TokenAuthentication that caches token lookups.
+
+    Tokens (with their user) are kept in the Django cache for
+    ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds; the cache backend bounds the number
+    of entries. Entries are dropped when a token is deleted (logout) or its
+    user is deactivated, see ``scheduler.signals``.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = _token_cache()
+        cache_key = _token_cache_key(key)
+        token = cache.get(cache_key)
+        record_cache_lookup('auth_token', token is not None)
+
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300))
+        elif not token.user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+
+        return (token.user, token)
+
+
+async def aauthenticate_token(key):
+    """Async counterpart of CachedTokenAuthentication for plain Django async views.
+
+    Returns the active user for ``key`` or None.
+    """
+    from rest_framework.authtoken.models import Token
+
+    cache = _token_cache()
+    cache_key = _token_cache_key(key)
+    token = await cache.aget(cache_key)
+    record_cache_lookup('auth_token', token is not None)
+    if token is None:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        await cache.aset(cache_key, token, getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300))
+    return token.user if token.user.is_active else None
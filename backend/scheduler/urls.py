@@ -1,8 +1,13 @@
 from django.urls import path
 from .views import (
     setup_and_generate, view_timetable, list_timetables, get_section_navigation,
-    get_user_setup_status, save_institute_setup, generate_from_academic_setup
+    get_user_setup_status, save_institute_setup, generate_from_academic_setup,
+    import_setup_file, export_timetables, view_faculty_timetable, view_room_timetable,
+    view_timetables_batch, check_setup_feasibility, audit_stored_timetable,
+    what_if_generation, session_alternatives, move_session, swap_sessions,
+    find_substitutes, utilisation_analytics
 )
+from . import async_views
 from .authentication import register_user, login_user, logout_user, get_user_profile, test_auth
 
 urlpatterns = [
@@ -17,12 +22,33 @@ urlpatterns = [
     path('setup/status/', get_user_setup_status, name='get_user_setup_status'),
     path('setup/institute/', save_institute_setup, name='save_institute_setup'),
     path('setup/academic/', generate_from_academic_setup, name='generate_from_academic_setup'),
+    path('setup/import/<str:kind>/', import_setup_file, name='import_setup_file'),
+    path('setup/feasibility/', check_setup_feasibility, name='check_setup_feasibility'),
     
     # Legacy endpoint (for backward compatibility)
     path('generate/', setup_and_generate, name='setup_and_generate'),
+    path('generate/what-if/', what_if_generation, name='what_if_generation'),
     
     # Timetable endpoints
     path('view/<int:section_id>/', view_timetable, name='view_timetable'),
+    path('view/batch/', view_timetables_batch, name='view_timetables_batch'),
+    path('view/faculty/<int:faculty_id>/', view_faculty_timetable, name='view_faculty_timetable'),
+    path('view/room/<int:room_id>/', view_room_timetable, name='view_room_timetable'),
     path('list/', list_timetables, name='list_timetables'),
     path('navigation/<int:section_id>/', get_section_navigation, name='get_section_navigation'),  # New endpoint
+    path('export/<str:scope>/<str:fmt>/', export_timetables, name='export_timetables'),
+    path('audit/', audit_stored_timetable, name='audit_stored_timetable'),
+    path('analytics/', utilisation_analytics, name='utilisation_analytics'),
+
+    # Interactive edits of single sessions
+    path('sessions/<int:session_id>/alternatives/', session_alternatives, name='session_alternatives'),
+    path('sessions/<int:session_id>/move/', move_session, name='move_session'),
+    path('sessions/<int:session_id>/swap/', swap_sessions, name='swap_sessions'),
+    path('substitutes/', find_substitutes, name='find_substitutes'),
+
+    # Async read endpoints (native under ASGI, e.g. uvicorn backend.asgi:application)
+    path('async/view/<int:section_id>/', async_views.view_timetable, name='async_view_timetable'),
+    path('async/list/', async_views.list_timetables, name='async_list_timetables'),
+    path('async/navigation/<int:section_id>/', async_views.get_section_navigation, name='async_get_section_navigation'),
+    path('async/setup/status/', async_views.get_user_setup_status, name='async_get_user_setup_status'),
 ]
@@ -0,0 +1,121 @@
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .conditional import bump_generation_version
+from .models import CurrentTimetable, ScheduledSession, SectionTimetableGrid, TimetableVersion
+
+logger = logging.getLogger(__name__)
+
+# Versioned timetables. The generator writes its sessions against new
+# TimetableVersion rows that no reader can see yet (readers go through
+# ScheduledSession.current), then activate_versions() flips each course's
+# CurrentTimetable pointer, replaces the section grids and advances the ETag
+# counter in one short transaction. Neither the solve nor the bulk insert
+# holds locks that readers wait on; the replaced versions are deleted later
+# by collect_versions(), on a background thread after each swap or from the
+# collect_timetable_versions command. The setup endpoints store a submitted
+# setup in the same transaction as its swap (see generate_with_setup).
+
+ABANDONED_AFTER = timedelta(hours=1)  # written but never activated (failed write, lost race)
+
+_collector_running = threading.Lock()
+
+
+def create_versions(course_ids, owner=None):
+    """One new (not yet current) version per course, keyed by course id"""
+    return {
+        course_id: TimetableVersion.objects.create(owner=owner, course_id=course_id)
+        for course_id in sorted(course_ids)
+    }
+
+
+def current_version(course_id, owner=None):
+    """The course's current version, starting an empty one if it has none (for hand-made sessions)"""
+    pointer = CurrentTimetable.objects.filter(course_id=course_id).select_related('version').first()
+    if pointer is not None:
+        return pointer.version
+    version = TimetableVersion.objects.create(owner=owner, course_id=course_id)
+    CurrentTimetable.objects.create(course_id=course_id, version=version)
+    return version
+
+
+def activate_versions(versions, grids):
+    """Make ``versions`` current and store ``grids`` (unsaved SectionTimetableGrid rows).
+
+    Everything readers see changes in this one transaction; the previous
+    versions are marked retired and left for collect_versions().
+    """
+    versions = list(versions)
+    now = timezone.now()
+    with transaction.atomic():
+        pointers = {
+            pointer.course_id: pointer
+            for pointer in CurrentTimetable.objects.select_for_update().filter(
+                course__in=[version.course_id for version in versions]
+            )
+        }
+        TimetableVersion.objects.filter(
+            pk__in=[pointer.version_id for pointer in pointers.values()]
+        ).update(retired_at=now)
+        for version in versions:
+            pointer = pointers.get(version.course_id)
+            if pointer is None:
+                CurrentTimetable.objects.create(course_id=version.course_id, version=version)
+            else:
+                pointer.version = version
+                pointer.save(update_fields=['version'])
+
+        SectionTimetableGrid.objects.filter(section__in=[grid.section_id for grid in grids]).delete()
+        SectionTimetableGrid.objects.bulk_create(grids)
+        bump_generation_version()
+        transaction.on_commit(schedule_collection)
+    logger.info(f"Activated timetable versions {[version.id for version in versions]} "
+                f"({len(grids)} section grids)")
+
+
+def collect_versions(retention=None):
+    """Delete retired versions older than ``retention`` seconds and abandoned ones.
+
+    Each version's sessions go in their own statement so no single delete
+    holds locks for long. Returns the number of versions deleted.
+    """
+    if retention is None:
+        retention = getattr(settings, 'TIMETABLE_VERSION_RETENTION', 60)
+    now = timezone.now()
+    stale = TimetableVersion.objects.filter(
+        Q(retired_at__lte=now - timedelta(seconds=retention))
+        | Q(retired_at__isnull=True, created_at__lte=now - ABANDONED_AFTER)
+    ).exclude(pk__in=CurrentTimetable.objects.values('version'))
+
+    version_ids = list(stale.order_by('id').values_list('id', flat=True))
+    sessions = 0
+    for version_id in version_ids:
+        deleted, _ = ScheduledSession.objects.filter(version_id=version_id).delete()
+        sessions += deleted
+        TimetableVersion.objects.filter(pk=version_id).delete()
+    if version_ids:
+        logger.info(f"Collected {len(version_ids)} old timetable versions ({sessions} sessions)")
+    return len(version_ids)
+
+
+def _collect_in_background():
+    try:
+        collect_versions()
+    except Exception:
+        logger.exception("Timetable version collection failed")
+    finally:
+        connection.close()  # the thread's own connection
+        _collector_running.release()
+
+
+def schedule_collection():
+    """Run collect_versions() on a daemon thread unless one is already running"""
+    if not getattr(settings, 'TIMETABLE_VERSION_GC_IN_BACKGROUND', True):
+        return
+    if not _collector_running.acquire(blocking=False):
+        return
+    threading.Thread(target=_collect_in_background, name='timetable-version-gc', daemon=True).start()
@@ -1,158 +1,131 @@
 import logging
+from datetime import date, time
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import (
-    InstitutionSettings, Room, Faculty, Semester, Section, Subject, FacultySubjectAllocation, TimetableSlot, ScheduledSession, Course
+    InstitutionSettings, Room, Faculty, Semester, Section, Subject, FacultySubjectAllocation, TimetableSlot, ScheduledSession, Course,
+    SectionTimetableGrid, CurrentTimetable
 )
-from .timetable_generator import generate_timetable
+from .timetable_generator import (
+    DEFAULT_ATTEMPTS, SOLVER_MODES, SetupChangedError, generate_timetable, generate_with_setup
+)
+from .problem import load_problem
+from .feasibility import check_feasibility
+from .audit import audit_timetable
+from .analytics import cached_timetable_analytics
+from .whatif import apply_overlay
+from .occupancy import OccupancyIndex, lock_timetable_edits, move_sessions
+from .grids import (
+    compact_grid_document, compact_grid_documents, expand_grid_document, grid_axes, rebuild_grid_document,
+    refresh_section_grids, sections_of
+)
+from .responses import json_response, wants_compact
+from .conditional import bump_generation_version, conditional_timetable_view, get_generation_state
+from .idempotency import idempotent_view
+from .setup_pipeline import (
+    SetupValidationError, validate_institute, validate_rooms, validate_faculties, validate_academics,
+    raise_if_errors, create_timetable_slots, create_rooms, create_faculties, create_academic_structure
+)
+from .importers import DEFAULT_CHUNK_SIZE, SetupImportError, import_rows, iter_rows
+from .exports import EXPORT_FORMATS, EXPORT_SCOPES, stream_csv, stream_ics, stream_jsonl
 from django.db import transaction
+from django.db.models import Q
 
 logger = logging.getLogger(__name__)
 
+def setup_error_response(exc):
+    """400 response listing every validation problem in a setup payload"""
+    logger.error("Setup payload rejected: %s", exc)
+    return Response({"error": str(exc), "errors": exc.errors}, status=400)
+
+SETUP_NOT_SAVED = "The submitted setup was not saved; the previous timetable is still current"
+
+def generation_error_response(result, setup_discarded=False):
+    """400 response for a generation that did not succeed (with the feasibility report when aborted)"""
+    payload = {"error": result["message"]}
+    if "feasibility" in result:
+        payload["feasibility"] = result["feasibility"]
+    if setup_discarded:
+        payload["detail"] = SETUP_NOT_SAVED
+    return Response(payload, status=400)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])  # Add authentication requirement
+@idempotent_view
 def setup_and_generate(request):
     data = request.data
     
     # Log the authenticated user
     logger.info(f"Timetable generation requested by user: {request.user.username}")
 
-    # Restrictions (sync with frontend):
-    MAX_PERIODS_PER_DAY = 8
-    MAX_WORKING_DAYS = 7
-
-    # Validate institution settings
-    periods_per_day = data["institute"]["periodsPerDay"]
-    working_days = data["institute"]["workingDays"]
-    if periods_per_day > MAX_PERIODS_PER_DAY or periods_per_day < 1:
-        logger.error("Invalid periods per day: %s", periods_per_day)
-        return Response({"error": f"Periods per day must be between 1 and {MAX_PERIODS_PER_DAY}."}, status=400)
-    if working_days > MAX_WORKING_DAYS or working_days < 1:
-        logger.error("Invalid working days: %s", working_days)
-        return Response({"error": f"Working days must be between 1 and {MAX_WORKING_DAYS}."}, status=400)
-
+    # Validate the whole payload before touching the database
     try:
-        with transaction.atomic():
-            # Clear previous setup
-            InstitutionSettings.objects.all().delete()
-            Room.objects.all().delete()
-            Faculty.objects.all().delete()
-            Semester.objects.all().delete()
-            Section.objects.all().delete()
-            Subject.objects.all().delete()
-            FacultySubjectAllocation.objects.all().delete()
-            TimetableSlot.objects.all().delete()
-            ScheduledSession.objects.all().delete()
-
-            # Save institution settings
-            inst = InstitutionSettings.objects.create(
-                course=data["institute"]["course"],
-                academic_year=data["institute"]["academicYear"],
-                working_days=working_days,
-                periods_per_day=periods_per_day,
-                period_duration=data["institute"]["periodDuration"]
-            )
+        errors = []
+        institute = validate_institute(data, errors)
+        rooms = validate_rooms(data, errors)
+        faculties = validate_faculties(data, errors)
+        semesters = validate_academics(
+            data.get("academics"), {fac["name"] for fac in faculties}, errors
+        )
+        raise_if_errors(errors)
+    except SetupValidationError as e:
+        return setup_error_response(e)
 
-            # Ensure course exists and get/create Course object
-            course_obj, _ = Course.objects.get_or_create(
-                name=data["institute"]["course"],
-                defaults={"code": data["institute"]["course"][:20]}
-            )
+    def write_setup():
+        # Replace the previous setup (the deletes cascade onto the old timetable)
+        InstitutionSettings.objects.all().delete()
+        Room.objects.all().delete()
+        Faculty.objects.all().delete()
+        Semester.objects.all().delete()
+        Section.objects.all().delete()
+        Subject.objects.all().delete()
+        FacultySubjectAllocation.objects.all().delete()
+        TimetableSlot.objects.all().delete()
 
-            # Create timetable slots for each day/period
-            for day in range(1, working_days + 1):
-                for period in range(1, periods_per_day + 1):
-                    TimetableSlot.objects.create(day=day, period_number=period)
-
-            # Save rooms/labs
-            for room in data["rooms"]:
-                Room.objects.create(name=room["name"], is_lab=room["isLab"])
-
-            # Save faculties
-            for fac in data["faculties"]:
-                Faculty.objects.create(name=fac["name"], employee_id=fac["empId"])
-
-            # Save academic setup
-            section_ids = []
-            for sem in data["academics"]:
-                # Create Semester with course_obj
-                semester_obj = Semester.objects.create(
-                    course=course_obj,
-                    name=f"Semester {sem['semester']}",
-                    number=sem["semester"]
-                )
-                
-                # Create subjects once per semester (not per section)
-                semester_subjects = []
-                for subj in sem["subjects"]:
-                    # Validate faculty assignment
-                    if not subj["faculty"]:
-                        logger.error("Faculty not assigned for subject %s", subj['name'])
-                        return Response({"error": f"Faculty not assigned for subject {subj['name']}."}, status=400)
-                    
-                    try:
-                        faculty_obj = Faculty.objects.get(name=subj["faculty"])
-                    except Faculty.DoesNotExist:
-                        logger.error("Faculty %s not found", subj["faculty"])
-                        return Response({"error": f"Faculty {subj['faculty']} not found."}, status=400)
-                    
-                    # Generate unique code from subject name + semester
-                    subject_code = f"{subj['name'][:10].replace(' ', '').upper()}_{sem['semester']}"
-                    
-                    # Check if subject already exists for this semester
-                    existing_subject = Subject.objects.filter(
-                        code=subject_code, 
-                        semester=semester_obj
-                    ).first()
-                    
-                    if existing_subject:
-                        subject_obj = existing_subject
-                    else:
-                        subject_obj = Subject.objects.create(
-                            name=subj["name"], 
-                            semester=semester_obj,
-                            code=subject_code,
-                            weekly_hours=subj.get("weeklyHours", 3),
-                            lab_required=subj.get("isLab", False),
-                            lab_hours=subj.get("labHours", 0)
-                        )
-                    
-                    semester_subjects.append((subject_obj, faculty_obj))
-                
-                # Create sections and link them to subjects
-                for sec in sem["sections"]:
-                    section_obj = Section.objects.create(name=sec, semester=semester_obj)
-                    section_ids.append(section_obj.id)
-                    
-                    # Create faculty allocations for this section
-                    for subject_obj, faculty_obj in semester_subjects:
-                        # Check if allocation already exists
-                        allocation_exists = FacultySubjectAllocation.objects.filter(
-                            faculty=faculty_obj,
-                            subject=subject_obj
-                        ).exists()
-                        
-                        if not allocation_exists:
-                            FacultySubjectAllocation.objects.create(
-                                faculty=faculty_obj,
-                                subject=subject_obj
-                            )
-
-            # Generate timetable
-            try:
-                result = generate_timetable()
-            except Exception as e:
-                logger.exception("Timetable generation failed: %s", str(e))
-                return Response({"error": str(e)}, status=400)
+        # Save institution settings
+        InstitutionSettings.objects.create(
+            course=institute["course"],
+            academic_year=institute["academic_year"],
+            working_days=institute["working_days"],
+            periods_per_day=institute["periods_per_day"],
+            period_duration=institute["period_duration"]
+        )
+
+        # Ensure course exists and get/create Course object
+        course_obj, _ = Course.objects.get_or_create(
+            name=institute["course"],
+            defaults={"code": institute["course"][:20]}
+        )
 
-            if result["status"] != "success":
-                logger.error("Timetable generation error: %s", result["message"])
-                return Response({"error": result["message"]}, status=400)
+        # Bulk-create slots, rooms, faculties and the academic structure
+        create_timetable_slots(institute["working_days"], institute["periods_per_day"])
+        create_rooms(rooms)
+        faculty_map = {f.name: f for f in create_faculties(faculties)}
+        return create_academic_structure(
+            course_obj, semesters, faculty_map, code_suffix=lambda number: f"_{number}"
+        )
 
+    # The solve runs before anything is stored; the setup is then written
+    # together with the new timetable version in one transaction
+    try:
+        result, sections = generate_with_setup(
+            write_setup, owner=request.user, abort_on_infeasible=bool(data.get("abortIfInfeasible", False))
+        )
+    except SetupChangedError as e:
+        return Response({"error": str(e), "detail": SETUP_NOT_SAVED}, status=409)
+    except ValueError as e:
+        logger.exception("Timetable generation failed: %s", str(e))
+        return Response({"error": str(e), "detail": SETUP_NOT_SAVED}, status=400)
     except Exception as e:
         logger.exception("Setup and generate failed: %s", str(e))
-        return Response({"error": str(e)}, status=500)
+        return Response({"error": str(e), "detail": SETUP_NOT_SAVED}, status=500)
+
+    if result["status"] != "success":
+        logger.error("Timetable generation error: %s", result["message"])
+        return generation_error_response(result, setup_discarded=True)
+    section_ids = [section.id for section in sections]
 
     # Return first section id for navigation
     return Response({
@@ -162,37 +135,324 @@ def setup_and_generate(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])  # Add authentication requirement
+@conditional_timetable_view
 def view_timetable(request, section_id):
-    from .models import Section, TimetableSlot, ScheduledSession
     # Log the authenticated user
     logger.info(f"Timetable view requested by user: {request.user.username} for section: {section_id}")
     
-    section = Section.objects.get(id=section_id)
-    slots = TimetableSlot.objects.all().order_by('day', 'period_number')
-    days = {slot.day: slot.get_day_display() for slot in slots}
-    periods = sorted(set(slot.period_number for slot in slots))
-    sessions = ScheduledSession.objects.filter(section_id=section_id)
-
-    timetable = []
-    for session in sessions:
-        timetable.append({
+    # Served from the grid materialised at generation time (single primary-key lookup)
+    grid = SectionTimetableGrid.objects.filter(pk=section_id).first()
+    if grid is not None:
+        document = grid.document
+    else:
+        # Timetables generated before grids existed are rebuilt from the session rows
+        try:
+            section = Section.objects.get(id=section_id)
+        except Section.DoesNotExist:
+            return Response({'error': 'Section not found'}, status=404)
+        document = rebuild_grid_document(section)
+
+    if wants_compact(request.query_params):
+        return json_response(compact_grid_document(document))
+    return Response(expand_grid_document(document))
+
+MAX_BATCH_SECTIONS = 200
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_timetable_view
+def view_timetables_batch(request):
+    """Grids for many sections at once (``?sections=1,2,3`` or ``?semester=3&course=MCA``)
+
+    ``?layout=compact`` returns one set of string tables for the whole batch
+    and a days × periods matrix per section instead of session lists.
+    """
+    params = request.query_params
+    grids = SectionTimetableGrid.objects.select_related('section__semester__course').order_by(
+        'section__semester__number', 'section__name'
+    )
+    
+    requested_ids = []
+    if params.get('sections'):
+        try:
+            requested_ids = [int(value) for value in params['sections'].split(',') if value.strip()]
+        except ValueError:
+            return Response({'error': 'sections must be a comma-separated list of ids'}, status=400)
+        if len(requested_ids) > MAX_BATCH_SECTIONS:
+            return Response({'error': f'At most {MAX_BATCH_SECTIONS} sections can be fetched at once'}, status=400)
+        grids = grids.filter(section_id__in=requested_ids)
+    elif params.get('semester') or params.get('course'):
+        if params.get('semester'):
+            try:
+                semester = int(params['semester'])
+            except ValueError:
+                return Response({'error': 'semester must be a number'}, status=400)
+            grids = grids.filter(section__semester__number=semester)
+        if params.get('course'):
+            grids = grids.filter(section__semester__course__name=params['course'])
+        grids = grids[:MAX_BATCH_SECTIONS]
+    else:
+        return Response({'error': 'Pass sections=<ids> or a semester/course filter'}, status=400)
+    
+    # One joined query for every grid; slot metadata is sent once for the batch
+    grids = list(grids)
+    found = {grid.section_id for grid in grids}
+    missing = [section_id for section_id in requested_ids if section_id not in found]
+    
+    if wants_compact(params):
+        compact = compact_grid_documents([grid.document for grid in grids])
+        compact["sections"] = [{
+            "id": grid.section_id,
+            "name": grid.section.name,
+            "semester": grid.section.semester.number,
+            "course": grid.section.semester.course.name,
+            "grid": encoded["grid"],
+        } for grid, encoded in zip(grids, compact["sections"])]
+        if grids:
+            days, periods = grids[0].document["days"], grids[0].document["periods"]
+        else:
+            days, periods = _timetable_axes()
+        return json_response({"days": days, "periods": periods, **compact, "missing": missing})
+    
+    days = periods = None
+    sections = []
+    for grid in grids:
+        expanded = expand_grid_document(grid.document)
+        days, periods = days or expanded["days"], periods or expanded["periods"]
+        sections.append({
+            "id": grid.section_id,
+            "name": grid.section.name,
+            "semester": grid.section.semester.number,
+            "course": grid.section.semester.course.name,
+            "timetable": expanded["timetable"],
+        })
+    if days is None:
+        days, periods = _timetable_axes()
+    
+    return Response({
+        "days": days,
+        "periods": periods,
+        "sections": sections,
+        "missing": missing,
+    })
+
+def _timetable_axes():
+    """Day names and period labels of the slot grid"""
+    day_numbers, period_numbers = grid_axes(TimetableSlot.objects.all())
+    day_names = dict(TimetableSlot._meta.get_field('day').choices)
+    return [day_names[d] for d in day_numbers], [str(p) for p in period_numbers]
+
+def _inverse_sessions(**lookup):
+    # Served by the (faculty, slot) / (room, slot) indexes in a single joined query
+    return list(ScheduledSession.current.filter(**lookup).select_related(
+        'slot', 'subject', 'section__semester', 'faculty', 'room'
+    ).order_by('slot__day', 'slot__period_number'))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_timetable_view
+def view_faculty_timetable(request, faculty_id):
+    """Weekly timetable of one faculty member across all sections"""
+    sessions = _inverse_sessions(faculty_id=faculty_id)
+    faculty = sessions[0].faculty if sessions else Faculty.objects.filter(pk=faculty_id).first()
+    if faculty is None:
+        return Response({'error': 'Faculty not found'}, status=404)
+    
+    days, periods = _timetable_axes()
+    return Response({
+        "faculty": {
+            "id": faculty.id,
+            "name": faculty.name,
+            "employee_id": faculty.employee_id,
+            "max_hours_per_week": faculty.max_hours_per_week,
+        },
+        "days": days,
+        "periods": periods,
+        "hours_scheduled": len(sessions),
+        "timetable": [{
             "day": session.slot.get_day_display(),
             "period": session.slot.period_number,
             "subject": session.subject.name,
-            "faculty": session.faculty.name,
+            "section": session.section.name,
+            "semester": session.section.semester.number,
             "room": session.room.name,
             "is_lab": session.is_lab_session,
-        })
+        } for session in sessions],
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_timetable_view
+def view_room_timetable(request, room_id):
+    """Weekly occupancy of one room or lab across all sections"""
+    sessions = _inverse_sessions(room_id=room_id)
+    room = sessions[0].room if sessions else Room.objects.filter(pk=room_id).first()
+    if room is None:
+        return Response({'error': 'Room not found'}, status=404)
+    
+    days, periods = _timetable_axes()
+    return Response({
+        "room": {"id": room.id, "name": room.name, "is_lab": room.is_lab},
+        "days": days,
+        "periods": periods,
+        "hours_scheduled": len(sessions),
+        "timetable": [{
+            "day": session.slot.get_day_display(),
+            "period": session.slot.period_number,
+            "subject": session.subject.name,
+            "section": session.section.name,
+            "semester": session.section.semester.number,
+            "faculty": session.faculty.name,
+            "is_lab": session.is_lab_session,
+        } for session in sessions],
+    })
+
+def _session_payload(session):
+    return {
+        "id": session.id,
+        "section": session.section.name,
+        "semester": session.section.semester.number,
+        "subject": session.subject.name,
+        "faculty": session.faculty.name,
+        "room": session.room.name,
+        "day": session.slot.get_day_display(),
+        "period": session.slot.period_number,
+        "is_lab": session.is_lab_session,
+    }
+
+def _moved_session(session_id):
+    return _session_payload(ScheduledSession.objects.select_related(
+        'slot', 'subject', 'section__semester', 'faculty', 'room'
+    ).get(pk=session_id))
+
+def _alternatives_limit(request, default=None):
+    # ?limit=N caps the ranked list; no limit returns every alternative
+    try:
+        limit = int(request.query_params.get('limit', default or 0))
+    except (TypeError, ValueError):
+        limit = default or 0
+    return max(1, limit) if limit else None
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def session_alternatives(request, session_id):
+    """Every feasible (slot, room) for one session, best first"""
+    index = OccupancyIndex.current()
+    if session_id not in index.sessions:
+        return Response({'error': 'Session not found'}, status=404)
+    return Response({
+        "session": session_id,
+        "alternatives": index.alternatives(session_id, limit=_alternatives_limit(request)),
+    })
+
+def _editable_sessions(request):
+    # Current sessions of the timetables this user generated, locked for the edit
+    return ScheduledSession.current.select_for_update().filter(version__owner=request.user)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def move_session(request, session_id):
+    """Move one session to another slot (``slot`` id, or ``day`` + ``period``) and/or ``room``"""
+    data = request.data
+    with transaction.atomic():
+        lock_timetable_edits()
+        if not _editable_sessions(request).filter(pk=session_id).exists():
+            return Response({'error': 'Session not found'}, status=404)
+        index = OccupancyIndex.current()
+        current = index.sessions[session_id]
+
+        slot_id = data.get("slot")
+        if slot_id is None and data.get("day") is not None:
+            slot_id = next((slot.id for slot in index.slots if str(slot.day) == str(data.get("day"))
+                            and str(slot.period_number) == str(data.get("period"))), None)
+            if slot_id is None:
+                return Response({'error': 'No such day/period in the timetable grid'}, status=400)
+        try:
+            slot_id = int(slot_id if slot_id is not None else current[5])
+            room_id = int(data.get("room") or current[4])
+        except (TypeError, ValueError):
+            return Response({'error': 'slot and room must be ids'}, status=400)
+
+        reasons = index.conflicts(session_id, slot_id, room_id)
+        if reasons:
+            return Response({
+                "error": "The session cannot be moved there",
+                "conflicts": reasons,
+                "alternatives": index.alternatives(session_id, limit=_alternatives_limit(request, 10)),
+            }, status=409)
+        move_sessions({session_id: (slot_id, room_id)})
+
+    return Response({"message": "Session moved", "session": _moved_session(session_id)})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def swap_sessions(request, session_id):
+    """Exchange the slot and room of two sessions (``with``: the other session id)"""
+    try:
+        other_id = int(request.data.get("with"))
+    except (TypeError, ValueError):
+        return Response({'error': '"with" must be a session id'}, status=400)
+    if other_id == session_id:
+        return Response({'error': 'A session cannot be swapped with itself'}, status=400)
+
+    with transaction.atomic():
+        lock_timetable_edits()
+        locked = list(_editable_sessions(request).filter(
+            pk__in=[session_id, other_id]).order_by('id').values_list('id', flat=True))
+        if len(locked) != 2:
+            return Response({'error': 'Session not found'}, status=404)
+        index = OccupancyIndex.current()
+        first, second = index.sessions[session_id], index.sessions[other_id]
+
+        conflicts = {
+            str(session_id): index.conflicts(session_id, second[5], second[4], ignore=(other_id,)),
+            str(other_id): index.conflicts(other_id, first[5], first[4], ignore=(session_id,)),
+        }
+        if any(conflicts.values()):
+            return Response({"error": "The sessions cannot be swapped", "conflicts": conflicts}, status=409)
+        move_sessions({session_id: (second[5], second[4]), other_id: (first[5], first[4])})
+
+    return Response({
+        "message": "Sessions swapped",
+        "sessions": [_moved_session(session_id), _moved_session(other_id)],
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def find_substitutes(request):
+    """Cover candidates for every session of an absent faculty member (``?faculty=<id>&day=<1-7 or Mon>``)"""
+    day_numbers = {name.lower(): number for number, name in TimetableSlot._meta.get_field('day').choices}
+    day_param = str(request.query_params.get('day', '')).strip()
+    day = day_numbers.get(day_param[:3].lower()) if not day_param.isdigit() else int(day_param)
+    try:
+        faculty_id = int(request.query_params.get('faculty'))
+    except (TypeError, ValueError):
+        return Response({'error': 'faculty must be a faculty id'}, status=400)
+    if day not in day_numbers.values():
+        return Response({'error': 'day must be 1-7 or a day name such as Mon'}, status=400)
+
+    index = OccupancyIndex.current()
+    if faculty_id not in index.faculty_pos:
+        return Response({'error': 'Faculty not found'}, status=404)
+
+    allocated = set(FacultySubjectAllocation.objects.values_list('faculty_id', 'subject_id'))
+    covers = index.substitutes(faculty_id, day, allocated, limit=_alternatives_limit(request))
+    sessions = ScheduledSession.objects.select_related(
+        'slot', 'subject', 'section__semester', 'faculty', 'room'
+    ).in_bulk([row[0] for row, _ in covers])
 
     return Response({
-        "section": section.name,
-        "days": list(days.values()),
-        "periods": [str(p) for p in periods],
-        "timetable": timetable,
+        "faculty": {"id": faculty_id, "name": index.faculty[index.faculty_pos[faculty_id]].name},
+        "day": dict(TimetableSlot._meta.get_field('day').choices)[day],
+        "sessions": [{
+            "session": _session_payload(sessions[row[0]]),
+            "substitutes": candidates,
+        } for row, candidates in covers],
     })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_timetable_view
 def list_timetables(request):
     """List all available timetables"""
     try:
@@ -200,12 +460,12 @@ def list_timetables(request):
         
         # Get all sections that have scheduled sessions
         sections_with_sessions = Section.objects.filter(
-            scheduledsession__isnull=False
+            scheduledsession__version__in=CurrentTimetable.objects.values('version')
         ).distinct()
         
         timetables = []
         for section in sections_with_sessions:
-            session_count = ScheduledSession.objects.filter(section=section).count()
+            session_count = ScheduledSession.current.filter(section=section).count()
             
             timetables.append({
                 'id': section.id,
@@ -228,6 +488,7 @@ def list_timetables(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_timetable_view
 def get_section_navigation(request, section_id):
     """Get navigation info for a specific section"""
     try:
@@ -238,7 +499,7 @@ def get_section_navigation(request, section_id):
         
         # Get all sections that have scheduled sessions (same course)
         sections_with_sessions = Section.objects.filter(
-            scheduledsession__isnull=False,
+            scheduledsession__version__in=CurrentTimetable.objects.values('version'),
             semester__course=current_section.semester.course
         ).distinct().order_by('semester__number', 'name')
         
@@ -266,6 +527,86 @@ def get_section_navigation(request, section_id):
         logger.error(f"Error getting section navigation: {str(e)}")
         return Response({'error': 'Failed to fetch navigation data'}, status=500)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent_view
+def what_if_generation(request):
+    """Solve the stored setup plus an overlay of changes in memory; nothing is written"""
+    data = request.data
+    solver = data.get("solver", "greedy")
+    if solver not in SOLVER_MODES:
+        return Response({"error": f"solver must be one of {', '.join(SOLVER_MODES)}"}, status=400)
+    try:
+        attempts = max(1, min(int(data.get("attempts", DEFAULT_ATTEMPTS)), 64))
+        seed = int(data["seed"]) if data.get("seed") is not None else None
+    except (TypeError, ValueError):
+        return Response({"error": "seed and attempts must be whole numbers"}, status=400)
+
+    try:
+        problem = load_problem()
+        changes = apply_overlay(problem, data.get("overlay") or {})
+        result = generate_timetable(
+            problem=problem, dry_run=True, seed=seed, solver=solver, attempts=attempts,
+            abort_on_infeasible=bool(data.get("abortIfInfeasible", False))
+        )
+    except SetupValidationError as e:
+        return setup_error_response(e)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.exception("What-if generation failed: %s", str(e))
+        return Response({"error": f"Internal error: {str(e)}"}, status=500)
+
+    if result["status"] != "success":
+        return generation_error_response(result)
+
+    logger.info(f"What-if generation by {request.user.username}: {len(changes)} changes, {result['message']}")
+    return Response({
+        "message": result["message"],
+        "changes": changes,
+        "stats": result["stats"],
+        "quality": result["quality"],
+        "feasibility": result["feasibility"],
+        "timings": result["timings"],
+        "sections": [{
+            "id": section.id,
+            "name": section.name,
+            "semester": section.semester.number,
+        } for section in problem.sections],
+        "timetable": result["timetable"],
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def audit_stored_timetable(request):
+    """Double bookings, hour overruns and lab-room mismatches in the stored timetable"""
+    try:
+        return Response(audit_timetable())
+    except Exception as e:
+        logger.error(f"Error auditing timetable: {str(e)}")
+        return Response({'error': 'Failed to audit timetable'}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_timetable_view
+def utilisation_analytics(request):
+    """Room occupancy heatmaps, faculty utilisation and section load/idle slots of the stored timetable"""
+    try:
+        return Response(cached_timetable_analytics(get_generation_state().version))
+    except Exception as e:
+        logger.error(f"Error computing timetable analytics: {str(e)}")
+        return Response({'error': 'Failed to compute timetable analytics'}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def check_setup_feasibility(request):
+    """Capacity pre-check of the stored setup, without generating anything"""
+    try:
+        report = check_feasibility(load_problem())
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return Response(report)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_setup_status(request):
@@ -324,56 +665,65 @@ def get_user_setup_status(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent_view
 def save_institute_setup(request):
     """Save one-time institute, faculty, and room setup"""
     try:
         user = request.user
         data = request.data
         
+        # Validate the whole payload before touching the database
+        errors = []
+        institute = validate_institute(data, errors, require_name=True)
+        rooms = validate_rooms(data, errors)
+        faculties = validate_faculties(data, errors)
+        taken_ids = Faculty.objects.filter(
+            employee_id__in=[fac["employee_id"] for fac in faculties]
+        ).exclude(created_by=user).values_list('employee_id', flat=True)
+        errors.extend(f"Employee ID '{emp_id}' is already in use" for emp_id in taken_ids)
+        raise_if_errors(errors)
+        
         with transaction.atomic():
             # Clear user's previous setup
             InstitutionSettings.objects.filter(created_by=user).delete()
+            # The deletes cascade onto the sessions taught by or held in them,
+            # so the grids of those sections are rebuilt from what remains
+            sections = sections_of(ScheduledSession.objects.filter(
+                Q(faculty__created_by=user) | Q(room__created_by=user)
+            ))
             Faculty.objects.filter(created_by=user).delete()
             Room.objects.filter(created_by=user).delete()
+            refresh_section_grids(sections)
+            bump_generation_version()
             
             # Save institute settings
-            institute = InstitutionSettings.objects.create(
-                institution_name=data["institute"]["name"],  # Store institution name
-                course=data["institute"]["course"],
-                academic_year=data["institute"]["academicYear"],
-                working_days=data["institute"]["workingDays"],
-                periods_per_day=data["institute"]["periodsPerDay"],
-                period_duration=data["institute"]["periodDuration"],
+            InstitutionSettings.objects.create(
+                institution_name=institute["name"],  # Store institution name
+                course=institute["course"],
+                academic_year=institute["academic_year"],
+                working_days=institute["working_days"],
+                periods_per_day=institute["periods_per_day"],
+                period_duration=institute["period_duration"],
                 created_by=user,
                 is_setup_complete=True
             )
             
-            # Save rooms
-            for room in data["rooms"]:
-                Room.objects.create(
-                    name=room["name"], 
-                    is_lab=room["isLab"],
-                    created_by=user
-                )
-            
-            # Save faculties with working hours
-            for fac in data["faculties"]:
-                Faculty.objects.create(
-                    name=fac["name"], 
-                    employee_id=fac["empId"],
-                    max_hours_per_week=fac.get("maxHours", 18),
-                    created_by=user
-                )
+            # Save rooms and faculties (with working hours) in one insert each
+            create_rooms(rooms, created_by=user)
+            create_faculties(faculties, created_by=user)
         
         logger.info(f"Institute setup completed for user: {user.username}")
         return Response({'message': 'Institute setup saved successfully'})
         
+    except SetupValidationError as e:
+        return setup_error_response(e)
     except Exception as e:
         logger.error(f"Error saving institute setup: {str(e)}")
         return Response({'error': str(e)}, status=500)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent_view
 def generate_from_academic_setup(request):
     """Generate timetable using existing institute setup + new academic data"""
     try:
@@ -391,14 +741,23 @@ def generate_from_academic_setup(request):
                 'error': 'Please complete institute setup first'
             }, status=400)
         
-        # Validate that academics data exists
-        if 'academics' not in data or not data['academics']:
+        # Get user's existing faculties
+        faculty_map = {f.name: f for f in Faculty.objects.filter(created_by=user)}
+        
+        if not faculty_map:
             return Response({
-                'error': 'Academic data is required'
+                'error': 'No faculty members found in your setup'
             }, status=400)
         
-        with transaction.atomic():
-            # Clear only academic and scheduling data, keep institute setup
+        # Validate the whole academic payload before touching the database
+        errors = []
+        semesters = validate_academics(data.get("academics"), faculty_map.keys(), errors)
+        if errors and any("not found in your setup" in error for error in errors):
+            errors.append(f"Available faculty: {', '.join(faculty_map.keys())}")
+        raise_if_errors(errors)
+        
+        def write_setup():
+            # Replace only academic and scheduling data, keep institute setup
             # Find existing course for this user's institute
             existing_course = Course.objects.filter(
                 name=institute.course
@@ -408,8 +767,7 @@ def generate_from_academic_setup(request):
                 # Clear semesters for this course only
                 Semester.objects.filter(course=existing_course).delete()
             
-            # Clear all scheduling data
-            ScheduledSession.objects.all().delete()
+            # The slot grid is rebuilt (the deletes cascade onto the old timetable)
             TimetableSlot.objects.all().delete()
             
             # Get or create course with proper handling
@@ -422,118 +780,24 @@ def generate_from_academic_setup(request):
             
             logger.info(f"Using course: {course_obj.name} (ID: {course_obj.id})")
             
-            # Create timetable slots
-            for day in range(1, institute.working_days + 1):
-                for period in range(1, institute.periods_per_day + 1):
-                    TimetableSlot.objects.create(day=day, period_number=period)
-            
-            # Get user's existing faculties
-            user_faculties = Faculty.objects.filter(created_by=user)
-            faculty_map = {f.name: f for f in user_faculties}
-            
-            if not faculty_map:
-                return Response({
-                    'error': 'No faculty members found in your setup'
-                }, status=400)
-            
-            # Create academic structure
-            section_ids = []
-            for sem_data in data["academics"]:
-                try:
-                    semester_number = int(sem_data['semester'])
-                except (ValueError, TypeError):
-                    return Response({
-                        'error': f"Invalid semester number: {sem_data.get('semester')}"
-                    }, status=400)
-                
-                # Create semester with the course object
-                semester_obj = Semester.objects.create(
-                    course=course_obj,  # Pass the actual Course object
-                    name=f"Semester {semester_number}",
-                    number=semester_number
-                )
-                
-                logger.info(f"Created semester: {semester_obj.name} for course: {course_obj.name}")
-                
-                # Validate subjects data
-                if 'subjects' not in sem_data or not sem_data['subjects']:
-                    return Response({
-                        'error': f"No subjects defined for semester {semester_number}"
-                    }, status=400)
-                
-                semester_subjects = []
-                for subj_data in sem_data["subjects"]:
-                    # Validate required fields
-                    if not subj_data.get("name"):
-                        return Response({
-                            'error': f"Subject name is required for semester {semester_number}"
-                        }, status=400)
-                    
-                    if not subj_data.get("faculty"):
-                        return Response({
-                            'error': f"Faculty assignment is required for subject {subj_data.get('name', 'Unknown')}"
-                        }, status=400)
-                    
-                    faculty_name = subj_data["faculty"]
-                    if faculty_name not in faculty_map:
-                        return Response({
-                            'error': f"Faculty '{faculty_name}' not found in your setup. Available faculty: {', '.join(faculty_map.keys())}"
-                        }, status=400)
-                    
-                    faculty_obj = faculty_map[faculty_name]
-                    subject_code = f"{subj_data['name'][:10].replace(' ', '').upper()}_{semester_number}_{course_obj.id}"
-                    
-                    # Create subject
-                    subject_obj = Subject.objects.create(
-                        name=subj_data["name"],
-                        semester=semester_obj,
-                        code=subject_code,
-                        weekly_hours=subj_data.get("weeklyHours", 3),
-                        lab_required=subj_data.get("isLab", False),
-                        lab_hours=subj_data.get("labHours", 0)
-                    )
-                    
-                    semester_subjects.append((subject_obj, faculty_obj))
-                    logger.info(f"Created subject: {subject_obj.name} assigned to {faculty_obj.name}")
-                
-                # Validate sections data
-                if 'sections' not in sem_data or not sem_data['sections']:
-                    return Response({
-                        'error': f"No sections defined for semester {semester_number}"
-                    }, status=400)
-                
-                for section_name in sem_data["sections"]:
-                    if not section_name.strip():
-                        continue  # Skip empty section names
-                        
-                    section_obj = Section.objects.create(
-                        name=section_name.strip(), 
-                        semester=semester_obj
-                    )
-                    section_ids.append(section_obj.id)
-                    logger.info(f"Created section: {section_obj.name}")
-                    
-                    # Create faculty allocations for this section
-                    for subject_obj, faculty_obj in semester_subjects:
-                        FacultySubjectAllocation.objects.get_or_create(
-                            faculty=faculty_obj,
-                            subject=subject_obj
-                        )
-            
-            if not section_ids:
-                return Response({
-                    'error': 'No valid sections were created'
-                }, status=400)
-            
-            # Generate timetable
-            logger.info("Starting timetable generation...")
-            result = generate_timetable()
-            
-            if result["status"] != "success":
-                logger.error(f"Timetable generation failed: {result['message']}")
-                return Response({"error": result["message"]}, status=400)
-            
-            logger.info(f"Timetable generation successful. Created {len(section_ids)} sections.")
+            # Create timetable slots and the academic structure in bulk
+            create_timetable_slots(institute.working_days, institute.periods_per_day)
+            return create_academic_structure(
+                course_obj, semesters, faculty_map,
+                code_suffix=lambda number: f"_{number}_{course_obj.id}"
+            )
+        
+        # Solve before anything is stored, then write the setup together with
+        # the new timetable version (see setup_and_generate)
+        logger.info("Starting timetable generation...")
+        result, sections = generate_with_setup(
+            write_setup, owner=request.user, abort_on_infeasible=bool(data.get("abortIfInfeasible", False))
+        )
+        if result["status"] != "success":
+            logger.error("Timetable generation error: %s", result["message"])
+            return generation_error_response(result, setup_discarded=True)
+        section_ids = [section.id for section in sections]
+        logger.info(f"Timetable generation successful. Created {len(section_ids)} sections.")
         
         return Response({
             "message": "Timetable generated successfully!",
@@ -541,6 +805,75 @@ def generate_from_academic_setup(request):
             "stats": result.get("stats", {})
         })
         
+    except SetupValidationError as e:
+        return setup_error_response(e)
+    except SetupChangedError as e:
+        return Response({"error": str(e), "detail": SETUP_NOT_SAVED}, status=409)
+    except ValueError as e:
+        logger.exception("Timetable generation failed: %s", str(e))
+        return Response({"error": str(e), "detail": SETUP_NOT_SAVED}, status=400)
     except Exception as e:
         logger.exception("Academic setup and generation failed: %s", str(e))
         return Response({"error": f"Internal error: {str(e)}"}, status=500)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent_view
+def import_setup_file(request, kind):
+    """Stream a CSV/XLSX file of faculty, rooms or subjects into the user's setup"""
+    try:
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': "Upload the file in a 'file' form field"}, status=400)
+        
+        chunk_size = int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        progress = []
+        report = import_rows(
+            kind, iter_rows(upload, upload.name), user=request.user,
+            chunk_size=max(1, chunk_size), on_progress=progress.append,
+        )
+        report['progress'] = progress
+        
+        logger.info(f"Imported {report['created']}/{report['rows']} {kind} rows for user: {request.user.username}")
+        return Response(report)
+        
+    except (SetupImportError, ValueError) as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception("Setup import failed: %s", str(e))
+        return Response({'error': f"Import failed: {str(e)}"}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_timetables(request, scope, fmt):
+    """Stream the whole institution's timetable by section, faculty or room as CSV, JSON Lines or iCalendar"""
+    if scope not in EXPORT_SCOPES:
+        return Response({'error': f"Unknown export scope '{scope}'. Use one of: {', '.join(EXPORT_SCOPES)}"}, status=400)
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f"Unknown export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+    
+    if fmt == 'csv':
+        content = stream_csv(scope)
+    elif fmt == 'jsonl':
+        content = stream_jsonl(scope)
+    else:
+        try:
+            term_start = date.fromisoformat(request.query_params['term_start'])
+            term_end = date.fromisoformat(request.query_params['term_end'])
+            day_start = time.fromisoformat(request.query_params.get('day_start', '09:00'))
+        except KeyError:
+            return Response({'error': 'term_start and term_end (YYYY-MM-DD) are required for iCalendar export'}, status=400)
+        except ValueError as e:
+            return Response({'error': f"Invalid date or time: {str(e)}"}, status=400)
+        if term_end < term_start:
+            return Response({'error': 'term_end must not be before term_start'}, status=400)
+        
+        institute = (InstitutionSettings.objects.filter(created_by=request.user).first()
+                     or InstitutionSettings.objects.first())
+        period_minutes = institute.period_duration if institute else 60
+        content = stream_ics(scope, term_start, term_end, day_start, period_minutes)
+    
+    logger.info(f"Streaming {fmt} export by {scope} for user: {request.user.username}")
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="timetable-by-{scope}.{fmt}"'
+    return response
@@ -0,0 +1,178 @@
+import copy
+import logging
+from .models import Room, TimetableSlot
+from .problem import build_demands
+from .setup_pipeline import MAX_PERIODS_PER_DAY, MAX_WORKING_DAYS, _as_int, raise_if_errors
+
+logger = logging.getLogger(__name__)
+
+# "What-if" overlays: changes applied to an in-memory Problem snapshot so a
+# tweak can be solved and compared without saving it. Overlay rows that do
+# not exist in the database (new rooms, extra slots) get negative ids; the
+# solver only needs ids to be unique. Nothing here may call save().
+#
+# Overlay payload (every block optional):
+#   {"institute": {"workingDays": 6, "periodsPerDay": 7},
+#    "rooms": {"add": [{"name": "Lab 2", "isLab": true}], "remove": ["Room 101"]},
+#    "faculty": [{"empId": "E1" | "name": "...", "maxHours": 20, "maxHoursPerDay": 5}],
+#    "subjects": [{"name": "DBMS", "weeklyHours": 4, "isLab": false}],
+#    "allocations": [{"subject": "DBMS", "faculty": "E1" | "name"}]}
+
+
+def _overlay_grid(problem, institute, errors, changes):
+    working_days = _as_int(institute.get("workingDays", problem.working_days))
+    periods_per_day = _as_int(institute.get("periodsPerDay", problem.periods_per_day))
+    if working_days is None or not 1 <= working_days <= MAX_WORKING_DAYS:
+        errors.append(f"Working days must be between 1 and {MAX_WORKING_DAYS}.")
+    if periods_per_day is None or not 1 <= periods_per_day <= MAX_PERIODS_PER_DAY:
+        errors.append(f"Periods per day must be between 1 and {MAX_PERIODS_PER_DAY}.")
+    if errors or (working_days, periods_per_day) == (problem.working_days, problem.periods_per_day):
+        return
+
+    existing = {(slot.day, slot.period_number): slot for slot in problem.slots}
+    slots = []
+    for day in range(1, working_days + 1):
+        for period in range(1, periods_per_day + 1):
+            slot = existing.get((day, period))
+            if slot is None:
+                slot = TimetableSlot(id=-(len(existing) + len(slots) + 1), day=day, period_number=period)
+            slots.append(slot)
+
+    problem.settings = copy.copy(problem.settings)
+    problem.settings.working_days = working_days
+    problem.settings.periods_per_day = periods_per_day
+    problem.slots = slots
+    changes.append(f"Grid {working_days} days x {periods_per_day} periods")
+
+
+def _overlay_rooms(problem, rooms, errors, changes):
+    by_name = {room.name: room for room in problem.rooms}
+    for name in rooms.get("remove") or []:
+        if name not in by_name:
+            errors.append(f"Room '{name}' not found")
+            continue
+        problem.rooms.remove(by_name.pop(name))
+        changes.append(f"Removed room {name}")
+
+    for index, room in enumerate(rooms.get("add") or [], start=1):
+        if not room.get("name"):
+            errors.append(f"New room #{index}: name is required")
+            continue
+        problem.rooms.append(Room(id=-index, name=room["name"], is_lab=bool(room.get("isLab", False))))
+        changes.append(f"Added {'lab' if room.get('isLab') else 'room'} {room['name']}")
+
+
+def _find_faculty(problem, key):
+    for faculty in problem.faculty.values():
+        if key in (faculty.employee_id, faculty.name):
+            return faculty
+    return None
+
+
+def _overlay_faculty(problem, updates, errors, changes):
+    for update in updates:
+        key = update.get("empId") or update.get("name")
+        faculty = _find_faculty(problem, key)
+        if faculty is None:
+            errors.append(f"Faculty '{key}' not found")
+            continue
+        for field, attribute in (("maxHours", "max_hours_per_week"), ("maxHoursPerDay", "max_hours_per_day")):
+            if field not in update:
+                continue
+            value = _as_int(update[field])
+            if value is None or value < 1:
+                errors.append(f"Faculty '{key}': {field} must be a positive whole number")
+                continue
+            setattr(faculty, attribute, value)
+            changes.append(f"Faculty {faculty.name}: {attribute} = {value}")
+
+
+def _subjects_named(problem, name):
+    return [subject for subjects in problem.subjects_by_semester.values() for subject in subjects
+            if subject.name == name]
+
+
+def _overlay_subjects(problem, updates, errors, changes):
+    for update in updates:
+        subjects = _subjects_named(problem, update.get("name"))
+        if not subjects:
+            errors.append(f"Subject '{update.get('name')}' not found")
+            continue
+        if "weeklyHours" in update:
+            hours = _as_int(update["weeklyHours"])
+            if hours is None or hours < 1:
+                errors.append(f"Subject '{update['name']}': weeklyHours must be a positive whole number")
+                continue
+            for subject in subjects:
+                subject.weekly_hours = hours
+            changes.append(f"Subject {update['name']}: weekly_hours = {hours}")
+        if "isLab" in update:
+            for subject in subjects:
+                subject.lab_required = bool(update["isLab"])
+            changes.append(f"Subject {update['name']}: lab_required = {bool(update['isLab'])}")
+
+
+def _overlay_allocations(problem, allocations, errors, changes):
+    for allocation in allocations:
+        subjects = _subjects_named(problem, allocation.get("subject"))
+        faculty = _find_faculty(problem, allocation.get("faculty"))
+        if not subjects:
+            errors.append(f"Subject '{allocation.get('subject')}' not found")
+        if faculty is None:
+            errors.append(f"Faculty '{allocation.get('faculty')}' not found")
+        if not subjects or faculty is None:
+            continue
+        for subject in subjects:
+            problem.allocations[subject.id] = faculty.id
+        changes.append(f"Subject {allocation['subject']} taught by {faculty.name}")
+
+
+OVERLAY_LISTS = ("faculty", "subjects", "allocations")
+
+
+def _check_entries(entries, label, kind, errors):
+    if not isinstance(entries, list):
+        errors.append(f"{label} must be a list")
+    elif not all(isinstance(entry, kind) for entry in entries):
+        errors.append(f"{label} entries must be {'objects' if kind is dict else 'names'}")
+
+
+def _check_overlay_shape(overlay):
+    """Reject overlays whose blocks have the wrong JSON types before any change is applied"""
+    if not isinstance(overlay, dict):
+        raise_if_errors(["overlay must be an object"])
+    errors = []
+    for block in ("institute", "rooms"):
+        if overlay.get(block) and not isinstance(overlay[block], dict):
+            errors.append(f"overlay {block} must be an object")
+    rooms = overlay.get("rooms")
+    if rooms and isinstance(rooms, dict):
+        if rooms.get("add"):
+            _check_entries(rooms["add"], "overlay rooms.add", dict, errors)
+        if rooms.get("remove"):
+            _check_entries(rooms["remove"], "overlay rooms.remove", str, errors)
+    for block in OVERLAY_LISTS:
+        if overlay.get(block):
+            _check_entries(overlay[block], f"overlay {block}", dict, errors)
+    raise_if_errors(errors)
+
+
+def apply_overlay(problem, overlay):
+    """Apply ``overlay`` to ``problem`` in place and rebuild its demands.
+
+    Raises SetupValidationError listing every invalid change. Returns a list
+    of human-readable descriptions of the applied changes.
+    """
+    _check_overlay_shape(overlay)
+    errors, changes = [], []
+    _overlay_grid(problem, overlay.get("institute") or {}, errors, changes)
+    _overlay_rooms(problem, overlay.get("rooms") or {}, errors, changes)
+    _overlay_faculty(problem, overlay.get("faculty") or [], errors, changes)
+    _overlay_subjects(problem, overlay.get("subjects") or [], errors, changes)
+    _overlay_allocations(problem, overlay.get("allocations") or [], errors, changes)
+    raise_if_errors(errors)
+
+    problem.overlaid = True
+    build_demands(problem)
+    logger.info(f"What-if overlay: {len(changes)} changes applied")
+    return changes
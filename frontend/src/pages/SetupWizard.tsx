@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Card } from "@/components/ui/card";
 import { Tabs, TabsList, TabsTrigger, TabsContent } from "@/components/ui/tabs";
 import { Button } from "@/components/ui/button";
@@ -20,6 +20,18 @@ export default function SetupWizard() {
 	const [existingSetup, setExistingSetup] = useState<any>(null);
 	const navigate = useNavigate();
 
+	// One Idempotency-Key per distinct submission, so double clicks and retries of the
+	// same payload are answered by the backend's first run instead of a new generation.
+	// Once the server has answered, the next submission gets a new key
+	const submission = useRef<{ body: string; key: string } | null>(null);
+	const idempotencyKey = (endpoint: string, payload: unknown) => {
+		const body = endpoint + JSON.stringify(payload);
+		if (submission.current?.body !== body) {
+			submission.current = { body, key: crypto.randomUUID() };
+		}
+		return submission.current.key;
+	};
+
 	const [formData, setFormData] = useState({
 		institute: {
 			name: "",
@@ -134,22 +146,25 @@ export default function SetupWizard() {
 		try {
 			setLoading(true);
 			const token = localStorage.getItem("token");
-			await axios.post(
-				"http://127.0.0.1:8000/timetable/setup/institute/",
-				{
-					institute: formData.institute,
-					rooms: formData.rooms,
-					faculties: formData.faculties
-				},
-				{
-					headers: { 'Authorization': token ? `Token ${token}` : '' }
+			const endpoint = "http://127.0.0.1:8000/timetable/setup/institute/";
+			const payload = {
+				institute: formData.institute,
+				rooms: formData.rooms,
+				faculties: formData.faculties
+			};
+			await axios.post(endpoint, payload, {
+				headers: {
+					'Authorization': token ? `Token ${token}` : '',
+					'Idempotency-Key': idempotencyKey(endpoint, payload)
 				}
-			);
+			});
+			submission.current = null;
 			alert("Institute setup saved successfully! You can now generate timetables with just academic setup.");
 			setSetupMode("academic_only");
 			setStep("step4");
 		} catch (error: any) {
 			console.error("Error saving institute setup:", error);
+			if (error.response) submission.current = null;
 			alert("Failed to save institute setup: " + (error.response?.data?.error || error.message));
 		} finally {
 			setLoading(false);
@@ -185,14 +200,17 @@ export default function SetupWizard() {
 			const response = await axios.post(endpoint, payload, {
 				headers: {
 					'Authorization': token ? `Token ${token}` : '',
-					'Content-Type': 'application/json'
+					'Content-Type': 'application/json',
+					'Idempotency-Key': idempotencyKey(endpoint, payload)
 				}
 			});
 
+			submission.current = null;
 			alert("Timetable generated successfully! 🎉");
 			navigate(`/timetable/${response.data.section_id || 1}`);
 		} catch (error: any) {
 			console.error("Generation error:", error);
+			if (error.response) submission.current = null;
 			let details = "Error generating timetable";
 			if (error.response) {
 				if (error.response.status === 401) {